@@ -0,0 +1,351 @@
+"""
+Benchmark des contrôleurs sur un jeu de données synthétique.
+
+La base (SQLite temporaire par défaut, ou PostgreSQL via --db-url) est créée par les
+migrations, remplie par utils.seed au volume demandé, puis chaque point d'entrée des
+contrôleurs est appelé `--iterations` fois. Pour chaque opération, on rapporte le débit
+et les percentiles de latence ; les résultats peuvent être enregistrés en JSON et
+comparés à un enregistrement précédent.
+
+Les opérations d'écriture sont enchaînées de façon à laisser la base dans son état
+initial (les clients, contrats et événements créés sont ensuite supprimés).
+
+Usage :
+    python benchmarks/controller_latency.py [--scale 1k|100k|1m] [--iterations 50]
+                                     [--db-url postgresql+psycopg2://...]
+                                     [--output resultats.json] [--compare precedent.json]
+
+Attention : avec --db-url, la base indiquée est migrée puis remplie ; utilisez une base dédiée.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# Nombre d'itérations des opérations qui hashent un mot de passe (bcrypt est volontairement lent)
+HASHING_ITERATIONS = 5
+
+# Taille de page utilisée pour les listes
+PAGE_SIZE = 100
+
+
+def measure(name, operation, iterations):
+    """
+    Appelle une opération `iterations` fois et mesure chaque appel.
+
+    Args:
+        name (str): Nom de l'opération.
+        operation (callable): Fonction appelée avec le numéro d'itération.
+        iterations (int): Nombre d'appels.
+
+    Returns:
+        dict: Nombre d'appels et d'erreurs, débit (ops/s) et latences (ms).
+    """
+    from utils.profiling import percentile
+
+    durations = []
+    errors = 0
+    for i in range(iterations):
+        start = time.perf_counter()
+        try:
+            operation(i)
+        except Exception as e:
+            errors += 1
+            if errors == 1:
+                print(f"  {name} : {e}", file=sys.stderr)
+        durations.append(time.perf_counter() - start)
+
+    total = sum(durations)
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "throughput": iterations / total if total else 0.0,
+        "p50_ms": percentile(durations, 50) * 1000,
+        "p95_ms": percentile(durations, 95) * 1000,
+        "p99_ms": percentile(durations, 99) * 1000,
+        "max_ms": max(durations) * 1000 if durations else 0.0,
+    }
+
+
+def uncached(operation):
+    """
+    Variante d'une opération appelée cache de résultats vidé (utils.cache) : mesure la base.
+    """
+    from utils.cache import result_cache
+
+    def run(i):
+        result_cache.clear()
+        return operation(i)
+
+    return run
+
+
+def prepare_database(url, scale, seed):
+    """
+    Crée le schéma et insère le jeu de données synthétique.
+
+    Returns:
+        dict: Nombre de lignes insérées par table.
+    """
+    from sqlalchemy import create_engine
+    from utils.schema import upgrade_db
+    from utils.seed import seed_database, SCALES
+
+    upgrade_db(url)
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            return seed_database(connection, seed=seed, **SCALES[scale])
+    finally:
+        engine.dispose()
+
+
+def run_benchmarks(iterations):
+    """
+    Mesure chaque point d'entrée des contrôleurs.
+
+    Les contrôleurs utilisent leurs sessions de module (liées à utils.connection.engine) ;
+    l'identité de chaque rôle est passée via `current_user`.
+
+    Returns:
+        dict: Résultats par opération.
+    """
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import sessionmaker
+    from controllers import client_controller, contract_controller, event_controller, user_controller
+    from models.client import Client
+    from models.contract import Contract
+    from models.department import Department
+    from models.event import Event
+    from models.user import User
+    from utils.auth import Identity
+    from utils.connection import engine
+
+    session = sessionmaker(bind=engine)()
+
+    def identity(department):
+        user = session.execute(
+            select(User).join(Department).where(Department.name == department).order_by(User.id)
+        ).scalars().first()
+        return Identity(user.id, user.email, department)
+
+    manager = identity("gestion")
+    # Le commercial et le support retenus sont ceux qui ont le plus de données
+    seller_id = session.execute(
+        select(Contract.sales_contact_id).where(Contract.signed.is_(True))
+        .group_by(Contract.sales_contact_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    seller_user = session.get(User, seller_id)
+    seller = Identity(seller_user.id, seller_user.email, "commercial")
+    support_id = session.execute(
+        select(Event.support_contact_id).where(Event.support_contact_id.is_not(None))
+        .group_by(Event.support_contact_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    support_user = session.get(User, support_id)
+    support = Identity(support_user.id, support_user.email, "support")
+    support_event_ids = session.execute(
+        select(Event.id).where(Event.support_contact_id == support.id).limit(iterations)
+    ).scalars().all()
+    seller_client_id = session.execute(
+        select(Client.id).where(Client.sales_contact_id == seller.id).limit(1)
+    ).scalar()
+
+    run = f"{int(time.time())}"
+    results = {}
+    created = {}
+
+    def bench_slot(i):
+        # Un jour par itération : ni conflit de lieu entre les événements créés, ni conflit
+        # d'emploi du temps pour le support qui leur est ensuite assigné
+        day = datetime(2030, 1, 1) + timedelta(days=i)
+        return f"{day:%Y-%m-%d} 10:00", f"{day:%Y-%m-%d} 18:00"
+
+    def ids_named(model, column, prefix):
+        session.expire_all()
+        query = select(model.id).where(column.like(f"{prefix}%")).order_by(model.id)
+        return session.execute(query).scalars().all()
+
+    # Lectures : mesurées cache vidé (coût de la base), puis avec le cache de résultats chaud
+    reads = {
+        "list_clients": lambda i: client_controller.list_clients(limit=PAGE_SIZE, current_user=seller),
+        "list_contracts": lambda i: contract_controller.list_contracts(limit=PAGE_SIZE, current_user=seller),
+        "list_unsigned_contracts":
+            lambda i: contract_controller.list_unsigned_contracts(limit=PAGE_SIZE, current_user=seller),
+        "list_events": lambda i: event_controller.list_events(limit=PAGE_SIZE, current_user=seller),
+        "list_unassigned_events":
+            lambda i: event_controller.list_unassigned_events(limit=PAGE_SIZE, current_user=manager),
+        "list_my_events": lambda i: event_controller.list_my_events(limit=PAGE_SIZE, current_user=support),
+        "list_users": lambda i: user_controller.list_users(limit=PAGE_SIZE, current_user=manager),
+    }
+    for name, operation in reads.items():
+        results[name] = measure(name, uncached(operation), iterations)
+    for name, operation in reads.items():
+        results[f"{name}_cached"] = measure(f"{name}_cached", operation, iterations)
+    results["iter_clients"] = measure(
+        "iter_clients",
+        lambda i: sum(1 for _ in client_controller.iter_clients(limit=PAGE_SIZE * 10, current_user=seller)),
+        iterations)
+
+    # Clients : création, mise à jour puis suppression des clients créés
+    results["create_client"] = measure(
+        "create_client",
+        lambda i: client_controller.create_client(
+            f"bench-{run}-{i}", f"bench{run}.{i}@example.com", "0102030405", "BenchCo", current_user=seller),
+        iterations)
+    created["clients"] = ids_named(Client, Client.name, f"bench-{run}-")
+    results["update_client"] = measure(
+        "update_client",
+        lambda i: client_controller.update_client(
+            created["clients"][i], f"bench-{run}-{i}", f"bench{run}.{i}@example.org", "0102030405", "BenchCo",
+            current_user=seller),
+        iterations)
+    results["delete_client"] = measure(
+        "delete_client",
+        lambda i: client_controller.delete_client(created["clients"][i], current_user=seller),
+        iterations)
+
+    # Contrats et événements : création, mise à jour, assignation puis suppression
+    before = session.execute(select(Contract.id).order_by(Contract.id.desc()).limit(1)).scalar() or 0
+    results["create_contract"] = measure(
+        "create_contract",
+        lambda i: contract_controller.create_contract(seller_client_id, 1000.0, 1000.0, "oui",
+                                                      current_user=seller),
+        iterations)
+    session.expire_all()
+    created["contracts"] = session.execute(
+        select(Contract.id).where(Contract.id > before).order_by(Contract.id)).scalars().all()
+    results["update_contract"] = measure(
+        "update_contract",
+        lambda i: contract_controller.update_contract(created["contracts"][i], None, 500.0, "oui",
+                                                      current_user=seller),
+        iterations)
+    results["create_event"] = measure(
+        "create_event",
+        lambda i: event_controller.create_event(
+            created["contracts"][i], f"bench-{run}-{i}", *bench_slot(i), "Paris", 50, "",
+            current_user=seller),
+        iterations)
+    created["events"] = ids_named(Event, Event.name, f"bench-{run}-")
+    results["assign_support"] = measure(
+        "assign_support",
+        lambda i: event_controller.assign_support(created["events"][i], support.email, current_user=manager),
+        iterations)
+    results["update_my_event"] = measure(
+        "update_my_event",
+        lambda i: event_controller.update_my_event(support_event_ids[i % len(support_event_ids)],
+                                                   notes=f"bench {run}", current_user=support),
+        iterations)
+    results["delete_event"] = measure(
+        "delete_event", lambda i: event_controller.delete_event(created["events"][i], current_user=seller),
+        iterations)
+    results["delete_contract"] = measure(
+        "delete_contract",
+        lambda i: contract_controller.delete_contract(created["contracts"][i], current_user=seller),
+        iterations)
+
+    # Utilisateurs (hash bcrypt : peu d'itérations)
+    hashing = min(iterations, HASHING_ITERATIONS)
+    department_id = session.execute(select(Department.id).where(Department.name == "support")).scalar()
+    results["create_user"] = measure(
+        "create_user",
+        lambda i: user_controller.create_user(f"bench-{run}-{i}", f"bench{run}.{i}@users.example.com",
+                                              department_id, "Bench-password-1", current_user=manager),
+        hashing)
+    results["delete_user"] = measure(
+        "delete_user",
+        lambda i: user_controller.delete_user(f"bench{run}.{i}@users.example.com", current_user=manager),
+        hashing)
+
+    session.close()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_results(results, previous=None):
+    header = (f"{'Opération':<30} | {'ops/s':>9} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | "
+              f"{'p99 (ms)':>9} | {'Erreurs':>7}")
+    if previous:
+        header += f" | {'p95 préc.':>9}"
+    print(header)
+    for name, stats in results.items():
+        line = (f"{name:<30} | {stats['throughput']:>9.1f} | {stats['p50_ms']:>9.2f} | "
+                f"{stats['p95_ms']:>9.2f} | {stats['p99_ms']:>9.2f} | {stats['errors']:>7}")
+        if previous:
+            before = previous.get(name)
+            line += f" | {before['p95_ms']:>9.2f}" if before else f" | {'-':>9}"
+        print(line)
+
+
+def main():
+    from utils.seed import SCALES
+
+    parser = argparse.ArgumentParser(description="Benchmark des contrôleurs epicevents")
+    parser.add_argument("--scale", choices=list(SCALES), default="1k", help="Volume du jeu de données")
+    parser.add_argument("--iterations", type=int, default=50, help="Nombre d'appels par opération")
+    parser.add_argument("--db-url", help="Base à utiliser (SQLite temporaire par défaut)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du jeu de données")
+    parser.add_argument("--output", help="Fichier JSON où enregistrer les résultats")
+    parser.add_argument("--compare", help="Fichier JSON d'une exécution précédente")
+    options = parser.parse_args()
+
+    tmpdir = None
+    url = options.db_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'benchmark.db')}"
+    # Les contrôleurs utilisent le moteur de utils.connection, créé à partir de EPIC_DB_URL
+    os.environ["EPIC_DB_URL"] = url
+
+    try:
+        start = time.perf_counter()
+        counts = prepare_database(url, options.scale, options.seed)
+        print(f"Jeu de données ({options.scale}) : {counts} en {time.perf_counter() - start:.1f} s")
+        results = run_benchmarks(options.iterations)
+    finally:
+        if tmpdir is not None:
+            from utils.connection import engine
+
+            engine.dispose()
+            tmpdir.cleanup()
+
+    previous = None
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as f:
+            previous = json.load(f)["results"]
+    print_results(results, previous)
+
+    if options.output:
+        report = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "scale": options.scale,
+                "rows": counts,
+                "iterations": options.iterations,
+                "backend": url.split(":", 1)[0],
+                "python": platform.python_version(),
+            },
+            "results": results,
+        }
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Résultats enregistrés dans {options.output}")
+
+
+if __name__ == "__main__":
+    main()
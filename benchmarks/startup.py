@@ -0,0 +1,95 @@
+"""
+Benchmark du temps de démarrage de la CLI epicevents.
+
+Chaque invocation est lancée dans un processus neuf avec `python -X importtime`,
+comme le font nos scripts. On mesure le temps total d'exécution ainsi que le temps
+passé dans les imports, puis on le compare au budget de la sous-commande.
+
+Usage :
+    python benchmarks/startup.py [--runs 5]
+
+Le script retourne un code de sortie non nul si un budget d'import est dépassé.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINT = os.path.join(ROOT_DIR, "epicevents.py")
+
+# Budget de temps d'import (ms) par invocation
+IMPORT_BUDGETS_MS = {
+    "--help": 150,
+    "login --help": 150,
+    "user --help": 1000,
+    "client --help": 1000,
+    "contract --help": 1000,
+    "event --help": 1000,
+}
+
+
+def import_time_ms(stderr):
+    """
+    Additionne le temps cumulé des imports de premier niveau rapportés par `-X importtime`.
+
+    Args:
+        stderr (str): Sortie d'erreur du processus.
+
+    Returns:
+        float: Temps d'import total en millisecondes (hors `site`).
+    """
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Les imports de premier niveau ne sont pas indentés
+        if name.startswith(" ") and not name.startswith("  ") and name.strip() != "site":
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def run_once(args):
+    """
+    Lance une invocation de la CLI dans un nouveau processus.
+
+    Returns:
+        tuple[float, float]: (temps total en ms, temps d'import en ms)
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", ENTRY_POINT, *args.split()],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    return wall_ms, import_time_ms(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage de epicevents.py")
+    parser.add_argument("--runs", type=int, default=5, help="Nombre d'exécutions par commande")
+    options = parser.parse_args()
+
+    over_budget = []
+    print(f"{'Commande':<20} | {'Total (ms)':>10} | {'Imports (ms)':>12} | {'Budget (ms)':>11}")
+    for args, budget in IMPORT_BUDGETS_MS.items():
+        samples = [run_once(args) for _ in range(options.runs)]
+        wall = statistics.median(s[0] for s in samples)
+        imports = statistics.median(s[1] for s in samples)
+        flag = "" if imports <= budget else "  <-- dépassé"
+        print(f"{args:<20} | {wall:>10.1f} | {imports:>12.1f} | {budget:>11}{flag}")
+        if imports > budget:
+            over_budget.append(args)
+
+    if over_budget:
+        print(f"\nBudget d'import dépassé pour : {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,17 @@ import re
 from controllers.client_controller import (
     create_client,
     list_clients,
+    iter_clients,
+    search_clients,
+    pick_clients,
+    import_clients,
     update_client,
     delete_client
 )
+from utils.cli import echo_stream
+from utils.picker import pick
+from utils.search import SEARCH_LIMIT
+from utils.pagination import next_page_hint
 
 
 def validate_email(ctx, param, value):
@@ -64,6 +72,8 @@ def client_cli():
     - list : lister les clients existants
     - update : modifier un client existant
     - delete : supprimer un client existant
+    - import : importer des clients en masse depuis un fichier
+    - search : rechercher des clients par nom, email ou entreprise
     """
     pass
 
@@ -86,54 +96,65 @@ def create_client_cmd(name, email, phone, company):
 
 
 @click.command("list")
-def list_clients_cmd():
+@click.option('--limit', type=click.IntRange(min=1), default=None,
+              help="Nombre maximum de clients à afficher")
+@click.option('--after', type=click.IntRange(min=0), default=None,
+              help="N'afficher que les clients dont l'ID est supérieur à cette valeur (page suivante)")
+@click.option('--stream', is_flag=True, default=False,
+              help="Afficher les lignes au fil de l'eau (lecture par lots, mémoire constante)")
+def list_clients_cmd(limit, after, stream):
     """
     Commande pour afficher la liste de tous les clients.
     """
     try:
-        clients_data = list_clients()
+        if stream:
+            echo_stream(iter_clients(limit=limit, after=after), format_client_line, "Aucun client trouvé.")
+            return
+
+        clients_data = list_clients(limit=limit, after=after)
 
-        lines = [f"[{c['id']}] | {c['name']} | {c['email']} | "
-                 f"{c['phone']} | {c['company']} | "
-                 f"Commercial : {c['sales_contact_name']} | "
-                 f"Créé le : {c['created_date']} | Modifié le : {c['updated_date']}"
-                 for c in clients_data.values()]
+        lines = [format_client_line(c) for c in clients_data.values()]
         message = "\n".join(lines)
         click.echo(message)
+        hint = next_page_hint(clients_data, limit)
+        if hint:
+            click.echo(hint)
 
     except Exception as e:
         click.echo(f"Erreur : {e}")
 
 
+def format_client_line(c):
+    """
+    Formate un client pour les commandes de liste.
+    """
+    return (f"[{c['id']}] | {c['name']} | {c['email']} | "
+            f"{c['phone']} | {c['company']} | "
+            f"Commercial : {c['sales_contact_name']} | "
+            f"Créé le : {c['created_date']} | Modifié le : {c['updated_date']}")
+
+
 @click.command("update")
 @click.option('--name', type=str, default=None, help="Nouveau nom du client")
 @click.option('--email', type=str, default=None, help="Nouvel email du client")
 @click.option('--phone', type=str, default=None, help="Nouveau téléphone du client")
 @click.option('--company', type=str, default=None, help="Nouvelle entreprise du client")
-def update_client_cmd(name, email, phone, company):
+@click.option('--search', type=str, default=None,
+              help="Filtre initial des clients (nom, email ou entreprise)")
+def update_client_cmd(name, email, phone, company, search):
     """
     Commande pour mettre à jour les informations d'un client existant.
     """
     try:
-        # Affiche la liste des clients
-        clients_data = list_clients()
-
-        lines = [f"[{c['id']}] | {c['name']} | {c['email']} | "
-                 f"{c['phone']} | {c['company']} | "
-                 f"Commercial : {c['sales_contact_name']} | "
-                 f"Créé le : {c['created_date']} | Modifié le : {c['updated_date']}"
-                 for c in clients_data.values()]
-        message = "\n".join(lines)
-        click.echo(message)
-
-        # Demande l'ID après affichage
-        client_id = click.prompt("ID du client à modifier", type=int)
-
-        if client_id not in clients_data:
-            click.echo("Client non trouvé.")
+        # Seuls les clients du commercial connecté peuvent être modifiés : seuls ceux-ci sont proposés
+        choice = pick(
+            lambda text, limit, after: pick_clients(search=text, limit=limit, after=after, mine=True),
+            format_client_line, "clients", search=search,
+        )
+        if choice is None:
+            click.echo("Sélection annulée.")
             return
-
-        client_defaults = clients_data[client_id]
+        client_id, client_defaults = choice
 
         # Prompts pour les valeurs non fournies
         if name is None:
@@ -166,30 +187,23 @@ def update_client_cmd(name, email, phone, company):
 
 
 @click.command("delete")
-def delete_client_cmd():
+@click.option('--search', type=str, default=None,
+              help="Filtre initial des clients (nom, email ou entreprise)")
+def delete_client_cmd(search):
     """
     Commande pour supprimer un client existant.
     """
     try:
-        # Affiche la liste des clients
-        clients_data = list_clients()
-
-        lines = [f"[{c['id']}] | {c['name']} | {c['email']} | "
-                 f"{c['phone']} | {c['company']} | "
-                 f"Commercial : {c['sales_contact_name']} | "
-                 f"Créé le : {c['created_date']} | Modifié le : {c['updated_date']}"
-                 for c in clients_data.values()]
-        message = "\n".join(lines)
-        click.echo(message)
-
-        # Demande l'ID après affichage
-        client_id = click.prompt("ID du client à supprimer", type=int)
-
-        if client_id not in clients_data:
-            click.echo("Client non trouvé.")
+        # Seuls les clients du commercial connecté peuvent être supprimés
+        choice = pick(
+            lambda text, limit, after: pick_clients(search=text, limit=limit, after=after, mine=True),
+            format_client_line, "clients", search=search,
+        )
+        if choice is None:
+            click.echo("Sélection annulée.")
             return
-
-        client_name = clients_data[client_id]["name"]
+        client_id, client = choice
+        client_name = client["name"]
 
         if not click.confirm(
                 f"Êtes-vous sûr de vouloir supprimer le client '{client_name}' ? "
@@ -205,8 +219,50 @@ def delete_client_cmd():
         click.echo(f"Erreur lors de la suppression : {e}")
 
 
+@click.command("import")
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help="Format du fichier (déduit de l'extension par défaut)")
+@click.option('--reject-file', type=click.Path(dir_okay=False), default=None,
+              help="Fichier CSV des lignes rejetées (par défaut FILE.rejects.csv)")
+@click.option('--batch-size', type=int, default=5000, show_default=True,
+              help="Nombre de clients insérés par transaction")
+def import_clients_cmd(file, fmt, reject_file, batch_size):
+    """
+    Commande pour importer en masse des clients depuis un fichier CSV ou JSONL
+    (colonnes name, email, phone, company).
+    """
+    try:
+        result = import_clients(file, reject_path=reject_file, fmt=fmt, batch_size=batch_size)
+        click.echo(f"{result['imported']} client(s) importé(s), {result['rejected']} rejeté(s).")
+        if result["reject_path"]:
+            click.echo(f"Lignes rejetées : {result['reject_path']}")
+    except Exception as e:
+        click.echo(f"Erreur lors de l'import : {e}")
+
+
+@click.command("search")
+@click.argument("query")
+@click.option('--limit', type=click.IntRange(min=1), default=SEARCH_LIMIT, show_default=True,
+              help="Nombre maximum de clients à afficher")
+def search_clients_cmd(query, limit):
+    """
+    Commande pour rechercher des clients par nom, email ou entreprise (les plus pertinents en premier).
+    """
+    try:
+        clients_data = search_clients(query, limit=limit)
+        if not clients_data:
+            click.echo("Aucun client trouvé.")
+            return
+        click.echo("\n".join(format_client_line(c) for c in clients_data.values()))
+    except Exception as e:
+        click.echo(f"Erreur : {e}")
+
+
 # Ajout des sous-commandes au groupe principal
 client_cli.add_command(create_client_cmd)
 client_cli.add_command(list_clients_cmd)
 client_cli.add_command(update_client_cmd)
 client_cli.add_command(delete_client_cmd)
+client_cli.add_command(import_clients_cmd)
+client_cli.add_command(search_clients_cmd)
@@ -5,9 +5,15 @@ from controllers.contract_controller import (
     create_contract,
     update_contract,
     list_contracts,
-    list_unsigned_contracts, delete_contract
+    list_unsigned_contracts, delete_contract,
+    iter_contracts, contract_stats, STATS_GROUPS,
+    pick_contracts, sign_contracts, bulk_update_contracts, BULK_MAX_IDS
 )
-from controllers.client_controller import list_clients
+from controllers.client_controller import pick_clients
+from commands.client import format_client_line
+from utils.cli import echo_stream, parse_ids
+from utils.picker import pick
+from utils.pagination import next_page_hint
 
 
 @click.group()
@@ -20,6 +26,8 @@ def contract_cli():
     - update : modifier un contrat existant
     - list : lister tous les contrats
     - unsigned : lister les contrats non signés
+    - sign / bulk-update : signer ou modifier un lot de contrats
+    - stats : indicateurs par commercial, client ou mois de signature
     """
     pass
 
@@ -41,7 +49,9 @@ def contract():
     type=click.Choice(['oui', 'non'], case_sensitive=False),
     help="Statut de signature du contrat"
 )
-def create_contract_cmd(amount_total, amount_remaining, signed):
+@click.option('--search', type=str, default=None,
+              help="Filtre initial des clients (nom, email ou entreprise)")
+def create_contract_cmd(amount_total, amount_remaining, signed, search):
     """
     Commande pour créer un nouveau contrat.
 
@@ -49,23 +59,18 @@ def create_contract_cmd(amount_total, amount_remaining, signed):
         amount_total (float): Montant total du contrat.
         amount_remaining (float): Montant restant dû sur le contrat.
         signed (str): Statut de signature ('oui' ou 'non').
+        search (str | None): Filtre initial des clients (demandé si absent).
     """
     try:
-        # Affiche la liste des clients
-        clients_data = list_clients()
-
-        lines = [f"{c['id']} | {c['name']} ({c['email']}) | Téléphone: {c['phone']} | "
-                 f"Entreprise: {c['company']} | Commercial: {c['sales_contact_name']}"
-                 for c in clients_data.values()]
-        message = "\n".join(lines)
-        click.echo(message)
-
-        client_id = click.prompt("\nID du client", type=int)
-
-        # Validation du client
-        if client_id not in clients_data:
-            click.echo("Client non trouvé.")
+        # Sélection du client : seule la page affichée est lue
+        choice = pick(
+            lambda text, limit, after: pick_clients(search=text, limit=limit, after=after),
+            format_client_line, "clients", search=search,
+        )
+        if choice is None:
+            click.echo("Sélection annulée.")
             return
+        client_id, _ = choice
 
         # Prompts pour les autres champs
         if amount_total is None:
@@ -92,7 +97,9 @@ def create_contract_cmd(amount_total, amount_remaining, signed):
               help="Nouveau montant restant (laisser vide pour conserver l'actuel)")
 @click.option('--signed', type=click.Choice(['oui', 'non'], case_sensitive=False),
               default=None, help="Statut de signature du contrat ('oui' ou 'non')")
-def update_contract_cmd(amount_total, amount_remaining, signed):
+@click.option('--search', type=str, default=None,
+              help="Filtre initial des contrats (nom, email ou entreprise du client)")
+def update_contract_cmd(amount_total, amount_remaining, signed, search):
     """
     Commande pour mettre à jour un contrat existant.
 
@@ -100,31 +107,18 @@ def update_contract_cmd(amount_total, amount_remaining, signed):
         amount_total (float, optional): Nouveau montant total.
         amount_remaining (float, optional): Nouveau montant restant.
         signed (str, optional): Nouveau statut de signature ('oui' ou 'non').
+        search (str | None): Filtre initial des contrats (demandé si absent).
     """
     try:
-        # Affiche la liste des contrats
-        contracts_data = list_contracts()
-
-        lines = [
-            (
-                f"{c['id']} | Client: {c['client_name']} ({c['client_email']}) | "
-                f"Commercial: {c['commercial_name']} | Total: {c['amount_total']} | "
-                f"Restant: {c['amount_remaining']} | Date: {c['created_date']} | "
-                f"Signé: {'Oui' if c['signed'] else 'Non'}"
-            )
-            for c in contracts_data.values()
-        ]
-
-        message = "\n".join(lines)
-        click.echo(message)
-
-        contract_id = click.prompt("\nID du contrat à modifier", type=int)
-
-        if contract_id not in contracts_data:
-            click.echo("Contrat non trouvé.")
+        # Un commercial ne peut modifier que ses propres contrats : seuls ceux-ci sont proposés
+        choice = pick(
+            lambda text, limit, after: pick_contracts(search=text, limit=limit, after=after, mine=True),
+            format_contract_line, "contrats", search=search,
+        )
+        if choice is None:
+            click.echo("Sélection annulée.")
             return
-
-        contract_defaults = contracts_data[contract_id]
+        contract_id, contract_defaults = choice
 
         amount_total = click.prompt(
             "Montant total",
@@ -149,77 +143,127 @@ def update_contract_cmd(amount_total, amount_remaining, signed):
 
 
 @contract_cli.command("list")
-def list_contracts_cmd():
+@click.option('--limit', type=click.IntRange(min=1), default=None,
+              help="Nombre maximum de contrats à afficher")
+@click.option('--after', type=click.IntRange(min=0), default=None,
+              help="N'afficher que les contrats dont l'ID est supérieur à cette valeur (page suivante)")
+@click.option('--stream', is_flag=True, default=False,
+              help="Afficher les lignes au fil de l'eau (lecture par lots, mémoire constante)")
+def list_contracts_cmd(limit, after, stream):
     """
     Commande pour afficher tous les contrats existants.
     """
     try:
-        contracts_data = list_contracts()
-
-        lines = [
-            (
-                f"[{c['id']}] Client: {c['client_name']} ({c['client_email']}) | "
-                f"Commercial: {c['commercial_name']} | Montant total: {c['amount_total']} | "
-                f"Restant: {c['amount_remaining']} | Date création: {c['created_date']} | "
-                f"Signé: {'Oui' if c['signed'] else 'Non'}"
-            )
-            for c in contracts_data.values()
-        ]
+        if stream:
+            echo_stream(iter_contracts(limit=limit, after=after), format_contract_line,
+                        "Aucun contrat trouvé.")
+            return
+
+        contracts_data = list_contracts(limit=limit, after=after)
+
+        lines = [format_contract_line(c) for c in contracts_data.values()]
 
         message = "\n".join(lines)
         click.echo(message)
+        hint = next_page_hint(contracts_data, limit)
+        if hint:
+            click.echo(hint)
 
     except Exception as e:
         click.echo(f"Erreur : {e}")
 
 
 @contract_cli.command("unsigned")
-def list_unsigned_contracts_cmd():
+@click.option('--limit', type=click.IntRange(min=1), default=None,
+              help="Nombre maximum de contrats à afficher")
+@click.option('--after', type=click.IntRange(min=0), default=None,
+              help="N'afficher que les contrats dont l'ID est supérieur à cette valeur (page suivante)")
+@click.option('--stream', is_flag=True, default=False,
+              help="Afficher les lignes au fil de l'eau (lecture par lots, mémoire constante)")
+def list_unsigned_contracts_cmd(limit, after, stream):
     """
     Commande pour afficher uniquement les contrats non signés.
     """
     try:
-        contracts_data = list_unsigned_contracts()
-
-        lines = [
-            (
-                f"[{c['id']}] Client: {c['client_name']} ({c['client_email']}) | "
-                f"Commercial: {c['commercial_name']} | Montant total: {c['amount_total']} | "
-                f"Restant: {c['amount_remaining']} | Date création: {c['created_date']} | "
-                f"Signé: {'Oui' if c['signed'] else 'Non'}"
-            )
-            for c in contracts_data.values()
-        ]
+        if stream:
+            echo_stream(iter_contracts(unsigned_only=True, limit=limit, after=after), format_contract_line,
+                        "Aucun contrat non signé trouvé.")
+            return
+
+        contracts_data = list_unsigned_contracts(limit=limit, after=after)
+
+        lines = [format_contract_line(c) for c in contracts_data.values()]
 
         message = "\n".join(lines)
         click.echo(message)
+        hint = next_page_hint(contracts_data, limit)
+        if hint:
+            click.echo(hint)
 
     except Exception as e:
         click.echo(f"Erreur : {e}")
 
 
-@click.command("delete")
-def delete_contract_cmd():
+@contract_cli.command("stats")
+@click.option('--by', 'group_by', type=click.Choice(STATS_GROUPS), default="sales_contact",
+              show_default=True, help="Regroupement : commercial, client ou mois de signature")
+@click.option('--limit', type=click.IntRange(min=1), default=None,
+              help="Nombre maximum de groupes à afficher (les mieux classés)")
+def contract_stats_cmd(group_by, limit):
     """
-    Commande pour supprimer un contrat (uniquement si aucun événement lié).
+    Commande pour afficher le chiffre d'affaires signé, le restant dû et le taux de signature.
     """
     try:
-        # On affiche d'abord les contrats pour aider au choix
-        contracts_data = list_contracts()
-
-        lines = [f"[{c['id']}] Client: {c['client_name']} ({c['client_email']}) | "
-                 f"Commercial: {c['commercial_name']} | Total: {c['amount_total']} | "
-                 f"Restant: {c['amount_remaining']} | Date: {c['created_date']} | "
-                 f"Signé: {'Oui' if c['signed'] else 'Non'}"
-                 for c in contracts_data.values()]
-        message = "\n".join(lines)
-        click.echo(message)
+        stats = contract_stats(group_by=group_by, limit=limit)
+
+        for g in stats["groups"]:
+            line = (
+                f"#{g['rank']} {g['label']} | Contrats: {g['contracts']} | "
+                f"Signés: {g['signed']} ({g['signing_rate']:.0%}) | "
+                f"CA signé: {g['signed_amount']:.2f} ({g['share']:.1%}) | Restant dû: {g['outstanding']:.2f}"
+            )
+            if g["cumulative"] is not None:
+                line += f" | Cumul: {g['cumulative']:.2f}"
+            click.echo(line)
+
+        t = stats["totals"]
+        click.echo(
+            f"Total | Contrats: {t['contracts']} | Signés: {t['signed']} ({t['signing_rate']:.0%}) | "
+            f"CA signé: {t['signed_amount']:.2f} | Restant dû: {t['outstanding']:.2f}"
+        )
+
+    except Exception as e:
+        click.echo(f"Erreur : {e}")
+
+
+def format_contract_line(c):
+    """
+    Formate un contrat pour les commandes de liste.
+    """
+    return (
+        f"[{c['id']}] Client: {c['client_name']} ({c['client_email']}) | "
+        f"Commercial: {c['commercial_name']} | Montant total: {c['amount_total']} | "
+        f"Restant: {c['amount_remaining']} | Date création: {c['created_date']} | "
+        f"Signé: {'Oui' if c['signed'] else 'Non'}"
+    )
 
-        contract_id = click.prompt("\nID du contrat à supprimer", type=int)
 
-        if contract_id not in contracts_data:
-            click.echo("Contrat non trouvé.")
+@click.command("delete")
+@click.option('--search', type=str, default=None,
+              help="Filtre initial des contrats (nom, email ou entreprise du client)")
+def delete_contract_cmd(search):
+    """
+    Commande pour supprimer un contrat (uniquement si aucun événement lié).
+    """
+    try:
+        choice = pick(
+            lambda text, limit, after: pick_contracts(search=text, limit=limit, after=after),
+            format_contract_line, "contrats", search=search,
+        )
+        if choice is None:
+            click.echo("Sélection annulée.")
             return
+        contract_id, _ = choice
 
         confirm = click.confirm("Voulez-vous vraiment supprimer ce contrat ?", default=False)
         if not confirm:
@@ -233,9 +277,89 @@ def delete_contract_cmd():
         click.echo(f"Erreur : {str(e)}")
 
 
+def read_ids(ids, ids_file):
+    """
+    Réunit les IDs passés par --ids et par --ids-file.
+
+    Raises:
+        click.UsageError: Si aucun ID n'est fourni.
+    """
+    text = " ".join(part for part in (ids, ids_file.read() if ids_file else None) if part)
+    contract_ids = parse_ids(text, limit=BULK_MAX_IDS)
+    if not contract_ids:
+        raise click.UsageError("Indiquez des IDs de contrats (--ids ou --ids-file).")
+    return contract_ids
+
+
+def echo_bulk_result(result, action):
+    """
+    Affiche le résultat d'une opération en masse : IDs traités puis motif de chaque rejet.
+    """
+    updated = result["updated"]
+    click.echo(f"{len(updated)} contrat(s) {action} : {', '.join(map(str, updated)) or 'aucun'}.")
+    if result["rejected"]:
+        click.echo(f"{len(result['rejected'])} contrat(s) rejeté(s) :")
+        for contract_id, reason in result["rejected"].items():
+            click.echo(f"  [{contract_id}] {reason}")
+
+
+@click.command("sign")
+@click.option('--ids', type=str, default=None,
+              help="IDs des contrats, séparés par des virgules (plages acceptées : 10-20)")
+@click.option('--ids-file', type=click.File("r"), default=None,
+              help="Fichier d'IDs (un par ligne, ou '-' pour l'entrée standard)")
+def sign_contracts_cmd(ids, ids_file):
+    """
+    Signe un lot de contrats en une seule requête.
+
+    Un commercial ne peut signer que ses propres contrats ; les contrats introuvables,
+    d'un autre commercial ou déjà signés sont rejetés avec leur motif.
+
+    Args:
+        ids (str | None): IDs des contrats (virgules, plages).
+        ids_file (File | None): Fichier d'IDs.
+    """
+    contract_ids = read_ids(ids, ids_file)
+    try:
+        echo_bulk_result(sign_contracts(contract_ids), "signé(s)")
+    except Exception as e:
+        click.echo(f"Erreur lors de la signature : {e}")
+
+
+@click.command("bulk-update")
+@click.option('--ids', type=str, default=None,
+              help="IDs des contrats, séparés par des virgules (plages acceptées : 10-20)")
+@click.option('--ids-file', type=click.File("r"), default=None,
+              help="Fichier d'IDs (un par ligne, ou '-' pour l'entrée standard)")
+@click.option('--amount-total', type=float, default=None, help="Nouveau montant total")
+@click.option('--amount-remaining', type=float, default=None, help="Nouveau montant restant")
+@click.option('--signed', type=click.Choice(['oui', 'non'], case_sensitive=False),
+              default=None, help="Statut de signature des contrats ('oui' ou 'non')")
+def bulk_update_contracts_cmd(ids, ids_file, amount_total, amount_remaining, signed):
+    """
+    Applique les mêmes valeurs à un lot de contrats en une seule requête.
+
+    Args:
+        ids (str | None): IDs des contrats (virgules, plages).
+        ids_file (File | None): Fichier d'IDs.
+        amount_total (float, optional): Nouveau montant total.
+        amount_remaining (float, optional): Nouveau montant restant.
+        signed (str, optional): Nouveau statut de signature ('oui' ou 'non').
+    """
+    contract_ids = read_ids(ids, ids_file)
+    try:
+        result = bulk_update_contracts(contract_ids, amount_total=amount_total,
+                                       amount_remaining=amount_remaining, signed=signed)
+        echo_bulk_result(result, "mis à jour")
+    except Exception as e:
+        click.echo(f"Erreur lors de la mise à jour : {e}")
+
+
 # Enregistrement des sous-commandes dans le groupe principal
 contract_cli.add_command(create_contract_cmd)
 contract_cli.add_command(list_contracts_cmd)
 contract_cli.add_command(list_unsigned_contracts_cmd)
 contract_cli.add_command(update_contract_cmd)
 contract_cli.add_command(delete_contract_cmd)
+contract_cli.add_command(sign_contracts_cmd)
+contract_cli.add_command(bulk_update_contracts_cmd)
@@ -0,0 +1,50 @@
+# Commandes du tableau de bord
+import click
+
+from controllers.dashboard_controller import get_dashboard, rebuild_dashboard, DASHBOARD_GROUPS
+
+
+@click.group()
+def dashboard_cli():
+    """
+    Tableau de bord des contrats et événements, lu depuis les tables d'agrégats.
+
+    Ce groupe permet :
+    - show : afficher les indicateurs par commercial ou par mois
+    - rebuild : recalculer les agrégats à partir des contrats et des événements
+    """
+    pass
+
+
+@dashboard_cli.command("show")
+@click.option('--by', 'group_by', type=click.Choice(DASHBOARD_GROUPS), default="sales_contact",
+              show_default=True, help="Regroupement : commercial ou mois")
+@click.option('--limit', type=click.IntRange(min=1), default=None,
+              help="Nombre maximum de lignes à afficher")
+def show_dashboard_cmd(group_by, limit):
+    """
+    Commande pour afficher le nombre de contrats, les montants et le nombre d'événements.
+    """
+    try:
+        for row in get_dashboard(group_by=group_by, limit=limit):
+            click.echo(
+                f"{row['label']} | Contrats: {row['contracts']} | Montant total: {row['amount_total']:.2f} | "
+                f"Restant: {row['amount_remaining']:.2f} | Événements: {row['events']}"
+            )
+    except Exception as e:
+        click.echo(f"Erreur : {e}")
+
+
+@dashboard_cli.command("rebuild")
+def rebuild_dashboard_cmd():
+    """
+    Commande pour recalculer les agrégats du tableau de bord.
+    """
+    try:
+        counts = rebuild_dashboard()
+        click.echo(
+            f"Agrégats recalculés : {counts['rollup_sales_contact']} commercial(aux), "
+            f"{counts['rollup_monthly']} mois."
+        )
+    except Exception as e:
+        click.echo(f"Erreur : {e}")
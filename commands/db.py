@@ -0,0 +1,40 @@
+# Commandes d'administration de la base de données
+import click
+
+from utils.schema import init_db, upgrade_db, SCHEMA_VERSION
+
+
+@click.group()
+def db_cli():
+    """
+    Commandes d'administration de la base de données.
+
+    Ce groupe permet :
+    - init : créer les tables et les départements par défaut
+    - upgrade : mettre à jour le schéma d'une base existante
+    """
+    pass
+
+
+@db_cli.command("init")
+def init_db_cmd():
+    """
+    Commande pour initialiser la base de données.
+    """
+    try:
+        init_db()
+        click.echo(f"Base de données initialisée (schéma version {SCHEMA_VERSION}).")
+    except Exception as e:
+        click.echo(f"Erreur lors de l'initialisation : {e}")
+
+
+@db_cli.command("upgrade")
+def upgrade_db_cmd():
+    """
+    Commande pour mettre à jour le schéma de la base de données.
+    """
+    try:
+        upgrade_db()
+        click.echo(f"Schéma mis à jour (version {SCHEMA_VERSION}).")
+    except Exception as e:
+        click.echo(f"Erreur lors de la mise à jour du schéma : {e}")
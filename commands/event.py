@@ -1,4 +1,6 @@
 # Commandes événements
+from datetime import date, datetime
+
 import click
 
 from controllers.event_controller import (
@@ -6,12 +8,20 @@ from controllers.event_controller import (
     assign_support,
     update_my_event,
     list_events,
+    iter_events,
     list_unassigned_events,
     list_my_events,
     delete_event,
-    list_signed_contracts,
-    list_support_users
+    list_schedule_conflicts,
+    auto_assign_events,
+    pick_events,
+    pick_support_users
 )
+from controllers.contract_controller import pick_contracts
+from commands.contract import format_contract_line
+from utils.cli import echo_stream
+from utils.pagination import next_page_hint
+from utils.picker import pick
 
 
 @click.group()
@@ -26,6 +36,8 @@ def event_cli():
     - list : affichage de tous les événements
     - list-unassigned : affichage des événements non assignés
     - list-my-events : affichage des événements assignés à l'utilisateur courant
+    - conflicts : chevauchements de planning (support) ou de réservation (lieu)
+    - auto-assign : affectation automatique des événements non assignés d'une période
     - delete : suppression d'un événement
     """
     pass
@@ -47,7 +59,11 @@ def event():
 @click.option('--location', type=str, help="Lieu")
 @click.option('--attendees', type=int, help="Nombre de participants")
 @click.option('--notes', type=str, help="Notes")
-def create_event_cmd(name, date_start, date_end, location, attendees, notes):
+@click.option('--allow-overlap', is_flag=True, default=False,
+              help="Accepter un chevauchement de planning ou de lieu (avertissement seulement)")
+@click.option('--search', type=str, default=None,
+              help="Filtre initial des contrats (nom, email ou entreprise du client)")
+def create_event_cmd(name, date_start, date_end, location, attendees, notes, allow_overlap, search):
     """
     Commande pour créer un nouvel événement.
 
@@ -60,27 +76,16 @@ def create_event_cmd(name, date_start, date_end, location, attendees, notes):
         notes (str): Notes complémentaires sur l'événement.
     """
     try:
-        # Affiche la liste des contrats signés
-        contracts_data = list_signed_contracts()
-
-        lines = [
-            (
-                f"{c['id']} | Client: {c['client_name']} ({c['client_email']}) | "
-                f"Commercial: {c['commercial_name']} | Montant: {c['amount_total']} | "
-                f"Signé le: {c['signed_date']}"
-            )
-            for c in contracts_data.values()
-        ]
-
-        message = "\n".join(lines)
-        click.echo(message)
-
-        contract_id = click.prompt("\nID du contrat", type=int)
-
-        # Validation du contrat
-        if contract_id not in contracts_data:
-            click.echo("Contrat non trouvé.")
+        # Contrats signés du commercial connecté (règle de create_event) : seule la page affichée est lue
+        choice = pick(
+            lambda text, limit, after: pick_contracts(search=text, limit=limit, after=after, signed=True,
+                                                      mine=True),
+            format_contract_line, "contrats signés", search=search,
+        )
+        if choice is None:
+            click.echo("Sélection annulée.")
             return
+        contract_id, _ = choice
 
         # Prompts pour les autres champs
         if name is None:
@@ -101,7 +106,8 @@ def create_event_cmd(name, date_start, date_end, location, attendees, notes):
         if notes is None:
             notes = click.prompt("Notes", type=str)
 
-        result = create_event(contract_id, name, date_start, date_end, location, attendees, notes)
+        result = create_event(contract_id, name, date_start, date_end, location, attendees, notes,
+                              allow_overlap=allow_overlap)
         click.echo(result)
 
     except Exception as e:
@@ -110,7 +116,11 @@ def create_event_cmd(name, date_start, date_end, location, attendees, notes):
 
 @click.command("assign-support")
 @click.option('--support-email', type=str, help="Email du support à assigner")
-def assign_support_cmd(support_email):
+@click.option('--allow-overlap', is_flag=True, default=False,
+              help="Accepter un chevauchement de planning ou de lieu (avertissement seulement)")
+@click.option('--search', type=str, default=None,
+              help="Filtre initial des événements (nom ou lieu)")
+def assign_support_cmd(support_email, allow_overlap, search):
     """
     Commande pour affecter un événement à un membre du support.
 
@@ -118,34 +128,27 @@ def assign_support_cmd(support_email):
         support_email (str): Adresse email du membre du support.
     """
     try:
-        # Affiche la liste des événements non assignés
-        events_data = list_unassigned_events()
-
-        lines = [f"[{e['id']}] {e['name']} | Début: {e['date_start']} | Fin: {e['date_end']} | "
-                 f"Lieu: {e['location']} | Participants: {e['attendees']}"
-                 for e in events_data.values()]
-        message = "\n".join(lines)
-        click.echo(message)
-
-        event_id = click.prompt("\nID de l'événement", type=int)
-
-        if event_id not in events_data:
-            click.echo("Événement non trouvé.")
+        choice = pick(
+            lambda text, limit, after: pick_events(search=text, limit=limit, after=after, unassigned=True),
+            format_event_line, "événements non assignés", search=search,
+        )
+        if choice is None:
+            click.echo("Sélection annulée.")
             return
+        event_id, _ = choice
 
         if support_email is None:
-            # Affiche la liste des utilisateurs support
-            click.echo("\nUtilisateurs support disponibles :")
-            support_users = list_support_users()
-
-            support_lines = [f"{u['email']} | {u['name']}"
-                             for u in support_users.values()]
-            support_message = "\n".join(support_lines)
-            click.echo(support_message)
-
-            support_email = click.prompt("Email du support à assigner", type=str)
+            click.echo("\nUtilisateurs support :")
+            support = pick(
+                lambda text, limit, after: pick_support_users(search=text, limit=limit, after=after),
+                format_support_line, "utilisateurs support",
+            )
+            if support is None:
+                click.echo("Sélection annulée.")
+                return
+            support_email = support[1]["email"]
 
-        result = assign_support(event_id, support_email)
+        result = assign_support(event_id, support_email, allow_overlap=allow_overlap)
         click.echo(result)
 
     except Exception as e:
@@ -158,7 +161,11 @@ def assign_support_cmd(support_email):
 @click.option('--location', type=str, default=None, help="Nouveau lieu")
 @click.option('--attendees', type=int, default=None, help="Nombre de participants")
 @click.option('--notes', type=str, default=None, help="Notes")
-def update_my_event_cmd(date_start, date_end, location, attendees, notes):
+@click.option('--allow-overlap', is_flag=True, default=False,
+              help="Accepter un chevauchement de planning ou de lieu (avertissement seulement)")
+@click.option('--search', type=str, default=None,
+              help="Filtre initial des événements (nom ou lieu)")
+def update_my_event_cmd(date_start, date_end, location, attendees, notes, allow_overlap, search):
     """
     Commande pour mettre à jour un événement assigné à l'utilisateur courant.
 
@@ -170,22 +177,14 @@ def update_my_event_cmd(date_start, date_end, location, attendees, notes):
         notes (str, optional): Nouvelles notes.
     """
     try:
-        # Affiche la liste des événements assignés à l'utilisateur
-        events_data = list_my_events()
-
-        lines = [f"[{e['id']}] {e['name']} | Début: {e['date_start']} | Fin: {e['date_end']} | "
-                 f"Lieu: {e['location']} | Participants: {e['attendees']}"
-                 for e in events_data.values()]
-        message = "\n".join(lines)
-        click.echo(message)
-
-        event_id = click.prompt("\nID de l'événement à modifier", type=int)
-
-        if event_id not in events_data:
-            click.echo("Événement non trouvé.")
+        choice = pick(
+            lambda text, limit, after: pick_events(search=text, limit=limit, after=after, mine=True),
+            format_event_line, "événements qui vous sont assignés", search=search,
+        )
+        if choice is None:
+            click.echo("Sélection annulée.")
             return
-
-        event_defaults = events_data[event_id]
+        event_id, event_defaults = choice
 
         # Prompts avec valeurs par défaut
         if date_start is None:
@@ -206,7 +205,8 @@ def update_my_event_cmd(date_start, date_end, location, attendees, notes):
         if notes is None:
             notes = click.prompt("Notes", type=str, default=event_defaults["notes"])
 
-        result = update_my_event(event_id, date_start, date_end, location, attendees, notes)
+        result = update_my_event(event_id, date_start, date_end, location, attendees, notes,
+                                 allow_overlap=allow_overlap)
         click.echo(result)
 
     except Exception as e:
@@ -214,85 +214,183 @@ def update_my_event_cmd(date_start, date_end, location, attendees, notes):
 
 
 @event_cli.command("list")
-def list_events_cmd():
+@click.option('--limit', type=click.IntRange(min=1), default=None,
+              help="Nombre maximum d'événements à afficher")
+@click.option('--after', type=click.IntRange(min=0), default=None,
+              help="N'afficher que les événements dont l'ID est supérieur à cette valeur (page suivante)")
+@click.option('--stream', is_flag=True, default=False,
+              help="Afficher les lignes au fil de l'eau (lecture par lots, mémoire constante)")
+def list_events_cmd(limit, after, stream):
     """
     Commande pour afficher tous les événements.
     """
     try:
-        events_data = list_events()
+        if stream:
+            echo_stream(iter_events(limit=limit, after=after), format_event_line, "Aucun événement trouvé.")
+            return
 
-        lines = [f"[{e['id']}] {e['name']} | Début: {e['date_start']} | Fin: {e['date_end']} | "
-                 f"Lieu: {e['location']} | Participants: {e['attendees']} | "
-                 f"Support: {e['support_contact_id'] or 'Non assigné'}"
-                 for e in events_data.values()]
+        events_data = list_events(limit=limit, after=after)
+
+        lines = [format_event_line(e) for e in events_data.values()]
         message = "\n".join(lines)
         click.echo(message)
+        hint = next_page_hint(events_data, limit)
+        if hint:
+            click.echo(hint)
 
     except Exception as e:
         click.echo(f"Erreur : {e}")
 
 
+def format_event_line(e):
+    """
+    Formate un événement pour la commande de liste.
+    """
+    return (f"[{e['id']}] {e['name']} | Début: {e['date_start']} | Fin: {e['date_end']} | "
+            f"Lieu: {e['location']} | Participants: {e['attendees']} | "
+            f"Support: {e['support_contact_id'] or 'Non assigné'}")
+
+
+def format_support_line(u):
+    """
+    Formate un utilisateur du support pour le sélecteur.
+    """
+    return f"[{u['id']}] {u['name']} | {u['email']}"
+
+
 @event_cli.command("list-unassigned")
-def list_unassigned_events_cmd():
+@click.option('--limit', type=click.IntRange(min=1), default=None,
+              help="Nombre maximum d'événements à afficher")
+@click.option('--after', type=click.IntRange(min=0), default=None,
+              help="N'afficher que les événements dont l'ID est supérieur à cette valeur (page suivante)")
+def list_unassigned_events_cmd(limit, after):
     """
     Commande pour afficher les événements qui n'ont pas encore de membre du support assigné.
     """
     try:
-        events_data = list_unassigned_events()
+        events_data = list_unassigned_events(limit=limit, after=after)
 
         lines = [f"[{e['id']}] {e['name']} | Début: {e['date_start']} | Fin: {e['date_end']} | "
                  f"Lieu: {e['location']} | Participants: {e['attendees']}"
                  for e in events_data.values()]
         message = "\n".join(lines)
         click.echo(message)
+        hint = next_page_hint(events_data, limit)
+        if hint:
+            click.echo(hint)
 
     except Exception as e:
         click.echo(f"Erreur : {e}")
 
 
 @event_cli.command("list-my-events")
-def list_my_events_cmd():
+@click.option('--limit', type=click.IntRange(min=1), default=None,
+              help="Nombre maximum d'événements à afficher")
+@click.option('--after', type=click.IntRange(min=0), default=None,
+              help="N'afficher que les événements dont l'ID est supérieur à cette valeur (page suivante)")
+def list_my_events_cmd(limit, after):
     """
     Commande pour afficher uniquement les événements assignés à l'utilisateur courant.
     """
     try:
-        events_data = list_my_events()
+        events_data = list_my_events(limit=limit, after=after)
 
         lines = [f"[{e['id']}] {e['name']} | Début: {e['date_start']} | Fin: {e['date_end']} | "
                  f"Lieu: {e['location']} | Participants: {e['attendees']}"
                  for e in events_data.values()]
         message = "\n".join(lines)
         click.echo(message)
+        hint = next_page_hint(events_data, limit)
+        if hint:
+            click.echo(hint)
 
     except Exception as e:
         click.echo(f"Erreur : {e}")
 
 
-@event_cli.command("delete")
-def delete_event_cmd():
+@event_cli.command("conflicts")
+@click.option('--by', type=click.Choice(["support", "location"]), default="support", show_default=True,
+              help="Chevauchements de planning d'un support, ou doubles réservations d'un lieu")
+@click.option('--limit', type=click.IntRange(min=1), default=None,
+              help="Nombre maximum de conflits à afficher")
+def list_conflicts_cmd(by, limit):
     """
-    Commande pour supprimer un événement existant.
-    L'utilisateur doit sélectionner l'ID dans la liste affichée.
+    Commande pour lister les événements qui se chevauchent pour un même support ou un même lieu.
     """
     try:
-        # Affiche tous les événements pour aider au choix
-        events_data = list_events()
+        conflicts = list_schedule_conflicts(by=by, limit=limit)
+        if not conflicts:
+            click.echo("Aucun chevauchement trouvé.")
+            return
+        for c in conflicts:
+            first, second = c["first"], c["second"]
+            click.echo(
+                f"{c['key']} | [{first['id']}] {first['name']} ({first['date_start']:%Y-%m-%d %H:%M} → "
+                f"{first['date_end']:%Y-%m-%d %H:%M}) chevauche [{second['id']}] {second['name']} "
+                f"({second['date_start']:%Y-%m-%d %H:%M} → {second['date_end']:%Y-%m-%d %H:%M})"
+            )
+    except Exception as e:
+        click.echo(f"Erreur : {e}")
 
-        lines = [f"[{e['id']}] {e['name']} | Début: {e['date_start']} | Fin: {e['date_end']} | "
-                 f"Lieu: {e['location']} | Participants: {e['attendees']}"
-                 for e in events_data.values()]
-        message = "\n".join(lines)
-        click.echo(message)
 
-        event_id = click.prompt("\nID de l'événement à supprimer", type=int)
+@event_cli.command("auto-assign")
+@click.option('--from', 'date_from', type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Début de la période (YYYY-MM-DD, aujourd'hui par défaut)")
+@click.option('--to', 'date_to', type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Fin de la période, exclue (YYYY-MM-DD, sans limite par défaut)")
+@click.option('--dry-run', is_flag=True, default=False,
+              help="Afficher le plan d'affectation sans l'enregistrer")
+def auto_assign_cmd(date_from, date_to, dry_run):
+    """
+    Commande pour assigner automatiquement un support à chaque événement non assigné de la période.
+    """
+    if date_from is None:
+        date_from = datetime.combine(date.today(), datetime.min.time())
+    try:
+        result = auto_assign_events(date_from=date_from, date_to=date_to, dry_run=dry_run)
+        for a in result["assignments"]:
+            click.echo(
+                f"[{a['event_id']}] {a['event_name']} ({a['date_start']:%Y-%m-%d %H:%M} → "
+                f"{a['date_end']:%Y-%m-%d %H:%M}) → {a['support_name']} (ID {a['support_id']})"
+            )
+        for u in result["unassigned"]:
+            click.echo(
+                f"[{u['event_id']}] {u['event_name']} ({u['date_start']:%Y-%m-%d %H:%M} → "
+                f"{u['date_end']:%Y-%m-%d %H:%M}) → aucun support disponible"
+            )
+        count = len(result["assignments"])
+        if dry_run:
+            click.echo(f"Simulation : {count} événement(s) seraient assignés, rien n'a été enregistré.")
+        else:
+            click.echo(f"{count} événement(s) assigné(s).")
+        if result["unassigned"]:
+            click.echo(f"{len(result['unassigned'])} événement(s) restent sans support.")
+    except Exception as e:
+        click.echo(f"Erreur : {e}")
+
 
-        if event_id not in events_data:
-            click.echo("Événement non trouvé.")
+@event_cli.command("delete")
+@click.option('--search', type=str, default=None,
+              help="Filtre initial des événements (nom ou lieu)")
+def delete_event_cmd(search):
+    """
+    Commande pour supprimer un événement existant.
+    L'utilisateur doit sélectionner l'ID dans la liste affichée.
+    """
+    try:
+        # Événements liés aux contrats du commercial connecté (règle de delete_event)
+        choice = pick(
+            lambda text, limit, after: pick_events(search=text, limit=limit, after=after, mine=True),
+            format_event_line, "événements de vos contrats", search=search,
+        )
+        if choice is None:
+            click.echo("Sélection annulée.")
             return
+        event_id, event = choice
 
         if not click.confirm(
                 f"Êtes-vous sûr de vouloir supprimer l'événement '"
-                f"{events_data[event_id]['name']}' ? Cette action est irréversible."):
+                f"{event['name']}' ? Cette action est irréversible."):
             click.echo("Suppression annulée.")
             return
 
@@ -0,0 +1,27 @@
+# Commande d'export
+import click
+
+from controllers.export_controller import export_rows, EXPORTS, EXPORT_FORMATS
+
+
+@click.command("export")
+@click.argument("entity", type=click.Choice(list(EXPORTS)))
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default="csv", show_default=True,
+              help="Format de sortie")
+@click.option('--output', '-o', type=click.Path(dir_okay=False), default="-",
+              help="Fichier de sortie (sortie standard par défaut)")
+@click.option('--copy', 'use_copy', is_flag=True, default=False,
+              help="Utiliser COPY TO STDOUT (PostgreSQL, CSV uniquement, valeurs brutes)")
+def export_cmd(entity, fmt, output, use_copy):
+    """
+    Commande pour exporter les clients, contrats ou événements en CSV ou NDJSON.
+
+    Les lignes sont lues et écrites au fil de l'eau, sans charger la table en mémoire.
+    """
+    try:
+        with click.open_file(output, "w", encoding="utf-8") as f:
+            count = export_rows(entity, f, fmt=fmt, use_copy=use_copy)
+        if output != "-" and count is not None:
+            click.echo(f"{count} ligne(s) exportée(s) dans {output}.")
+    except Exception as e:
+        click.echo(f"Erreur lors de l'export : {e}", err=True)
@@ -0,0 +1,66 @@
+# Commandes de politique de hash des mots de passe
+import click
+
+from utils.password_policy import (
+    DEFAULT_TARGET_MS, MIN_ROUNDS, MAX_ROUNDS, POLICY_FILE,
+    calibrate, load_policy, save_policy
+)
+
+
+@click.group()
+def password_cli():
+    """
+    Commandes liées au hash des mots de passe.
+
+    Ce groupe permet :
+    - calibrate : choisir le coût bcrypt selon la durée de connexion visée sur cette machine
+    - policy : afficher la politique en vigueur
+    """
+    pass
+
+
+@password_cli.command("calibrate")
+@click.option('--target-ms', type=float, default=DEFAULT_TARGET_MS, show_default=True,
+              help="Durée visée d'un hash de mot de passe (et donc d'une connexion), en millisecondes")
+@click.option('--min-rounds', type=click.IntRange(MIN_ROUNDS, MAX_ROUNDS), default=MIN_ROUNDS,
+              show_default=True, help="Coût bcrypt minimal accepté")
+@click.option('--max-rounds', type=click.IntRange(MIN_ROUNDS, MAX_ROUNDS), default=MAX_ROUNDS,
+              show_default=True, help="Coût bcrypt maximal essayé")
+@click.option('--samples', type=click.IntRange(1), default=3, show_default=True,
+              help="Nombre de mesures par coût")
+@click.option('--dry-run', is_flag=True, default=False, help="Afficher le résultat sans l'enregistrer")
+def calibrate_cmd(target_ms, min_rounds, max_rounds, samples, dry_run):
+    """
+    Commande pour calibrer le coût bcrypt sur la machine courante.
+
+    Les mots de passe hashés avec un autre coût sont hashés à nouveau à la connexion suivante.
+    """
+    try:
+        if min_rounds > max_rounds:
+            raise Exception("--min-rounds doit être inférieur ou égal à --max-rounds.")
+        previous = load_policy()["rounds"]
+        policy = calibrate(target_ms, min_rounds, max_rounds, samples)
+        click.echo(f"Coût retenu : {policy['rounds']} ({policy['measured_ms']} ms par hash, "
+                   f"cible {target_ms:g} ms).")
+        if policy["measured_ms"] > target_ms:
+            click.echo(f"Attention : même le coût minimal ({min_rounds}) dépasse la cible.")
+        if dry_run:
+            return
+        save_policy(policy)
+        click.echo(f"Politique enregistrée dans {POLICY_FILE} (coût précédent : {previous}).")
+    except Exception as e:
+        click.echo(f"Erreur lors de la calibration : {e}")
+
+
+@password_cli.command("policy")
+def policy_cmd():
+    """
+    Commande pour afficher la politique de hash en vigueur.
+    """
+    policy = load_policy()
+    if "calibrated_at" not in policy:
+        click.echo(f"Coût bcrypt : {policy['rounds']} (par défaut, aucune calibration).")
+        return
+    click.echo(f"Coût bcrypt : {policy['rounds']} ({policy['measured_ms']} ms par hash, "
+               f"cible {policy['target_ms']:g} ms), calibré le {policy['calibrated_at']} "
+               f"sur {policy['host']}.")
@@ -0,0 +1,93 @@
+# Commande de génération de données de test
+import click
+
+from utils.auth_utils import require_role
+from utils.seed import (
+    SCALES, SEED_BATCH_SIZE, generate_seed_password, is_empty_database, seed_database, tune_for_bulk_load
+)
+
+
+@require_role("gestion")
+def authorize_seed():
+    """
+    Une base qui contient déjà des utilisateurs ne reçoit des données synthétiques
+    que d'un utilisateur du département gestion.
+    """
+
+
+@click.command("seed")
+@click.option('--scale', type=click.Choice(list(SCALES)), default=None,
+              help="Volumes prédéfinis (les options ci-dessous les remplacent)")
+@click.option('--users', type=click.IntRange(min=0), default=None, help="Nombre d'utilisateurs à créer")
+@click.option('--clients', type=click.IntRange(min=0), default=None, help="Nombre de clients à créer")
+@click.option('--contracts', type=click.IntRange(min=0), default=None, help="Nombre de contrats à créer")
+@click.option('--events', type=click.IntRange(min=0), default=None, help="Nombre d'événements à créer")
+@click.option('--seed', 'seed', type=int, default=0, show_default=True,
+              help="Graine du générateur (données reproductibles)")
+@click.option('--batch-size', type=click.IntRange(min=1), default=SEED_BATCH_SIZE, show_default=True,
+              help="Nombre de lignes insérées par transaction")
+@click.option('--yes', is_flag=True, default=False,
+              help="Confirmer l'ajout de données synthétiques dans une base qui contient déjà des données")
+def seed_cmd(scale, users, clients, contracts, events, seed, batch_size, yes):
+    """
+    Commande pour générer un jeu de données synthétique (tests de charge).
+
+    Les données respectent les contraintes du modèle (commerciaux, contrats signés
+    avant les événements, supports du département support, dates cohérentes) et sont
+    insérées en masse (COPY sous PostgreSQL). La base doit être initialisée (db init).
+
+    Sur une base qui contient déjà des utilisateurs, la commande exige un utilisateur
+    gestion connecté et une confirmation (ou --yes), et garde la durabilité normale des
+    écritures. Les utilisateurs générés reçoivent un mot de passe aléatoire, affiché à la fin.
+    """
+    from utils.connection import engine
+
+    volumes = dict(SCALES[scale]) if scale else {"users": 0, "clients": 0, "contracts": 0, "events": 0}
+    for name, value in (("users", users), ("clients", clients), ("contracts", contracts), ("events", events)):
+        if value is not None:
+            volumes[name] = value
+    if not any(volumes.values()):
+        click.echo("Rien à générer : indiquez --scale ou au moins un volume (--users, --clients...).")
+        return
+
+    current = {"table": None}
+
+    def progress(table, count):
+        # Une ligne par table, mise à jour à chaque lot
+        if current["table"] not in (None, table):
+            click.echo("", err=True)
+        current["table"] = table
+        click.echo(f"\r{table} : {count} ligne(s)", nl=False, err=True)
+
+    try:
+        with engine.connect() as connection:
+            empty = is_empty_database(connection)
+        if not empty:
+            authorize_seed()
+            target = engine.url.render_as_string(hide_password=True)
+            if not yes and not click.confirm(
+                    f"La base {target} contient déjà des données. Y ajouter des données synthétiques ?",
+                    default=False):
+                click.echo("Génération annulée.")
+                return
+
+        password = generate_seed_password() if volumes["users"] else None
+        password_hash = None
+        if password:
+            from utils.auth import hash_password
+
+            password_hash = hash_password(password)
+
+        with engine.connect() as connection:
+            # Durabilité allégée uniquement pour remplir une base vide (rien à perdre)
+            if empty:
+                tune_for_bulk_load(connection)
+            counts = seed_database(connection, seed=seed, batch_size=batch_size, password_hash=password_hash,
+                                   progress=progress, **volumes)
+        click.echo("", err=True)
+        click.echo("Données générées : " + ", ".join(f"{count} {table}" for table, count in counts.items()))
+        if counts.get("users"):
+            click.echo(f"Mot de passe des utilisateurs générés : {password}")
+    except Exception as e:
+        click.echo("", err=True)
+        click.echo(f"Erreur lors de la génération des données : {e}")
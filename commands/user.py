@@ -4,10 +4,9 @@ import click
 from controllers.user_controller import (
     create_user,
     update_user,
-    delete_user, list_departments, list_users
+    delete_user, department_choices, list_departments, list_users, import_users
 )
-from models.department import Department
-from utils.auth import session
+from utils.pagination import next_page_hint
 
 
 @click.group()
@@ -20,6 +19,7 @@ def user_cli():
     - la mise à jour d'un utilisateur existant
     - la suppression d'un utilisateur
     - la liste des utilisateurs
+    - l'import en masse d'utilisateurs
     """
     pass
 
@@ -86,10 +86,11 @@ def update_user_cmd(name, password, department_id):
 
         if department_id is None:
             click.echo("Départements disponibles :")
-            for dept in session.query(Department).all():
-                click.echo(f"{dept.id} - {dept.name}")
-            default_dep_id = next((d.id for d in session.query(Department).all()
-                                   if d.name == user_defaults["department_name"]), None)
+            departments = department_choices()
+            for dept in departments:
+                click.echo(f"{dept['id']} - {dept['name']}")
+            default_dep_id = next((d["id"] for d in departments
+                                   if d["name"] == user_defaults["department_name"]), None)
             department_id = click.prompt("Département (id)", type=int, default=default_dep_id)
 
         user = update_user(email, name, password, department_id)
@@ -125,26 +126,59 @@ def delete_user_cmd():
     except Exception as e:
         click.echo(f"Erreur lors de la suppression : {e}")
 
+
 @click.command("list")
-def list_users_cmd():
+@click.option('--limit', type=click.IntRange(min=1), default=None,
+              help="Nombre maximum d'utilisateurs à afficher")
+@click.option('--after', type=str, default=None,
+              help="N'afficher que les utilisateurs dont l'email suit celui-ci (page suivante)")
+def list_users_cmd(limit, after):
     """
     Commande pour afficher tous les utilisateurs existants.
     """
     try:
-        users_data = list_users()
+        users_data = list_users(limit=limit, after=after)
 
         lines = [f"[{u['id']}] Nom: {u['name']} | Email: {u['email']} | "
                  f"Département: {u['department_name']}"
                  for u in users_data.values()]
         message = "\n".join(lines)
         click.echo(message)
+        hint = next_page_hint(users_data, limit, key="email")
+        if hint:
+            click.echo(hint)
 
     except Exception as e:
         click.echo(f"Erreur : {e}")
 
 
+@click.command("import")
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help="Format du fichier (déduit de l'extension par défaut)")
+@click.option('--reject-file', type=click.Path(dir_okay=False), default=None,
+              help="Fichier CSV des lignes rejetées (par défaut FILE.rejects.csv)")
+@click.option('--batch-size', type=int, default=500, show_default=True,
+              help="Nombre d'utilisateurs hashés et insérés par transaction")
+@click.option('--workers', type=int, default=None,
+              help="Nombre de processus de hash des mots de passe (par défaut : nombre de CPU)")
+def import_users_cmd(file, fmt, reject_file, batch_size, workers):
+    """
+    Commande pour créer en masse des utilisateurs depuis un fichier CSV ou JSONL
+    (colonnes name, email, password, department : ID ou nom du département).
+    """
+    try:
+        result = import_users(file, reject_path=reject_file, fmt=fmt, batch_size=batch_size, workers=workers)
+        click.echo(f"{result['imported']} utilisateur(s) importé(s), {result['rejected']} rejeté(s).")
+        if result["reject_path"]:
+            click.echo(f"Lignes rejetées : {result['reject_path']}")
+    except Exception as e:
+        click.echo(f"Erreur lors de l'import : {e}")
+
+
 # Enregistrement des commandes dans le groupe principal
 user_cli.add_command(create_user_cmd)
 user_cli.add_command(update_user_cmd)
 user_cli.add_command(delete_user_cmd)
 user_cli.add_command(list_users_cmd)
+user_cli.add_command(import_users_cmd)
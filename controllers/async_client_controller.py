@@ -0,0 +1,172 @@
+from sqlalchemy import select, exists
+from models.client import Client
+from models.contract import Contract
+from models.user import User
+from controllers.client_controller import validate_email, validate_phone, client_to_dict
+from utils.async_connection import async_session_scope
+from utils.auth_utils import require_role
+from utils.pagination import keyset_paginate
+from utils.telemetry import audit
+from utils.cache import invalidates
+
+# Variante asynchrone (AsyncSession) de controllers.client_controller : mêmes règles métier,
+# mais chaque opération ouvre sa propre session au lieu de partager une session de module.
+
+
+@require_role("commercial")
+@invalidates("clients")
+async def create_client(name, email, phone, company, db_session=None, current_user=None):
+    """
+    Crée un nouveau client et l'associe au commercial connecté.
+
+    Args:
+        name (str): Nom du client.
+        email (str): Adresse email.
+        phone (str): Numéro de téléphone.
+        company (str): Nom de l'entreprise.
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        str: Message de succès.
+
+    Raises:
+        Exception: En cas d'erreur lors de la création.
+    """
+    try:
+        validate_email(email)
+        validate_phone(phone)
+
+        async with async_session_scope(db_session) as session:
+            session.add(Client(
+                name=name,
+                email=email,
+                phone=phone,
+                company=company,
+                sales_contact_id=current_user.id
+            ))
+            await session.commit()
+
+        audit("client_created", client=email, by=current_user.email)
+        return "Client créé avec succès."
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la création du client : {e}")
+
+
+@require_role("commercial", "gestion", "support")
+async def list_clients(limit=None, after=None, db_session=None):
+    """
+    Retourne la liste des clients sous forme de dictionnaire (voir client_controller.list_clients).
+
+    Args:
+        limit (int | None): Nombre maximum de clients à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+    """
+    try:
+        query = (
+            select(Client, User.name)
+            .outerjoin(User, Client.sales_contact_id == User.id)
+        )
+        async with async_session_scope(db_session) as session:
+            rows = (await session.execute(keyset_paginate(query, Client.id, limit, after))).all()
+        if not rows:
+            raise Exception("Aucun client trouvé.")
+
+        return {client.id: client_to_dict(client, sales_contact_name) for client, sales_contact_name in rows}
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la récupération des clients : {e}")
+
+
+@require_role("commercial")
+@invalidates("clients")
+async def update_client(client_id, name, email, phone, company, db_session=None, current_user=None):
+    """
+    Met à jour les informations d'un client appartenant au commercial connecté.
+
+    Args:
+        client_id (int): ID du client à mettre à jour.
+        name (str): Nouveau nom.
+        email (str): Nouvel email.
+        phone (str): Nouveau téléphone.
+        company (str): Nouvelle entreprise.
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        str: Message de succès.
+
+    Raises:
+        Exception: En cas d'erreur lors de la mise à jour.
+    """
+    try:
+        async with async_session_scope(db_session) as session:
+            client = await session.get(Client, client_id)
+            if not client:
+                raise Exception("Client non trouvé.")
+
+            # Un commercial ne peut modifier que ses propres clients
+            if client.sales_contact_id != current_user.id:
+                raise Exception("Vous ne pouvez modifier que vos propres clients.")
+
+            validate_email(email)
+            validate_phone(phone)
+
+            client.name = name
+            client.email = email
+            client.phone = phone
+            client.company = company
+            await session.commit()
+
+        audit("client_updated", client=client_id, by=current_user.email)
+        return "Client mis à jour avec succès."
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la mise à jour du client : {e}")
+
+
+@require_role("commercial")
+@invalidates("clients")
+async def delete_client(client_id, db_session=None, current_user=None):
+    """
+    Supprime un client appartenant au commercial connecté et sans contrat.
+
+    Args:
+        client_id (int): ID du client à supprimer.
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        str: Message de succès.
+
+    Raises:
+        Exception: En cas d'erreur lors de la suppression.
+    """
+    try:
+        async with async_session_scope(db_session) as session:
+            client = await session.get(Client, client_id)
+            if not client:
+                raise Exception("Client non trouvé.")
+
+            if client.sales_contact_id != current_user.id:
+                raise Exception("Vous ne pouvez supprimer que vos propres clients.")
+
+            # Les événements sont rattachés aux contrats : vérifier les contrats suffit
+            # (pas de chargement paresseux possible avec une AsyncSession)
+            has_contracts = await session.scalar(select(exists().where(Contract.client_id == client_id)))
+            if has_contracts:
+                raise Exception(
+                    f"Impossible de supprimer le client '{client.name}' : "
+                    "des contrats ou événements lui sont associés."
+                )
+
+            await session.delete(client)
+            await session.commit()
+
+        audit("client_deleted", client=client_id, by=current_user.email)
+        return f"Client '{client.name}' supprimé avec succès."
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la suppression du client : {e}")
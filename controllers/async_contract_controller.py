@@ -0,0 +1,197 @@
+import datetime
+from sqlalchemy import select, exists
+from models.client import Client
+from models.contract import Contract
+from models.event import Event
+from models.user import User
+from controllers.contract_controller import AMOUNTS_INVALID, amounts_are_valid, contract_to_dict
+from utils.async_connection import async_session_scope
+from utils.auth import get_user_role
+from utils.auth_utils import require_role
+from utils.pagination import keyset_paginate
+from utils.rollups import apply_rollups_async, contract_changes
+from utils.cache import invalidates
+
+# Variante asynchrone (AsyncSession) de controllers.contract_controller : mêmes règles métier,
+# mais chaque opération ouvre sa propre session au lieu de partager une session de module.
+
+
+@require_role("commercial", "gestion")
+@invalidates("contracts")
+async def create_contract(client_id, amount_total, amount_remaining, signed, db_session=None,
+                          current_user=None):
+    """
+    Crée un contrat pour un client donné, associé à l'utilisateur connecté.
+
+    Args:
+        client_id (int): ID du client.
+        amount_total (float): Montant total du contrat.
+        amount_remaining (float): Montant restant à payer.
+        signed (str): "oui" ou "non" selon que le contrat est signé.
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Raises:
+        Exception: Si le client n'existe pas.
+    """
+    async with async_session_scope(db_session) as session:
+        if not await session.get(Client, client_id):
+            raise Exception(f"Aucun client trouvé avec l'ID {client_id}.")
+
+        is_signed = signed.lower() == "oui"
+        contract = Contract(
+            client_id=client_id,
+            sales_contact_id=current_user.id,
+            amount_total=amount_total,
+            amount_remaining=amount_remaining,
+            signed=is_signed,
+            signed_date=datetime.datetime.now() if is_signed else None
+        )
+        session.add(contract)
+        await session.flush()  # date de création attribuée : nécessaire aux agrégats mensuels
+        await apply_rollups_async(session, contract_changes(contract))
+        await session.commit()
+    return "Contrat créé avec succès."
+
+
+@require_role("commercial", "gestion")
+@invalidates("contracts")
+async def update_contract(contract_id, amount_total, amount_remaining, signed, db_session=None,
+                          current_user=None):
+    """
+    Met à jour les informations d'un contrat existant.
+
+    Args:
+        contract_id (int): ID du contrat à mettre à jour.
+        amount_total (float | None): Nouveau montant total (ou None pour conserver l'existant).
+        amount_remaining (float | None): Nouveau montant restant (ou None pour conserver l'existant).
+        signed (str | None): "oui" ou "non" (ou None pour conserver l'existant).
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Notes:
+        - Un commercial ne peut mettre à jour que ses propres contrats.
+    """
+    async with async_session_scope(db_session) as session:
+        # Verrouillé (FOR UPDATE) : les agrégats sont corrigés à partir des valeurs lues
+        contract = await session.get(Contract, contract_id, with_for_update=True, populate_existing=True)
+        if not contract:
+            raise Exception("Contrat introuvable.")
+
+        if not get_user_role(current_user) or not hasattr(current_user, "id"):
+            raise Exception("Erreur : utilisateur invalide (rôle ou ID manquant).")
+
+        if get_user_role(current_user) == "commercial" and contract.sales_contact_id != current_user.id:
+            raise Exception("Vous ne pouvez modifier que vos propres contrats.")
+
+        new_total = amount_total if amount_total is not None else contract.amount_total
+        new_remaining = amount_remaining if amount_remaining is not None else contract.amount_remaining
+        if not amounts_are_valid(new_total, new_remaining):
+            raise Exception(AMOUNTS_INVALID)
+
+        # Retrait des anciens montants des agrégats, ajout des nouveaux après mise à jour
+        changes = contract_changes(contract, sign=-1)
+
+        if amount_total is not None:
+            contract.amount_total = amount_total
+        if amount_remaining is not None:
+            contract.amount_remaining = amount_remaining
+        if signed is not None:
+            if signed.lower() == "oui":
+                contract.signed = True
+                contract.signed_date = datetime.datetime.now()
+            else:
+                contract.signed = False
+                contract.signed_date = None
+
+        await apply_rollups_async(session, changes + contract_changes(contract))
+        await session.commit()
+    return "Contrat mis à jour avec succès."
+
+
+async def _list_contracts(session, limit, after, unsigned_only=False):
+    """
+    Lit une page de contrats avec le client et le commercial associés.
+    """
+    query = (
+        select(Contract, Client.name, Client.email, User.name)
+        .join(Client, Contract.client_id == Client.id)
+        .join(User, Contract.sales_contact_id == User.id)
+    )
+    if unsigned_only:
+        query = query.where(Contract.signed.is_(False))
+    rows = (await session.execute(keyset_paginate(query, Contract.id, limit, after))).all()
+    return {
+        contract.id: contract_to_dict(contract, client_name, client_email, commercial_name)
+        for contract, client_name, client_email, commercial_name in rows
+    }
+
+
+@require_role("commercial", "gestion", "support")
+async def list_contracts(limit=None, after=None, db_session=None):
+    """
+    Retourne la liste de tous les contrats sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de contrats à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+    """
+    try:
+        async with async_session_scope(db_session) as session:
+            contracts = await _list_contracts(session, limit, after)
+        if not contracts:
+            raise Exception("Aucun contrat trouvé.")
+        return contracts
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la récupération des contrats : {e}")
+
+
+@require_role("commercial", "gestion")
+async def list_unsigned_contracts(limit=None, after=None, db_session=None):
+    """
+    Retourne la liste des contrats non signés sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de contrats à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+    """
+    try:
+        async with async_session_scope(db_session) as session:
+            contracts = await _list_contracts(session, limit, after, unsigned_only=True)
+        if not contracts:
+            raise Exception("Aucun contrat non signé trouvé.")
+        return contracts
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la récupération des contrats non signés : {e}")
+
+
+@require_role("commercial", "gestion")
+@invalidates("contracts")
+async def delete_contract(contract_id, db_session=None):
+    """
+    Supprime un contrat uniquement si aucun événement n'y est lié.
+
+    Args:
+        contract_id (int): ID du contrat à supprimer.
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+
+    Raises:
+        Exception: Si le contrat n'existe pas ou si des événements y sont liés.
+    """
+    async with async_session_scope(db_session) as session:
+        # Verrouillé (FOR UPDATE) : les agrégats sont corrigés à partir des valeurs lues
+        contract = await session.get(Contract, contract_id, with_for_update=True, populate_existing=True)
+        if not contract:
+            raise Exception("Contrat introuvable.")
+
+        if await session.scalar(select(exists().where(Event.contract_id == contract_id))):
+            raise Exception("Impossible de supprimer ce contrat car des événements y sont liés.")
+
+        await apply_rollups_async(session, contract_changes(contract, sign=-1))
+        await session.delete(contract)
+        await session.commit()
+    return "Contrat supprimé avec succès."
@@ -0,0 +1,317 @@
+from datetime import datetime
+from sqlalchemy import select
+from models.contract import Contract
+from models.department import Department
+from models.event import Event
+from models.user import User
+from controllers.event_controller import event_to_dict
+from utils.async_connection import async_session_scope
+from utils.auth import get_user_role
+from utils.auth_utils import require_role
+from utils.pagination import keyset_paginate
+from utils.rollups import apply_rollups_async, event_changes
+from utils.scheduling import check_schedule, describe_conflicts, find_conflicts_async
+from utils.cache import invalidates
+
+# Variante asynchrone (AsyncSession) de controllers.event_controller : mêmes règles métier,
+# mais chaque opération ouvre sa propre session au lieu de partager une session de module.
+
+
+def _parse_date(value, label):
+    """
+    Convertit une date 'YYYY-MM-DD HH:MM' en datetime.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M")
+    except ValueError:
+        raise Exception(f"Format de date de {label} invalide.")
+
+
+@require_role("commercial")
+@invalidates("events")
+async def create_event(contract_id, name, date_start, date_end, location, attendees, notes,
+                       allow_overlap=False, db_session=None, current_user=None):
+    """
+    Crée un événement pour un contrat signé appartenant au commercial connecté.
+
+    Args:
+        contract_id (int): ID du contrat lié à l'événement.
+        name (str): Nom de l'événement.
+        date_start (str): Date et heure de début au format 'YYYY-MM-DD HH:MM'.
+        date_end (str): Date et heure de fin au format 'YYYY-MM-DD HH:MM'.
+        location (str): Lieu de l'événement.
+        attendees (int): Nombre de participants.
+        notes (str): Informations complémentaires.
+        allow_overlap (bool): Accepter (avec un avertissement) un lieu déjà réservé sur la période.
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Règles métier:
+        - Le contrat doit exister.
+        - Le contrat doit être signé.
+        - Le commercial connecté doit être le propriétaire du contrat.
+        - La date de fin doit être postérieure à la date de début.
+        - Le lieu ne doit pas être déjà réservé sur la période (sauf allow_overlap).
+    """
+    async with async_session_scope(db_session) as session:
+        contract = await session.get(Contract, contract_id)
+
+        if not contract:
+            raise Exception("Contrat introuvable.")
+
+        if not contract.signed:
+            raise Exception("Le contrat n'est pas signé. Impossible de créer un événement.")
+
+        if contract.sales_contact_id != current_user.id:
+            raise Exception("Vous ne pouvez créer un événement que pour vos propres contrats.")
+
+        date_start_obj = _parse_date(date_start, "début")
+        date_end_obj = _parse_date(date_end, "fin")
+        if date_end_obj <= date_start_obj:
+            raise Exception("La date de fin doit être postérieure à la date de début.")
+
+        venue_conflicts = await find_conflicts_async(session, date_start_obj, date_end_obj, location=location)
+        warning = check_schedule(
+            [describe_conflicts(f"Le lieu « {location} » est déjà réservé pour", venue_conflicts)]
+            if venue_conflicts else [],
+            allow_overlap,
+        )
+
+        session.add(Event(
+            name=name,
+            contract_id=contract.id,
+            date_start=date_start_obj,
+            date_end=date_end_obj,
+            location=location,
+            attendees=attendees,
+            notes=notes
+        ))
+        await apply_rollups_async(session, event_changes(contract.sales_contact_id, date_start_obj))
+        await session.commit()
+    return "Événement créé avec succès." + warning
+
+
+@require_role("commercial")
+@invalidates("events")
+async def delete_event(event_id, db_session=None, current_user=None):
+    """
+    Supprime un événement uniquement si le commercial connecté est le propriétaire du contrat lié.
+
+    Args:
+        event_id (int): ID de l'événement à supprimer.
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+    """
+    if get_user_role(current_user) != "commercial":
+        raise Exception("Vous n'avez pas les droits pour supprimer un événement.")
+
+    async with async_session_scope(db_session) as session:
+        row = (await session.execute(
+            select(Event, Contract.sales_contact_id)
+            .join(Contract, Event.contract_id == Contract.id)
+            .where(Event.id == event_id)
+            .with_for_update(of=Event)
+            .execution_options(populate_existing=True)
+        )).first()
+        if not row:
+            raise Exception("Événement introuvable.")
+
+        event, owner_id = row
+        if owner_id != current_user.id:
+            raise Exception("Vous ne pouvez supprimer que les événements liés à vos propres contrats.")
+
+        await apply_rollups_async(session, event_changes(owner_id, event.date_start, sign=-1))
+        await session.delete(event)
+        await session.commit()
+    return f"Événement ID {event_id} supprimé avec succès."
+
+
+@require_role("gestion")
+@invalidates("events")
+async def assign_support(event_id, support_email, allow_overlap=False, db_session=None):
+    """
+    Assigne un utilisateur de type 'support' à un événement.
+
+    Args:
+        event_id (int): ID de l'événement.
+        support_email (str): Email du support à assigner.
+        allow_overlap (bool): Accepter (avec un avertissement) un support déjà occupé sur la période.
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+
+    Raises:
+        Exception: Si le support est déjà assigné à un événement qui chevauche celui-ci.
+    """
+    async with async_session_scope(db_session) as session:
+        event = await session.get(Event, event_id)
+        if not event:
+            raise Exception("Événement introuvable.")
+
+        support_user = await session.scalar(
+            select(User)
+            .join(Department, User.department_id == Department.id)
+            .where(User.email == support_email, Department.name == "support")
+        )
+        if not support_user:
+            raise Exception("Utilisateur support introuvable.")
+
+        conflicts = await find_conflicts_async(session, event.date_start, event.date_end,
+                                               support_contact_id=support_user.id, exclude_event_id=event.id)
+        warning = check_schedule(
+            [describe_conflicts(f"{support_user.name} est déjà assigné à", conflicts)] if conflicts else [],
+            allow_overlap,
+        )
+
+        event.support_contact_id = support_user.id
+        await session.commit()
+    return f"Support {support_user.name} assigné à l'événement." + warning
+
+
+@require_role("support")
+@invalidates("events")
+async def update_my_event(event_id, date_start=None, date_end=None, location=None, attendees=None, notes=None,
+                          allow_overlap=False, db_session=None, current_user=None):
+    """
+    Met à jour un événement assigné au support connecté.
+
+    Args:
+        event_id (int): ID de l'événement à modifier.
+        date_start (str): Nouvelle date/heure de début (YYYY-MM-DD HH:MM).
+        date_end (str): Nouvelle date/heure de fin (YYYY-MM-DD HH:MM).
+        location (str): Nouveau lieu.
+        attendees (int): Nouveau nombre de participants.
+        notes (str): Nouvelles notes.
+        allow_overlap (bool): Accepter (avec un avertissement) un chevauchement de planning ou de lieu.
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+    """
+    if not hasattr(current_user, "id"):
+        raise Exception("Erreur : utilisateur invalide (ID manquant).")
+
+    async with async_session_scope(db_session) as session:
+        # Verrouillé (FOR UPDATE) : le déplacement dans les agrégats part de la date lue
+        event = await session.get(Event, event_id, with_for_update=True, populate_existing=True)
+        if not event or event.support_contact_id != current_user.id:
+            raise Exception("Événement introuvable ou non assigné à vous.")
+
+        try:
+            date_format = "%Y-%m-%d %H:%M"
+            new_start = event.date_start if date_start is None else datetime.strptime(date_start, date_format)
+            new_end = event.date_end if date_end is None else datetime.strptime(date_end, date_format)
+            new_location = location if location is not None else event.location
+
+            # Vérification du planning du support et du lieu avant toute modification
+            warning = ""
+            if (new_start, new_end, new_location) != (event.date_start, event.date_end, event.location):
+                problems = []
+                conflicts = await find_conflicts_async(
+                    session, new_start, new_end, support_contact_id=current_user.id, exclude_event_id=event.id
+                )
+                if conflicts:
+                    problems.append(describe_conflicts("Vous êtes déjà assigné à", conflicts))
+                conflicts = await find_conflicts_async(session, new_start, new_end,
+                                                       location=new_location, exclude_event_id=event.id)
+                if conflicts:
+                    problems.append(
+                        describe_conflicts(f"Le lieu « {new_location} » est déjà réservé pour", conflicts)
+                    )
+                warning = check_schedule(problems, allow_overlap)
+
+            if new_start != event.date_start:
+                # Un changement de mois déplace l'événement dans les agrégats mensuels
+                sales_contact_id = await session.scalar(
+                    select(Contract.sales_contact_id).where(Contract.id == event.contract_id)
+                )
+                await apply_rollups_async(session, event_changes(sales_contact_id, event.date_start, sign=-1)
+                                          + event_changes(sales_contact_id, new_start))
+            event.date_start = new_start
+            event.date_end = new_end
+            event.location = new_location
+            if attendees is not None:
+                event.attendees = attendees
+            if notes is not None:
+                event.notes = notes
+
+            await session.commit()
+            return "Événement mis à jour avec succès." + warning
+        except ValueError:
+            raise Exception("Erreur : format de date invalide. Utilisez YYYY-MM-DD HH:MM.")
+        except Exception as e:
+            raise Exception(f"Erreur lors de la mise à jour : {e}")
+
+
+async def _list_events(db_session, limit, after, with_support=True, **filters):
+    """
+    Lit une page d'événements, filtrée sur les colonnes données.
+    """
+    query = select(Event).filter_by(**filters)
+    async with async_session_scope(db_session) as session:
+        events = (await session.scalars(keyset_paginate(query, Event.id, limit, after))).all()
+
+    events_dict = {}
+    for event in events:
+        events_dict[event.id] = event_to_dict(event)
+        if not with_support:
+            del events_dict[event.id]["support_contact_id"]
+    return events_dict
+
+
+@require_role("commercial", "gestion", "support")
+async def list_events(limit=None, after=None, db_session=None):
+    """
+    Retourne la liste de tous les événements sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de événements à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+    """
+    try:
+        events = await _list_events(db_session, limit, after)
+        if not events:
+            raise Exception("Aucun événement trouvé.")
+        return events
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la récupération des événements : {e}")
+
+
+@require_role("gestion")
+async def list_unassigned_events(limit=None, after=None, db_session=None):
+    """
+    Retourne la liste des événements non assignés sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de événements à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+    """
+    try:
+        events = await _list_events(db_session, limit, after, with_support=False, support_contact_id=None)
+        if not events:
+            raise Exception("Aucun événement non assigné trouvé.")
+        return events
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la récupération des événements non assignés : {e}")
+
+
+@require_role("support")
+async def list_my_events(limit=None, after=None, db_session=None, current_user=None):
+    """
+    Retourne la liste des événements assignés au support connecté sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de événements à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+    """
+    try:
+        events = await _list_events(db_session, limit, after, with_support=False,
+                                    support_contact_id=current_user.id)
+        if not events:
+            raise Exception("Vous n'avez aucun événement assigné.")
+        return events
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la récupération de vos événements : {e}")
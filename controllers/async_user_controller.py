@@ -0,0 +1,146 @@
+import asyncio
+from sqlalchemy import select, exists, or_
+from models.client import Client
+from models.contract import Contract
+from models.department import Department
+from models.event import Event
+from models.user import User
+from utils.async_connection import async_session_scope
+from utils.auth import hash_password, get_user_role
+from utils.auth_utils import require_role
+from utils.pagination import keyset_paginate
+from utils.telemetry import audit
+from utils.cache import invalidates
+from utils.refcache import bump_reference_version_async
+
+# Variante asynchrone (AsyncSession) de controllers.user_controller : mêmes règles métier,
+# mais chaque opération ouvre sa propre session au lieu de partager une session de module.
+# Le hash bcrypt, coûteux en CPU, est calculé dans un thread pour ne pas bloquer la boucle.
+
+
+@require_role("gestion")
+@invalidates("users")
+async def create_user(name, email, department_id, password, db_session=None, current_user=None):
+    """
+    Crée un nouvel utilisateur avec le département et mot de passe spécifiés.
+    """
+    try:
+        async with async_session_scope(db_session) as session:
+            if not await session.get(Department, department_id):
+                raise Exception("Département introuvable.")
+
+            if await session.scalar(select(exists().where(User.email == email))):
+                raise Exception("Utilisateur déjà existant.")
+
+            hashed = await asyncio.to_thread(hash_password, password)
+            session.add(User(name=name, email=email, password=hashed, department_id=department_id))
+            await bump_reference_version_async(session)
+            await session.commit()
+
+        audit("user_created", user=email, by=current_user.email)
+        return "Utilisateur créé avec succès."
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la création de l'utilisateur : {e}")
+
+
+@require_role("gestion")
+@invalidates("users")
+async def update_user(email, name=None, password=None, department_id=None, db_session=None,
+                      current_user=None):
+    """
+    Met à jour un utilisateur existant.
+    """
+    try:
+        async with async_session_scope(db_session) as session:
+            user = await session.scalar(select(User).where(User.email == email))
+            if not user:
+                raise Exception("Utilisateur introuvable.")
+
+            if name:
+                user.name = name
+            if password:
+                user.password = await asyncio.to_thread(hash_password, password)
+
+            if department_id:
+                if not await session.get(Department, department_id):
+                    raise Exception("Département introuvable.")
+                user.department_id = department_id
+
+            if name or department_id:
+                await bump_reference_version_async(session)
+            await session.commit()
+
+        audit("user_updated", user=email, by=current_user.email)
+        return "Utilisateur mis à jour avec succès."
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la mise à jour de l'utilisateur : {e}")
+
+
+@require_role("gestion")
+@invalidates("users")
+async def delete_user(email, db_session=None, current_user=None):
+    """
+    Supprime un utilisateur identifié par son email, s'il n'a ni client, ni contrat, ni événement.
+    """
+    if get_user_role(current_user) != "gestion":
+        raise Exception("Vous n'avez pas les droits pour supprimer un utilisateur.")
+
+    async with async_session_scope(db_session) as session:
+        user = await session.scalar(select(User).where(User.email == email))
+        if not user:
+            raise Exception(f"Utilisateur '{email}' introuvable.")
+
+        # Une seule requête d'existence (pas de chargement paresseux avec une AsyncSession)
+        linked = await session.scalar(select(or_(
+            exists().where(Client.sales_contact_id == user.id),
+            exists().where(Contract.sales_contact_id == user.id),
+            exists().where(Event.support_contact_id == user.id),
+        )))
+        if linked:
+            raise Exception(
+                f"Impossible de supprimer '{email}' : "
+                "des clients, contrats ou événements lui sont associés."
+            )
+
+        await session.delete(user)
+        await bump_reference_version_async(session)
+        await session.commit()
+
+    audit("user_deleted", user=email, by=current_user.email)
+    return f"Utilisateur avec l'email '{email}' supprimé avec succès."
+
+
+@require_role("gestion")
+async def list_users(limit=None, after=None, db_session=None):
+    """
+    Retourne la liste de tous les utilisateurs, paginés sur leur email, sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum d'utilisateurs à retourner (None = tous).
+        after (str | None): Email du dernier utilisateur de la page précédente.
+        db_session (AsyncSession | None): session de test (sinon nouvelle session)
+    """
+    try:
+        query = (
+            select(User.id, User.name, User.email, Department.name.label("department_name"))
+            .outerjoin(Department, User.department_id == Department.id)
+        )
+        async with async_session_scope(db_session) as session:
+            users = (await session.execute(keyset_paginate(query, User.email, limit, after))).all()
+        if not users:
+            raise Exception("Aucun utilisateur trouvé.")
+
+        return {
+            user.email: {
+                "id": user.id,
+                "name": user.name,
+                "email": user.email,
+                "department_name": user.department_name or "Non défini"
+            }
+            for user in users
+        }
+
+    except Exception as e:
+        return f"Erreur lors de la récupération des utilisateurs : {e}"
@@ -1,15 +1,25 @@
 import re
-import sentry_sdk
-from sqlalchemy.orm import sessionmaker
+from datetime import datetime
+from sqlalchemy.orm import sessionmaker, joinedload
 from models.client import Client
+from models.user import User
 from utils import auth
 from utils.connection import engine
-from utils.auth import get_current_user
 from utils.auth_utils import require_role
+from utils.pagination import keyset_paginate, PICKER_PAGE_SIZE, STREAM_BATCH_SIZE
+from utils.telemetry import audit
+from utils.bulk import bulk_insert
+from utils.datafiles import iter_records, batched, RejectWriter
+from utils.search import SEARCH_LIMIT, search_client_rows
+from utils.cache import cached, invalidates
 
 # Création d'une session SQLAlchemy pour interagir avec la base de données
 session = sessionmaker(bind=engine)()
 
+# Colonnes attendues dans un fichier d'import de clients
+IMPORT_FIELDS = ["name", "email", "phone", "company"]
+IMPORT_BATCH_SIZE = 5000
+
 
 def validate_email(email):
     """
@@ -52,7 +62,8 @@ def validate_phone(phone):
 
 
 @require_role("commercial")
-def create_client(name, email, phone, company):
+@invalidates("clients")
+def create_client(name, email, phone, company, current_user=None):
     """
     Crée un nouveau client et l'associe au commercial connecté.
 
@@ -61,6 +72,7 @@ def create_client(name, email, phone, company):
         email (str): Adresse email.
         phone (str): Numéro de téléphone.
         company (str): Nom de l'entreprise.
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
 
     Returns:
         str: Message de succès.
@@ -73,7 +85,7 @@ def create_client(name, email, phone, company):
         validate_email(email)
         validate_phone(phone)
 
-        user = get_current_user()  # Récupération du commercial connecté
+        user = current_user  # Commercial connecté
 
         # Création de l'objet Client
         client = Client(
@@ -88,8 +100,8 @@ def create_client(name, email, phone, company):
         session.add(client)
         session.commit()
 
-        # Log pour Sentry
-        sentry_sdk.capture_message(f"Client créé : {email} par {user.email}")
+        # Audit (envoyé par lot à Sentry en arrière-plan)
+        audit("client_created", client=email, by=user.email)
 
         return "Client créé avec succès."
 
@@ -98,39 +110,159 @@ def create_client(name, email, phone, company):
 
 
 @require_role("commercial", "gestion", "support")
-def list_clients():
+@cached("clients", "users")
+def list_clients(limit=None, after=None, db_session=None):
     """
     Retourne la liste des clients sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de clients à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (Session | None): session de test (sinon session du module)
     """
     try:
-        clients = session.query(Client).all()
+        session_to_use = db_session if db_session is not None else session
+        # Le commercial est chargé dans la même requête (pas de requête par client)
+        query = session_to_use.query(Client).options(joinedload(Client.sales_contact))
+        clients = keyset_paginate(query, Client.id, limit, after).all()
         if not clients:
             raise Exception("Aucun client trouvé.")
 
         clients_dict = {}
         for c in clients:
-            # Formatage des dates ou affichage "Date inconnue"
-            created_at_str = c.created_date.strftime("%d %B %Y") if c.created_date else "Date inconnue"
-            updated_at_str = c.updated_date.strftime("%d %B %Y") if c.updated_date else "Date inconnue"
-            sales_contact_name = c.sales_contact.name if c.sales_contact else "Aucun commercial assigné"
-
-            clients_dict[c.id] = {
-                "id": c.id,
-                "name": c.name,
-                "email": c.email,
-                "phone": c.phone,
-                "company": c.company,
-                "sales_contact_name": sales_contact_name,
-                "created_date": created_at_str,
-                "updated_date": updated_at_str
-            }
+            clients_dict[c.id] = client_to_dict(c, c.sales_contact.name if c.sales_contact else None)
         return clients_dict
 
     except Exception as e:
         raise Exception(f"Erreur lors de la récupération des clients : {e}")
 
 
+@require_role("commercial", "gestion", "support")
+def iter_clients(limit=None, after=None, batch_size=STREAM_BATCH_SIZE, db_session=None):
+    """
+    Parcourt les clients en flux, sans construire de dictionnaire complet.
+
+    Les lignes sont lues par lots de `batch_size` via un curseur côté serveur
+    (yield_per / stream_results) : la mémoire reste constante quelle que soit
+    la taille de la table.
+
+    Args:
+        limit (int | None): Nombre maximum de clients à parcourir (None = tous).
+        after (int | None): ID à partir duquel reprendre le parcours.
+        batch_size (int): Nombre de lignes lues par lot.
+        db_session (Session | None): session de test (sinon session du module)
+
+    Yields:
+        dict: Un client, au même format que list_clients.
+    """
+    session_to_use = db_session if db_session is not None else session
+    query = client_rows_query(session_to_use)
+    for row in keyset_paginate(query, Client.id, limit, after).yield_per(batch_size):
+        yield client_to_dict(row, row.sales_contact_name)
+
+
+@require_role("commercial", "gestion", "support")
+@cached("clients", "users")
+def search_clients(query, limit=SEARCH_LIMIT, db_session=None):
+    """
+    Recherche des clients par nom, email ou entreprise, les plus pertinents en premier.
+
+    Args:
+        query (str): Texte recherché (mots ou débuts de mots).
+        limit (int): Nombre maximum de clients retournés.
+        db_session (Session | None): session de test (sinon session du module)
+
+    Returns:
+        dict: Clients trouvés, au même format que list_clients (vide si aucun).
+    """
+    try:
+        session_to_use = db_session if db_session is not None else session
+        rows = search_client_rows(session_to_use, client_rows_query(session_to_use), query, limit)
+        return {row.id: client_to_dict(row, row.sales_contact_name) for row in rows}
+
+    except Exception as e:
+        raise Exception(f"Erreur lors de la recherche des clients : {e}")
+
+
+@require_role("commercial", "gestion", "support")
+@cached("clients", "users")
+def pick_clients(search=None, limit=PICKER_PAGE_SIZE, after=None, mine=False, db_session=None,
+                 current_user=None):
+    """
+    Page de clients pour un sélecteur (utils.picker) : filtrés par la recherche, triés par ID.
+
+    Args:
+        search (str | None): Mots recherchés dans le nom, l'email ou l'entreprise.
+        limit (int): Nombre maximum de clients retournés.
+        after (int | None): ID du dernier client de la page précédente.
+        mine (bool): Ne retenir que les clients du commercial connecté.
+        db_session (Session | None): session de test (sinon session du module)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        dict: Clients au même format que list_clients (vide si aucun).
+    """
+    session_to_use = db_session if db_session is not None else session
+    query = client_rows_query(session_to_use)
+    if mine:
+        query = query.filter(Client.sales_contact_id == current_user.id)
+    if search:
+        rows = search_client_rows(session_to_use, query, search, limit, after=after, ranked=False)
+    else:
+        rows = keyset_paginate(query, Client.id, limit, after).all()
+    return {row.id: client_to_dict(row, row.sales_contact_name) for row in rows}
+
+
+def client_rows_query(session_to_use):
+    """
+    Requête en colonnes (sans objets ORM) des clients, dans l'ordre des champs de client_to_dict.
+
+    Partagée par le parcours en flux et l'export.
+
+    Args:
+        session_to_use (Session): Session SQLAlchemy.
+
+    Returns:
+        Query: Requête non triée.
+    """
+    return (
+        session_to_use.query(
+            Client.id, Client.name, Client.email, Client.phone, Client.company,
+            User.name.label("sales_contact_name"), Client.created_date, Client.updated_date
+        )
+        .outerjoin(User, Client.sales_contact_id == User.id)
+    )
+
+
+def client_to_dict(client, sales_contact_name):
+    """
+    Formate un client (objet ou ligne de résultat) pour l'affichage.
+
+    Args:
+        client: Client ou ligne exposant les mêmes attributs.
+        sales_contact_name (str | None): Nom du commercial associé.
+
+    Returns:
+        dict: Client formaté.
+    """
+    # Formatage des dates ou affichage "Date inconnue"
+    created_at_str = client.created_date.strftime("%d %B %Y") if client.created_date else "Date inconnue"
+    updated_at_str = client.updated_date.strftime("%d %B %Y") if client.updated_date else "Date inconnue"
+
+    return {
+        "id": client.id,
+        "name": client.name,
+        "email": client.email,
+        "phone": client.phone,
+        "company": client.company,
+        "sales_contact_name": sales_contact_name or "Aucun commercial assigné",
+        "created_date": created_at_str,
+        "updated_date": updated_at_str
+    }
+
+
 @require_role("commercial")
+@invalidates("clients")
 def update_client(client_id, name, email, phone, company, db_session=None, current_user=None):
     """
     Met à jour les informations d'un client existant.
@@ -158,8 +290,6 @@ def update_client(client_id, name, email, phone, company, db_session=None, curre
         if not client:
             raise Exception("Client non trouvé.")
 
-        current_user = current_user or get_current_user()
-
         # Vérification : un commercial ne peut modifier que ses propres clients
         if client.sales_contact_id != current_user.id:
             raise Exception("Vous ne pouvez modifier que vos propres clients.")
@@ -176,8 +306,8 @@ def update_client(client_id, name, email, phone, company, db_session=None, curre
 
         session_to_use.commit()
 
-        # Log pour Sentry
-        sentry_sdk.capture_message(f"Client modifié : {client_id} par {current_user.email}")
+        # Audit (envoyé par lot à Sentry en arrière-plan)
+        audit("client_updated", client=client_id, by=current_user.email)
 
         return "Client mis à jour avec succès."
 
@@ -186,6 +316,7 @@ def update_client(client_id, name, email, phone, company, db_session=None, curre
 
 
 @require_role("commercial")
+@invalidates("clients")
 def delete_client(client_id, db_session=None, current_user=None):
     """
     Supprime un client existant.
@@ -209,14 +340,12 @@ def delete_client(client_id, db_session=None, current_user=None):
         if not client:
             raise Exception("Client non trouvé.")
 
-        current_user = current_user or get_current_user()
-
         # Vérification : un commercial ne peut supprimer que ses propres clients
         if client.sales_contact_id != current_user.id:
             raise Exception("Vous ne pouvez supprimer que vos propres clients.")
 
-        # Vérifie associations (contrats, événements, etc.)
-        if client.contracts or client.events:
+        # Vérifie associations (les événements sont rattachés aux contrats)
+        if client.contracts:
             raise Exception(
                 f"Impossible de supprimer le client '{client.name}' : "
                 "des contrats ou événements lui sont associés."
@@ -225,10 +354,93 @@ def delete_client(client_id, db_session=None, current_user=None):
         session_to_use.delete(client)
         session_to_use.commit()
 
-        # Log pour Sentry
-        sentry_sdk.capture_message(f"Client supprimé : {client_id} par {current_user.email}")
+        # Audit (envoyé par lot à Sentry en arrière-plan)
+        audit("client_deleted", client=client_id, by=current_user.email)
 
         return f"Client '{client.name}' supprimé avec succès."
 
     except Exception as e:
         raise Exception(f"Erreur lors de la suppression du client : {e}")
+
+
+def validate_client_record(record):
+    """
+    Valide une ligne d'import avec les mêmes règles que create_client.
+
+    Args:
+        record (dict): Ligne lue dans le fichier (name, email, phone, company).
+
+    Returns:
+        dict: Valeurs nettoyées.
+
+    Raises:
+        Exception: Si un champ obligatoire manque ou si l'email / le téléphone est invalide.
+    """
+    values = {field: (str(record.get(field) or "")).strip() for field in IMPORT_FIELDS}
+    if not values["name"]:
+        raise Exception("Nom du client manquant.")
+    validate_email(values["email"])
+    validate_phone(values["phone"])
+    values["company"] = values["company"] or None
+    return values
+
+
+@require_role("commercial")
+@invalidates("clients")
+def import_clients(path, reject_path=None, fmt=None, batch_size=IMPORT_BATCH_SIZE, db_session=None,
+                   current_user=None):
+    """
+    Importe en masse des clients depuis un fichier CSV ou JSONL et les associe au commercial connecté.
+
+    Le fichier est lu en flux ; les lignes valides sont insérées par lots de `batch_size`
+    (COPY sous PostgreSQL, executemany ailleurs), avec une transaction par lot.
+    Les lignes invalides sont écrites dans le fichier de rejets avec leur motif.
+
+    Args:
+        path (str): Fichier à importer (colonnes name, email, phone, company).
+        reject_path (str | None): Fichier CSV des rejets (par défaut `<path>.rejects.csv`).
+        fmt (str | None): "csv" ou "jsonl" (déduit de l'extension par défaut).
+        batch_size (int): Nombre de lignes insérées par transaction.
+        db_session (Session | None): session de test (sinon session du module)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        dict: Nombre de clients importés et rejetés, et chemin du fichier de rejets.
+    """
+    session_to_use = db_session if db_session is not None else session
+    reject_path = reject_path or f"{path}.rejects.csv"
+    table = Client.__table__
+    imported = 0
+
+    def valid_rows(rejects):
+        now = datetime.utcnow()
+        for line_number, record, error in iter_records(path, fmt):
+            if error is None:
+                try:
+                    values = validate_client_record(record)
+                except Exception as e:
+                    error = str(e)
+            if error is not None:
+                rejects.write(line_number, record, error)
+                continue
+            yield {**values, "sales_contact_id": current_user.id, "created_date": now, "updated_date": now}
+
+    with RejectWriter(reject_path, IMPORT_FIELDS) as rejects:
+        for batch in batched(valid_rows(rejects), batch_size):
+            try:
+                imported += bulk_insert(session_to_use.connection(), table, batch)
+                session_to_use.commit()
+            except Exception as e:
+                session_to_use.rollback()
+                raise Exception(
+                    f"Erreur lors de l'import des clients (après {imported} clients importés) : {e}"
+                )
+
+    # Un seul message pour tout l'import
+    audit("clients_imported", imported=imported, rejected=rejects.count, by=current_user.email)
+
+    return {
+        "imported": imported,
+        "rejected": rejects.count,
+        "reject_path": reject_path if rejects.count else None,
+    }
@@ -1,3 +1,4 @@
+from sqlalchemy import case, func, literal, select
 from sqlalchemy.orm import sessionmaker
 from models.contract import Contract
 from models.client import Client
@@ -5,14 +6,44 @@ from models.event import Event
 from models.user import User
 from utils import auth
 from utils.connection import engine
-from utils.auth import get_current_user, get_user_role
+from utils.auth import get_user_role
 import datetime
 import click
 from utils.auth_utils import require_role
+from utils.pagination import keyset_paginate, PICKER_PAGE_SIZE, STREAM_BATCH_SIZE
+from utils.rollups import apply_rollups, contract_changes, month_of
+from utils.search import client_match_condition, search_terms
+from utils.cache import cached, invalidates
 
 # Création d'une session SQLAlchemy pour interagir avec la base de données
 session = sessionmaker(bind=engine)()
 
+# Nombre maximum de contrats traités par une opération en masse (une transaction, un UPDATE)
+BULK_MAX_IDS = 5000
+
+# Regroupements proposés par contract_stats
+STATS_GROUPS = ("sales_contact", "client", "month")
+
+# Motif de rejet de amounts_are_valid (mise à jour unitaire ou en masse)
+AMOUNTS_INVALID = "Le montant restant dépasserait le montant total."
+
+
+def amounts_are_valid(amount_total, amount_remaining):
+    """
+    Règle des montants d'un contrat : le montant restant ne dépasse pas le montant total.
+
+    S'applique à des valeurs (update_contract, après lecture du contrat) comme à des expressions
+    SQL (bulk_update_contracts, dans le WHERE de l'UPDATE) : les deux chemins partagent la règle.
+
+    Args:
+        amount_total (float | ColumnElement): Montant total après modification.
+        amount_remaining (float | ColumnElement): Montant restant après modification.
+
+    Returns:
+        bool | ColumnElement: Résultat de la règle, ou condition SQL.
+    """
+    return amount_remaining <= amount_total
+
 
 def validate_client_id(ctx, param, value):
     """
@@ -36,7 +67,8 @@ def validate_client_id(ctx, param, value):
 
 
 @require_role("commercial", "gestion")
-def create_contract(client_id, amount_total, amount_remaining, signed):
+@invalidates("contracts")
+def create_contract(client_id, amount_total, amount_remaining, signed, current_user=None):
     """
     Crée un contrat pour un client donné.
 
@@ -45,12 +77,13 @@ def create_contract(client_id, amount_total, amount_remaining, signed):
         amount_total (float): Montant total du contrat.
         amount_remaining (float): Montant restant à payer.
         signed (str): "oui" ou "non" selon que le contrat est signé.
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
 
     Notes:
         - Le contrat est associé au commercial actuellement connecté.
         - Si le contrat est signé, la date de signature est définie à la date courante.
     """
-    user = get_current_user()  # Récupération de l'utilisateur connecté
+    user = current_user  # Utilisateur connecté
 
     contract = Contract(
         client_id=client_id,
@@ -62,11 +95,14 @@ def create_contract(client_id, amount_total, amount_remaining, signed):
     )
 
     session.add(contract)
+    session.flush()  # date de création attribuée : nécessaire aux agrégats mensuels
+    apply_rollups(session, contract_changes(contract))
     session.commit()
     return "Contrat créé avec succès."
 
 
 @require_role("commercial", "gestion")
+@invalidates("contracts")
 def update_contract(contract_id, amount_total, amount_remaining, signed, db_session=None, current_user=None):
     """
     Met à jour les informations d'un contrat existant.
@@ -83,20 +119,27 @@ def update_contract(contract_id, amount_total, amount_remaining, signed, db_sess
         - Un commercial ne peut mettre à jour que ses propres contrats.
     """
     session = db_session or auth.session
-    contract = session.query(Contract).filter_by(id=contract_id).first()
+    # Verrouillé (FOR UPDATE) : les agrégats sont corrigés à partir des valeurs lues
+    contract = session.query(Contract).filter_by(id=contract_id).with_for_update().populate_existing().first()
     if not contract:
         raise Exception("Contrat introuvable.")
 
-    current_user = current_user or get_current_user()
-
     # Vérification que l'utilisateur a bien les attributs nécessaires
-    if not hasattr(current_user, "department") or not hasattr(current_user, "id"):
+    if not get_user_role(current_user) or not hasattr(current_user, "id"):
         raise Exception("Erreur : utilisateur invalide (rôle ou ID manquant).")
 
     # Un commercial ne peut modifier que ses propres contrats
     if get_user_role(current_user) == "commercial" and contract.sales_contact_id != current_user.id:
         raise Exception("Vous ne pouvez modifier que vos propres contrats.")
 
+    new_total = amount_total if amount_total is not None else contract.amount_total
+    new_remaining = amount_remaining if amount_remaining is not None else contract.amount_remaining
+    if not amounts_are_valid(new_total, new_remaining):
+        raise Exception(AMOUNTS_INVALID)
+
+    # Retrait des anciens montants des agrégats, ajout des nouveaux après mise à jour
+    changes = contract_changes(contract, sign=-1)
+
     # Mise à jour des champs
     if amount_total is not None:
         contract.amount_total = amount_total
@@ -110,38 +153,39 @@ def update_contract(contract_id, amount_total, amount_remaining, signed, db_sess
             contract.signed = False
             contract.signed_date = None
 
+    apply_rollups(session, changes + contract_changes(contract))
     session.commit()
     return "Contrat mis à jour avec succès."
 
 
 @require_role("commercial", "gestion", "support")
-def list_contracts():
+@cached("contracts", "clients", "users")
+def list_contracts(limit=None, after=None, db_session=None):
     """
     Retourne la liste de tous les contrats sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de contrats à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (Session | None): session de test (sinon session du module)
     """
     try:
-        contracts = (
-            session.query(Contract, Client, User)
+        session_to_use = db_session if db_session is not None else session
+        query = (
+            session_to_use.query(Contract, Client, User)
             .join(Client, Contract.client_id == Client.id)
             .join(User, Contract.sales_contact_id == User.id)
-            .all()
         )
+        contracts = keyset_paginate(query, Contract.id, limit, after).all()
 
         if not contracts:
             raise Exception("Aucun contrat trouvé.")
 
         contracts_dict = {}
         for contract, client, commercial in contracts:
-            contracts_dict[contract.id] = {
-                "id": contract.id,
-                "client_name": client.name,
-                "client_email": client.email,
-                "commercial_name": commercial.name,
-                "amount_total": contract.amount_total,
-                "amount_remaining": contract.amount_remaining,
-                "created_date": contract.created_date.strftime('%Y-%m-%d'),
-                "signed": contract.signed
-            }
+            contracts_dict[contract.id] = contract_to_dict(
+                contract, client.name, client.email, commercial.name
+            )
 
         return contracts_dict
 
@@ -150,34 +194,34 @@ def list_contracts():
 
 
 @require_role("commercial", "gestion")
-def list_unsigned_contracts():
+@cached("contracts", "clients", "users")
+def list_unsigned_contracts(limit=None, after=None, db_session=None):
     """
     Retourne la liste des contrats non signés sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de contrats à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (Session | None): session de test (sinon session du module)
     """
     try:
-        contracts = (
-            session.query(Contract, Client, User)
+        session_to_use = db_session if db_session is not None else session
+        query = (
+            session_to_use.query(Contract, Client, User)
             .join(Client, Contract.client_id == Client.id)
             .join(User, Contract.sales_contact_id == User.id)
             .filter(Contract.signed.is_(False))
-            .all()
         )
+        contracts = keyset_paginate(query, Contract.id, limit, after).all()
 
         if not contracts:
             raise Exception("Aucun contrat non signé trouvé.")
 
         contracts_dict = {}
         for contract, client, commercial in contracts:
-            contracts_dict[contract.id] = {
-                "id": contract.id,
-                "client_name": client.name,
-                "client_email": client.email,
-                "commercial_name": commercial.name,
-                "amount_total": contract.amount_total,
-                "amount_remaining": contract.amount_remaining,
-                "created_date": contract.created_date.strftime('%Y-%m-%d'),
-                "signed": contract.signed
-            }
+            contracts_dict[contract.id] = contract_to_dict(
+                contract, client.name, client.email, commercial.name
+            )
 
         return contracts_dict
 
@@ -185,7 +229,122 @@ def list_unsigned_contracts():
         raise Exception(f"Erreur lors de la récupération des contrats non signés : {e}")
 
 
+@require_role("commercial", "gestion", "support")
+def iter_contracts(unsigned_only=False, limit=None, after=None, batch_size=STREAM_BATCH_SIZE,
+                   db_session=None):
+    """
+    Parcourt les contrats en flux, sans construire de dictionnaire complet.
+
+    Les lignes sont lues par lots de `batch_size` via un curseur côté serveur
+    (yield_per / stream_results) : la mémoire reste constante quelle que soit
+    la taille de la table.
+
+    Args:
+        unsigned_only (bool): Ne parcourir que les contrats non signés.
+        limit (int | None): Nombre maximum de contrats à parcourir (None = tous).
+        after (int | None): ID à partir duquel reprendre le parcours.
+        batch_size (int): Nombre de lignes lues par lot.
+        db_session (Session | None): session de test (sinon session du module)
+
+    Yields:
+        dict: Un contrat, au même format que list_contracts.
+    """
+    session_to_use = db_session if db_session is not None else session
+    query = contract_rows_query(session_to_use, unsigned_only)
+    for row in keyset_paginate(query, Contract.id, limit, after).yield_per(batch_size):
+        yield contract_to_dict(row, row.client_name, row.client_email, row.commercial_name)
+
+
+@require_role("commercial", "gestion", "support")
+@cached("contracts", "clients", "users")
+def pick_contracts(search=None, limit=PICKER_PAGE_SIZE, after=None, signed=None, mine=False, db_session=None,
+                   current_user=None):
+    """
+    Page de contrats pour un sélecteur (utils.picker) : filtrés par client, triés par ID.
+
+    Args:
+        search (str | None): Mots recherchés dans le nom, l'email ou l'entreprise du client.
+        limit (int): Nombre maximum de contrats retournés.
+        after (int | None): ID du dernier contrat de la page précédente.
+        signed (bool | None): Ne retenir que les contrats signés (True) ou non signés (False).
+        mine (bool): Pour un commercial, ne retenir que ses propres contrats (règle de update_contract).
+        db_session (Session | None): session de test (sinon session du module)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        dict: Contrats au même format que list_contracts (vide si aucun).
+    """
+    session_to_use = db_session if db_session is not None else session
+    query = contract_rows_query(session_to_use)
+    if signed is not None:
+        query = query.filter(Contract.signed.is_(signed))
+    if mine and get_user_role(current_user) == "commercial":
+        query = query.filter(Contract.sales_contact_id == current_user.id)
+    terms = search_terms(search)
+    if terms:
+        query = query.filter(client_match_condition(session_to_use, terms))
+    rows = keyset_paginate(query, Contract.id, limit, after).all()
+    return {
+        row.id: contract_to_dict(row, row.client_name, row.client_email, row.commercial_name)
+        for row in rows
+    }
+
+
+def contract_rows_query(session_to_use, unsigned_only=False):
+    """
+    Requête en colonnes (sans objets ORM) des contrats, dans l'ordre des champs de contract_to_dict.
+
+    Partagée par le parcours en flux et l'export.
+
+    Args:
+        session_to_use (Session): Session SQLAlchemy.
+        unsigned_only (bool): Ne retenir que les contrats non signés.
+
+    Returns:
+        Query: Requête non triée.
+    """
+    query = (
+        session_to_use.query(
+            Contract.id,
+            Client.name.label("client_name"), Client.email.label("client_email"),
+            User.name.label("commercial_name"),
+            Contract.amount_total, Contract.amount_remaining, Contract.created_date, Contract.signed
+        )
+        .join(Client, Contract.client_id == Client.id)
+        .join(User, Contract.sales_contact_id == User.id)
+    )
+    if unsigned_only:
+        query = query.filter(Contract.signed.is_(False))
+    return query
+
+
+def contract_to_dict(contract, client_name, client_email, commercial_name):
+    """
+    Formate un contrat (objet ou ligne de résultat) pour l'affichage.
+
+    Args:
+        contract: Contrat ou ligne exposant les mêmes attributs.
+        client_name (str): Nom du client.
+        client_email (str): Email du client.
+        commercial_name (str): Nom du commercial.
+
+    Returns:
+        dict: Contrat formaté.
+    """
+    return {
+        "id": contract.id,
+        "client_name": client_name,
+        "client_email": client_email,
+        "commercial_name": commercial_name,
+        "amount_total": contract.amount_total,
+        "amount_remaining": contract.amount_remaining,
+        "created_date": contract.created_date.strftime('%Y-%m-%d'),
+        "signed": contract.signed
+    }
+
+
 @require_role("commercial", "gestion")
+@invalidates("contracts")
 def delete_contract(contract_id, db_session=None):
     """
     Supprime un contrat uniquement si aucun événement n'y est lié.
@@ -202,7 +361,8 @@ def delete_contract(contract_id, db_session=None):
     """
     session = db_session or auth.session
 
-    contract = session.query(Contract).filter_by(id=contract_id).first()
+    # Verrouillé (FOR UPDATE) : les agrégats sont corrigés à partir des valeurs lues
+    contract = session.query(Contract).filter_by(id=contract_id).with_for_update().populate_existing().first()
     if not contract:
         raise Exception("Contrat introuvable.")
 
@@ -211,6 +371,291 @@ def delete_contract(contract_id, db_session=None):
     if event_linked:
         raise Exception("Impossible de supprimer ce contrat car des événements y sont liés.")
 
+    apply_rollups(session, contract_changes(contract, sign=-1))
     session.delete(contract)
     session.commit()
     return "Contrat supprimé avec succès."
+
+
+@require_role("commercial", "gestion")
+@invalidates("contracts")
+def bulk_update_contracts(contract_ids, amount_total=None, amount_remaining=None, signed=None,
+                          db_session=None, current_user=None):
+    """
+    Met à jour un lot de contrats en une seule requête UPDATE ... WHERE id IN (...).
+
+    Mêmes champs que update_contract ; les contrats déjà signés gardent leur date de signature.
+
+    Args:
+        contract_ids (Iterable[int]): IDs des contrats à mettre à jour.
+        amount_total (float | None): Nouveau montant total (ou None pour conserver l'existant).
+        amount_remaining (float | None): Nouveau montant restant (ou None pour conserver l'existant).
+        signed (str | None): "oui" ou "non" (ou None pour conserver l'existant).
+        db_session (Session | None): auth.session ou session de test
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        dict: IDs mis à jour ("updated") et IDs rejetés avec leur motif ("rejected").
+
+    Raises:
+        Exception: Si aucun ID ou aucune modification n'est fournie.
+    """
+    values = {}
+    if amount_total is not None:
+        values["amount_total"] = amount_total
+    if amount_remaining is not None:
+        values["amount_remaining"] = amount_remaining
+    if signed is not None:
+        if signed.lower() == "oui":
+            values["signed"] = True
+            values["signed_date"] = case(
+                (Contract.signed.is_(True), Contract.signed_date), else_=datetime.datetime.now()
+            )
+        else:
+            values["signed"] = False
+            values["signed_date"] = None
+    if not values:
+        raise Exception("Aucune modification demandée.")
+
+    rules = []
+    if amount_total is not None or amount_remaining is not None:
+        new_total = literal(amount_total) if amount_total is not None else Contract.amount_total
+        new_remaining = (literal(amount_remaining) if amount_remaining is not None
+                         else Contract.amount_remaining)
+        rules.append((amounts_are_valid(new_total, new_remaining), AMOUNTS_INVALID))
+
+    return _bulk_update(db_session or auth.session, contract_ids, values, rules, current_user)
+
+
+@require_role("commercial", "gestion")
+@invalidates("contracts")
+def sign_contracts(contract_ids, db_session=None, current_user=None):
+    """
+    Signe un lot de contrats en une seule requête UPDATE ... WHERE id IN (...).
+
+    Args:
+        contract_ids (Iterable[int]): IDs des contrats à signer.
+        db_session (Session | None): auth.session ou session de test
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        dict: IDs signés ("updated") et IDs rejetés avec leur motif ("rejected").
+    """
+    values = {"signed": True, "signed_date": datetime.datetime.now()}
+    rules = [(Contract.signed.is_not(True), "Contrat déjà signé.")]
+    return _bulk_update(db_session or auth.session, contract_ids, values, rules, current_user)
+
+
+def _bulk_update(session, contract_ids, values, rules, current_user):
+    """
+    Applique `values` aux contrats demandés qui respectent toutes les règles, en une transaction.
+
+    Les règles (dont la propriété des contrats pour un commercial) sont des conditions SQL :
+    une seule lecture des contrats demandés donne le motif de chaque rejet et les anciens
+    montants (agrégats), puis un seul UPDATE porte les mêmes conditions dans son WHERE.
+
+    Args:
+        session (Session): Session de l'écriture.
+        contract_ids (Iterable[int]): IDs demandés.
+        values (dict): Colonnes à modifier (valeurs ou expressions SQL).
+        rules (list[tuple]): (condition SQL, motif de rejet), vérifiées dans l'ordre.
+        current_user (Identity | User): Utilisateur connecté.
+
+    Returns:
+        dict: {"updated": [IDs], "rejected": {ID: motif}}.
+    """
+    ids = list(dict.fromkeys(contract_ids))
+    if not ids:
+        raise Exception("Aucun ID de contrat fourni.")
+    if len(ids) > BULK_MAX_IDS:
+        raise Exception(f"Trop de contrats : {BULK_MAX_IDS} au maximum par opération.")
+
+    # Vérification que l'utilisateur a bien les attributs nécessaires
+    if not get_user_role(current_user) or not hasattr(current_user, "id"):
+        raise Exception("Erreur : utilisateur invalide (rôle ou ID manquant).")
+
+    # Un commercial ne peut modifier que ses propres contrats : règle portée par le WHERE
+    if get_user_role(current_user) == "commercial":
+        rules = [(Contract.sales_contact_id == current_user.id,
+                  "Vous ne pouvez modifier que vos propres contrats.")] + rules
+
+    conditions = [condition for condition, _ in rules]
+    rows = session.execute(
+        select(Contract.id, Contract.sales_contact_id, Contract.amount_total, Contract.amount_remaining,
+               Contract.created_date,
+               *(condition.label(f"rule_{i}") for i, condition in enumerate(conditions)))
+        .where(Contract.id.in_(ids))
+        .with_for_update()
+    ).all()
+
+    found = {row.id: row for row in rows}
+    rejected = {}
+    for contract_id in ids:
+        row = found.get(contract_id)
+        if row is None:
+            rejected[contract_id] = "Contrat introuvable."
+            continue
+        for i, (_, reason) in enumerate(rules):
+            if not row._mapping[f"rule_{i}"]:
+                rejected[contract_id] = reason
+                break
+
+    eligible = [contract_id for contract_id in ids if contract_id not in rejected]
+    if not eligible:
+        session.rollback()
+        return {"updated": [], "rejected": rejected}
+
+    table = Contract.__table__
+    stmt = table.update().where(Contract.id.in_(eligible), *conditions).values(values)
+    if session.get_bind().dialect.update_returning:
+        updated = set(session.execute(stmt.returning(table.c.id)).scalars())
+    else:
+        result = session.execute(stmt)
+        updated = set(eligible) if result.rowcount == len(eligible) else None
+    if updated is None:
+        # Sans RETURNING, impossible de savoir quels contrats ont changé entre-temps
+        session.rollback()
+        raise Exception("Des contrats ont été modifiés pendant l'opération. Veuillez réessayer.")
+    for contract_id in eligible:
+        if contract_id not in updated:
+            rejected[contract_id] = "Contrat modifié pendant l'opération. Veuillez réessayer."
+
+    # Agrégats : anciens montants retirés, nouveaux ajoutés (cumulés par commercial et par mois)
+    if "amount_total" in values or "amount_remaining" in values:
+        changes = []
+        for contract_id in updated:
+            row = found[contract_id]
+            deltas = {
+                "amount_total": values.get("amount_total", row.amount_total) - row.amount_total,
+                "amount_remaining": (values.get("amount_remaining", row.amount_remaining)
+                                     - row.amount_remaining),
+            }
+            changes += [(model, key, deltas) for model, key, _ in contract_changes(row)]
+        apply_rollups(session, changes)
+
+    session.commit()
+    return {
+        "updated": [contract_id for contract_id in ids if contract_id in updated],
+        "rejected": {contract_id: rejected[contract_id] for contract_id in ids if contract_id in rejected},
+    }
+
+
+@require_role("gestion")
+def contract_stats(group_by="sales_contact", limit=None, db_session=None):
+    """
+    Calcule les indicateurs des contrats par commercial, par client ou par mois de signature.
+
+    Toute l'agrégation est faite par la base : un GROUP BY sur la table des contrats
+    (sans jointure), puis des fonctions de fenêtre sur les groupes obtenus pour le
+    rang, la part du chiffre d'affaires, les totaux et (par mois) le cumul. Seuls
+    les groupes affichés sont joints aux noms des commerciaux ou des clients.
+
+    Indicateurs par groupe :
+        contracts : nombre de contrats ; signed : contrats signés ;
+        signing_rate : signed / contracts ;
+        signed_amount : montant total des contrats signés ;
+        outstanding : montant restant dû sur les contrats signés ;
+        share : part de signed_amount dans le chiffre d'affaires signé total ;
+        rank : rang selon signed_amount ; cumulative (par mois) : signed_amount cumulé.
+
+    Args:
+        group_by (str): "sales_contact", "client" ou "month" (mois de signed_date ;
+            les contrats non signés forment un groupe sans mois).
+        limit (int | None): Nombre maximum de groupes retournés (les mieux classés).
+        db_session (Session | None): session de test (sinon session du module)
+
+    Returns:
+        dict: {"groups": [dict, ...] triés par rang (par mois pour "month"),
+               "totals": dict des indicateurs sur l'ensemble des contrats}.
+
+    Raises:
+        Exception: Si le regroupement est inconnu ou si aucun contrat n'existe.
+    """
+    if group_by not in STATS_GROUPS:
+        raise Exception(f"Regroupement inconnu : {group_by} (choix : {', '.join(STATS_GROUPS)}).")
+
+    session_to_use = db_session if db_session is not None else session
+    dialect_name = session_to_use.get_bind().dialect.name
+
+    if group_by == "sales_contact":
+        key = Contract.sales_contact_id
+    elif group_by == "client":
+        key = Contract.client_id
+    else:
+        key = month_of(Contract.signed_date, dialect_name)
+
+    signed = Contract.signed.is_(True)
+    grouped = (
+        select(
+            key.label("key"),
+            func.count(Contract.id).label("contracts"),
+            func.sum(case((signed, 1), else_=0)).label("signed"),
+            func.sum(case((signed, Contract.amount_total), else_=0)).label("signed_amount"),
+            func.sum(case((signed, Contract.amount_remaining), else_=0)).label("outstanding"),
+        )
+        .group_by(key)
+        .subquery()
+    )
+
+    ranked = select(
+        grouped,
+        func.rank().over(order_by=grouped.c.signed_amount.desc()).label("rank"),
+        (grouped.c.signed_amount / func.nullif(func.sum(grouped.c.signed_amount).over(), 0)).label("share"),
+        func.sum(grouped.c.contracts).over().label("total_contracts"),
+        func.sum(grouped.c.signed).over().label("total_signed"),
+        func.sum(grouped.c.signed_amount).over().label("total_signed_amount"),
+        func.sum(grouped.c.outstanding).over().label("total_outstanding"),
+        (
+            func.sum(grouped.c.signed_amount).over(order_by=(grouped.c.key.is_(None), grouped.c.key))
+            if group_by == "month" else literal(None)
+        ).label("cumulative"),
+    )
+    # Les fenêtres sont évaluées avant le LIMIT : totaux et cumul portent sur tous les groupes
+    if group_by == "month":
+        if limit is not None:
+            ranked = ranked.order_by(grouped.c.signed_amount.desc()).limit(limit)
+    else:
+        ranked = ranked.order_by(grouped.c.signed_amount.desc(), grouped.c.key).limit(limit)
+    ranked = ranked.subquery()
+
+    # Libellé des groupes : jointure sur les seuls groupes retenus
+    if group_by == "sales_contact":
+        query = select(ranked, User.name.label("label")).join(User, User.id == ranked.c.key)
+    elif group_by == "client":
+        query = select(ranked, Client.name.label("label")).join(Client, Client.id == ranked.c.key)
+    else:
+        query = select(ranked, func.coalesce(ranked.c.key, "non signé").label("label"))
+
+    if group_by == "month":
+        query = query.order_by(ranked.c.key.is_(None), ranked.c.key)
+    else:
+        query = query.order_by(ranked.c.rank, ranked.c.key)
+
+    rows = session_to_use.execute(query).all()
+    if not rows:
+        raise Exception("Aucun contrat trouvé.")
+
+    groups = [
+        {
+            "key": row.key,
+            "label": row.label,
+            "contracts": row.contracts,
+            "signed": row.signed,
+            "signing_rate": row.signed / row.contracts,
+            "signed_amount": row.signed_amount,
+            "outstanding": row.outstanding,
+            "share": row.share or 0.0,
+            "rank": row.rank,
+            "cumulative": row.cumulative,
+        }
+        for row in rows
+    ]
+    first = rows[0]
+    totals = {
+        "contracts": first.total_contracts,
+        "signed": first.total_signed,
+        "signing_rate": first.total_signed / first.total_contracts,
+        "signed_amount": first.total_signed_amount,
+        "outstanding": first.total_outstanding,
+    }
+    return {"groups": groups, "totals": totals}
@@ -0,0 +1,95 @@
+from sqlalchemy.orm import sessionmaker
+from models.rollup import MonthlyRollup, SalesContactRollup
+from models.user import User
+from utils.auth_utils import require_role
+from utils.connection import engine
+from utils.rollups import rebuild_rollups
+
+# Création d'une session SQLAlchemy
+session = sessionmaker(bind=engine)()
+
+# Regroupements proposés par le tableau de bord
+DASHBOARD_GROUPS = ("sales_contact", "month")
+
+
+def rollup_to_dict(rollup, label):
+    """
+    Formate une ligne d'agrégats pour l'affichage.
+
+    Args:
+        rollup (SalesContactRollup | MonthlyRollup): Ligne d'agrégats.
+        label (str): Nom du commercial ou mois.
+
+    Returns:
+        dict: Indicateurs de la ligne.
+    """
+    return {
+        "label": label,
+        "contracts": rollup.contracts,
+        "amount_total": rollup.amount_total,
+        "amount_remaining": rollup.amount_remaining,
+        "events": rollup.events,
+    }
+
+
+@require_role("gestion")
+def get_dashboard(group_by="sales_contact", limit=None, db_session=None):
+    """
+    Lit le tableau de bord depuis les tables d'agrégats (sans parcourir contrats et événements).
+
+    Le coût ne dépend que du nombre de commerciaux ou de mois, pas du volume de données.
+
+    Args:
+        group_by (str): "sales_contact" (trié par montant total décroissant) ou "month".
+        limit (int | None): Nombre maximum de lignes retournées.
+        db_session (Session | None): session de test (sinon session du module)
+
+    Returns:
+        list[dict]: Indicateurs par commercial ou par mois.
+
+    Raises:
+        Exception: Si le regroupement est inconnu ou si aucun agrégat n'existe.
+    """
+    if group_by not in DASHBOARD_GROUPS:
+        raise Exception(f"Regroupement inconnu : {group_by} (choix : {', '.join(DASHBOARD_GROUPS)}).")
+
+    session_to_use = db_session if db_session is not None else session
+    if group_by == "sales_contact":
+        query = (
+            session_to_use.query(SalesContactRollup, User.name)
+            .outerjoin(User, User.id == SalesContactRollup.sales_contact_id)
+            .filter(SalesContactRollup.contracts > 0)
+            .order_by(SalesContactRollup.amount_total.desc(), SalesContactRollup.sales_contact_id)
+        )
+    else:
+        query = (
+            session_to_use.query(MonthlyRollup, MonthlyRollup.month)
+            .filter((MonthlyRollup.contracts > 0) | (MonthlyRollup.events > 0))
+            .order_by(MonthlyRollup.month)
+        )
+    rows = query.limit(limit).all()
+    if not rows:
+        raise Exception("Aucune donnée agrégée. Lancez `epicevents.py dashboard rebuild`.")
+
+    return [rollup_to_dict(rollup, label or "Inconnu") for rollup, label in rows]
+
+
+@require_role("gestion")
+def rebuild_dashboard(db_session=None):
+    """
+    Recalcule entièrement les tables d'agrégats (après un import direct en base, par exemple).
+
+    Args:
+        db_session (Session | None): session de test (sinon session du module)
+
+    Returns:
+        dict: Nombre de lignes de chaque table d'agrégats.
+    """
+    session_to_use = db_session if db_session is not None else session
+    try:
+        counts = rebuild_rollups(session_to_use.connection())
+        session_to_use.commit()
+        return counts
+    except Exception as e:
+        session_to_use.rollback()
+        raise Exception(f"Erreur lors de la reconstruction des agrégats : {e}")
@@ -1,18 +1,33 @@
+import heapq
 from datetime import datetime
+from itertools import groupby
+from sqlalchemy import case, or_
 from sqlalchemy.orm import sessionmaker, joinedload
 from models.event import Event
 from models.contract import Contract
 from models.user import User
 from utils.connection import engine
-from utils.auth import get_current_user, get_user_role
+from utils.auth import get_user_role
 from utils.auth_utils import require_role
+from utils.pagination import keyset_paginate, PICKER_PAGE_SIZE, STREAM_BATCH_SIZE
+from utils.rollups import apply_rollups, event_changes
+from utils.intervals import IntervalTree, find_overlaps
+from utils.scheduling import check_schedule, describe_conflicts, find_conflicts, overlap_condition
+from utils.search import like_pattern, search_terms
+from utils.cache import cached, invalidates
+from utils.refcache import cached_reference
 
 # Création d'une session SQLAlchemy pour interagir avec la base de données
 session = sessionmaker(bind=engine)()
 
+# Nombre d'affectations enregistrées par requête UPDATE (auto_assign_events)
+AUTO_ASSIGN_BATCH_SIZE = 500
+
 
 @require_role("commercial")
-def create_event(contract_id, name, date_start, date_end, location, attendees, notes):
+@invalidates("events")
+def create_event(contract_id, name, date_start, date_end, location, attendees, notes, allow_overlap=False,
+                 current_user=None):
     """
     Crée un événement pour un contrat signé appartenant au commercial connecté.
 
@@ -24,14 +39,17 @@ def create_event(contract_id, name, date_start, date_end, location, attendees, n
         location (str): Lieu de l'événement.
         attendees (int): Nombre de participants.
         notes (str): Informations complémentaires.
+        allow_overlap (bool): Accepter (avec un avertissement) un lieu déjà réservé sur la période.
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
 
     Règles métier:
         - Le contrat doit exister.
         - Le contrat doit être signé.
         - Le commercial connecté doit être le propriétaire du contrat.
         - La date de fin doit être postérieure à la date de début.
+        - Le lieu ne doit pas être déjà réservé sur la période (sauf allow_overlap).
     """
-    user = get_current_user()
+    user = current_user
     contract = session.query(Contract).filter_by(id=contract_id).first()
 
     if not contract:
@@ -57,6 +75,13 @@ def create_event(contract_id, name, date_start, date_end, location, attendees, n
     if date_end_obj <= date_start_obj:
         raise Exception("La date de fin doit être postérieure à la date de début.")
 
+    venue_conflicts = find_conflicts(session, date_start_obj, date_end_obj, location=location)
+    warning = check_schedule(
+        [describe_conflicts(f"Le lieu « {location} » est déjà réservé pour", venue_conflicts)]
+        if venue_conflicts else [],
+        allow_overlap,
+    )
+
     # Création et enregistrement de l'événement
     event = Event(
         name=name,
@@ -68,44 +93,55 @@ def create_event(contract_id, name, date_start, date_end, location, attendees, n
         notes=notes
     )
     session.add(event)
+    apply_rollups(session, event_changes(contract.sales_contact_id, date_start_obj))
     session.commit()
-    return "Événement créé avec succès."
+    return "Événement créé avec succès." + warning
 
 
 @require_role("commercial")
-def delete_event(event_id):
+@invalidates("events")
+def delete_event(event_id, current_user=None):
     """
     Supprime un événement uniquement si le commercial connecté est le propriétaire du contrat lié.
 
     Args:
         event_id (int): ID de l'événement à supprimer.
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
     """
-    current_user = get_current_user()
-
     if get_user_role(current_user) != "commercial":
         raise Exception("Vous n'avez pas les droits pour supprimer un événement.")
 
-    # Chargement de l'événement avec le contrat associé
-    event = session.query(Event).options(joinedload(Event.contract)).filter_by(id=event_id).first()
+    # Chargement de l'événement avec le contrat associé (événement verrouillé pour les agrégats)
+    event = (session.query(Event).options(joinedload(Event.contract)).filter_by(id=event_id)
+             .with_for_update(of=Event).populate_existing().first())
     if not event:
         raise Exception("Événement introuvable.")
 
     if event.contract.sales_contact_id != current_user.id:
         raise Exception("Vous ne pouvez supprimer que les événements liés à vos propres contrats.")
 
+    apply_rollups(session, event_changes(event.contract.sales_contact_id, event.date_start, sign=-1))
     session.delete(event)
     session.commit()
     return f"Événement ID {event_id} supprimé avec succès."
 
 
 @require_role("gestion")
-def assign_support(event_id, support_email):
+@invalidates("events")
+def assign_support(event_id, support_email, allow_overlap=False):
     """
     Assigne un utilisateur de type 'support' à un événement.
 
+    Le planning du support est vérifié par une requête indexée sur ses seuls
+    événements qui chevauchent la période (voir utils.scheduling).
+
     Args:
         event_id (int): ID de l'événement.
         support_email (str): Email du support à assigner.
+        allow_overlap (bool): Accepter (avec un avertissement) un support déjà occupé sur la période.
+
+    Raises:
+        Exception: Si le support est déjà assigné à un événement qui chevauche celui-ci.
     """
     event = session.query(Event).filter_by(id=event_id).first()
     if not event:
@@ -119,13 +155,22 @@ def assign_support(event_id, support_email):
     if not support_user:
         raise Exception("Utilisateur support introuvable.")
 
+    conflicts = find_conflicts(session, event.date_start, event.date_end,
+                               support_contact_id=support_user.id, exclude_event_id=event.id)
+    warning = check_schedule(
+        [describe_conflicts(f"{support_user.name} est déjà assigné à", conflicts)] if conflicts else [],
+        allow_overlap,
+    )
+
     event.support_contact_id = support_user.id
     session.commit()
-    return f"Support {support_user.name} assigné à l'événement."
+    return f"Support {support_user.name} assigné à l'événement." + warning
 
 
 @require_role("support")
-def update_my_event(event_id, date_start=None, date_end=None, location=None, attendees=None, notes=None):
+@invalidates("events")
+def update_my_event(event_id, date_start=None, date_end=None, location=None, attendees=None, notes=None,
+                    allow_overlap=False, current_user=None):
     """
     Met à jour un événement assigné au support connecté.
 
@@ -136,31 +181,55 @@ def update_my_event(event_id, date_start=None, date_end=None, location=None, att
         location (str): Nouveau lieu.
         attendees (int): Nouveau nombre de participants.
         notes (str): Nouvelles notes.
+        allow_overlap (bool): Accepter (avec un avertissement) un chevauchement de planning ou de lieu.
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
     """
-    current_user = get_current_user()
-
     if not hasattr(current_user, "id"):
         raise Exception("Erreur : utilisateur invalide (ID manquant).")
 
-    event = session.query(Event).filter_by(id=event_id).first()
+    # Verrouillé (FOR UPDATE) : le déplacement dans les agrégats part de la date lue
+    event = session.query(Event).filter_by(id=event_id).with_for_update().populate_existing().first()
 
     if not event or event.support_contact_id != current_user.id:
         raise Exception("Événement introuvable ou non assigné à vous.")
 
     try:
-        if date_start is not None:
-            event.date_start = datetime.strptime(date_start, "%Y-%m-%d %H:%M")
-        if date_end is not None:
-            event.date_end = datetime.strptime(date_end, "%Y-%m-%d %H:%M")
-        if location is not None:
-            event.location = location
+        date_format = "%Y-%m-%d %H:%M"
+        new_start = event.date_start if date_start is None else datetime.strptime(date_start, date_format)
+        new_end = event.date_end if date_end is None else datetime.strptime(date_end, date_format)
+        new_location = location if location is not None else event.location
+
+        # Vérification du planning du support et du lieu avant toute modification
+        warning = ""
+        if (new_start, new_end, new_location) != (event.date_start, event.date_end, event.location):
+            problems = []
+            conflicts = find_conflicts(session, new_start, new_end,
+                                       support_contact_id=current_user.id, exclude_event_id=event.id)
+            if conflicts:
+                problems.append(describe_conflicts("Vous êtes déjà assigné à", conflicts))
+            conflicts = find_conflicts(session, new_start, new_end,
+                                       location=new_location, exclude_event_id=event.id)
+            if conflicts:
+                problems.append(
+                    describe_conflicts(f"Le lieu « {new_location} » est déjà réservé pour", conflicts)
+                )
+            warning = check_schedule(problems, allow_overlap)
+
+        if new_start != event.date_start:
+            # Un changement de mois déplace l'événement dans les agrégats mensuels
+            sales_contact_id = event.contract.sales_contact_id
+            apply_rollups(session, event_changes(sales_contact_id, event.date_start, sign=-1)
+                          + event_changes(sales_contact_id, new_start))
+        event.date_start = new_start
+        event.date_end = new_end
+        event.location = new_location
         if attendees is not None:
             event.attendees = attendees
         if notes is not None:
             event.notes = notes
 
         session.commit()
-        return "Événement mis à jour avec succès."
+        return "Événement mis à jour avec succès." + warning
     except ValueError:
         raise Exception("Erreur : format de date invalide. Utilisez YYYY-MM-DD HH:MM.")
     except Exception as e:
@@ -168,27 +237,25 @@ def update_my_event(event_id, date_start=None, date_end=None, location=None, att
 
 
 @require_role("commercial", "gestion", "support")
-def list_events():
+@cached("events")
+def list_events(limit=None, after=None, db_session=None):
     """
     Retourne la liste de tous les événements sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de événements à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (Session | None): session de test (sinon session du module)
     """
     try:
-        events = session.query(Event).all()
+        session_to_use = db_session if db_session is not None else session
+        events = keyset_paginate(session_to_use.query(Event), Event.id, limit, after).all()
         if not events:
             raise Exception("Aucun événement trouvé.")
 
         events_dict = {}
         for event in events:
-            events_dict[event.id] = {
-                "id": event.id,
-                "name": event.name,
-                "date_start": event.date_start.strftime("%Y-%m-%d %H:%M"),
-                "date_end": event.date_end.strftime("%Y-%m-%d %H:%M"),
-                "location": event.location,
-                "attendees": event.attendees,
-                "notes": event.notes or "",
-                "support_contact_id": event.support_contact_id
-            }
+            events_dict[event.id] = event_to_dict(event)
 
         return events_dict
 
@@ -196,13 +263,157 @@ def list_events():
         raise Exception(f"Erreur lors de la récupération des événements : {e}")
 
 
+@require_role("commercial", "gestion", "support")
+def iter_events(limit=None, after=None, batch_size=STREAM_BATCH_SIZE, db_session=None):
+    """
+    Parcourt les événements en flux, sans construire de dictionnaire complet.
+
+    Les lignes sont lues par lots de `batch_size` via un curseur côté serveur
+    (yield_per / stream_results) : la mémoire reste constante quelle que soit
+    la taille de la table.
+
+    Args:
+        limit (int | None): Nombre maximum d'événements à parcourir (None = tous).
+        after (int | None): ID à partir duquel reprendre le parcours.
+        batch_size (int): Nombre de lignes lues par lot.
+        db_session (Session | None): session de test (sinon session du module)
+
+    Yields:
+        dict: Un événement, au même format que list_events.
+    """
+    session_to_use = db_session if db_session is not None else session
+    query = event_rows_query(session_to_use)
+    for row in keyset_paginate(query, Event.id, limit, after).yield_per(batch_size):
+        yield event_to_dict(row)
+
+
+@require_role("commercial", "gestion", "support")
+@cached("events", "contracts")
+def pick_events(search=None, limit=PICKER_PAGE_SIZE, after=None, unassigned=False, mine=False,
+                db_session=None, current_user=None):
+    """
+    Page d'événements pour un sélecteur (utils.picker) : filtrés par mots-clés, triés par ID.
+
+    Args:
+        search (str | None): Mots recherchés dans le nom ou le lieu de l'événement.
+        limit (int): Nombre maximum d'événements retournés.
+        after (int | None): ID du dernier événement de la page précédente.
+        unassigned (bool): Ne retenir que les événements sans support.
+        mine (bool): Ne retenir que les événements de l'utilisateur connecté : assignés
+            au support connecté, ou liés aux contrats du commercial connecté.
+        db_session (Session | None): session de test (sinon session du module)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        dict: Événements au format de event_to_dict (vide si aucun).
+    """
+    session_to_use = db_session if db_session is not None else session
+    query = event_rows_query(session_to_use)
+    if unassigned:
+        query = query.filter(Event.support_contact_id.is_(None))
+    if mine:
+        if get_user_role(current_user) == "support":
+            query = query.filter(Event.support_contact_id == current_user.id)
+        else:
+            query = query.filter(Event.contract.has(Contract.sales_contact_id == current_user.id))
+    for term in search_terms(search):
+        pattern = like_pattern(term)
+        query = query.filter(or_(Event.name.ilike(pattern, escape="\\"),
+                                 Event.location.ilike(pattern, escape="\\")))
+    return {row.id: event_to_dict(row) for row in keyset_paginate(query, Event.id, limit, after)}
+
+
+@require_role("gestion")
+@cached("users", "departments")
+def pick_support_users(search=None, limit=PICKER_PAGE_SIZE, after=None, db_session=None):
+    """
+    Page d'utilisateurs du support pour un sélecteur (utils.picker), triés par ID.
+
+    Args:
+        search (str | None): Mots recherchés dans le nom ou l'email.
+        limit (int): Nombre maximum d'utilisateurs retournés.
+        after (int | None): ID du dernier utilisateur de la page précédente.
+        db_session (Session | None): session de test (sinon session du module)
+
+    Returns:
+        dict: {id: {"id", "name", "email"}} (vide si aucun).
+    """
+    session_to_use = db_session if db_session is not None else session
+    query = session_to_use.query(User.id, User.name, User.email).filter(User.department.has(name="support"))
+    terms = search_terms(search)
+    if not terms:
+        # Sans recherche : liste complète (données de référence), relue d'une commande à l'autre
+        # dans le cache disque puis paginée ici
+        users = cached_reference(session_to_use, "support_user_rows", lambda: [
+            {"id": row.id, "name": row.name, "email": row.email} for row in query.order_by(User.id)
+        ])
+        page = [user for user in users if after is None or user["id"] > after]
+        return {user["id"]: user for user in page[:limit]}
+    for term in terms:
+        pattern = like_pattern(term)
+        query = query.filter(or_(User.name.ilike(pattern, escape="\\"),
+                                 User.email.ilike(pattern, escape="\\")))
+    return {
+        row.id: {"id": row.id, "name": row.name, "email": row.email}
+        for row in keyset_paginate(query, User.id, limit, after)
+    }
+
+
+def event_rows_query(session_to_use):
+    """
+    Requête en colonnes (sans objets ORM) des événements, dans l'ordre des champs de event_to_dict.
+
+    Partagée par le parcours en flux et l'export.
+
+    Args:
+        session_to_use (Session): Session SQLAlchemy.
+
+    Returns:
+        Query: Requête non triée.
+    """
+    return session_to_use.query(
+        Event.id, Event.name, Event.date_start, Event.date_end, Event.location,
+        Event.attendees, Event.notes, Event.support_contact_id
+    )
+
+
+def event_to_dict(event):
+    """
+    Formate un événement (objet ou ligne de résultat) pour l'affichage.
+
+    Args:
+        event: Événement ou ligne exposant les mêmes attributs.
+
+    Returns:
+        dict: Événement formaté.
+    """
+    return {
+        "id": event.id,
+        "name": event.name,
+        "date_start": event.date_start.strftime("%Y-%m-%d %H:%M"),
+        "date_end": event.date_end.strftime("%Y-%m-%d %H:%M"),
+        "location": event.location,
+        "attendees": event.attendees,
+        "notes": event.notes or "",
+        "support_contact_id": event.support_contact_id
+    }
+
+
 @require_role("gestion")
-def list_unassigned_events():
+@cached("events")
+def list_unassigned_events(limit=None, after=None, db_session=None):
     """
     Retourne la liste des événements non assignés sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de événements à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (Session | None): session de test (sinon session du module)
     """
     try:
-        events = session.query(Event).filter_by(support_contact_id=None).all()
+        session_to_use = db_session if db_session is not None else session
+        query = session_to_use.query(Event).filter_by(support_contact_id=None)
+        events = keyset_paginate(query, Event.id, limit, after).all()
         if not events:
             raise Exception("Aucun événement non assigné trouvé.")
 
@@ -225,13 +436,21 @@ def list_unassigned_events():
 
 
 @require_role("support")
-def list_my_events():
+@cached("events")
+def list_my_events(limit=None, after=None, db_session=None, current_user=None):
     """
     Retourne la liste des événements assignés au support connecté sous forme de dictionnaire.
+
+    Args:
+        limit (int | None): Nombre maximum de événements à retourner (None = tous).
+        after (int | None): ID de la dernière ligne de la page précédente (pagination par clé).
+        db_session (Session | None): session de test (sinon session du module)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
     """
     try:
-        user = get_current_user()
-        events = session.query(Event).filter_by(support_contact_id=user.id).all()
+        session_to_use = db_session if db_session is not None else session
+        query = session_to_use.query(Event).filter_by(support_contact_id=current_user.id)
+        events = keyset_paginate(query, Event.id, limit, after).all()
         if not events:
             raise Exception("Vous n'avez aucun événement assigné.")
 
@@ -253,64 +472,208 @@ def list_my_events():
         raise Exception(f"Erreur lors de la récupération de vos événements : {e}")
 
 
-def list_signed_contracts():
+@require_role("gestion")
+def list_schedule_conflicts(by="support", limit=None, batch_size=STREAM_BATCH_SIZE, db_session=None):
     """
-    Retourne la liste des contrats signés sous forme de dictionnaire.
+    Recense les chevauchements existants : supports assignés à deux événements simultanés,
+    ou lieux réservés deux fois.
+
+    Les événements sont lus une seule fois, en flux, triés par support (ou lieu) puis par
+    début ; les chevauchements de chaque groupe sont trouvés avec un arbre d'intervalles
+    (O(n log n + k) au lieu de comparer toutes les paires).
+
+    Args:
+        by (str): "support" ou "location".
+        limit (int | None): Nombre maximum de conflits retournés.
+        batch_size (int): Nombre de lignes lues par lot.
+        db_session (Session | None): session de test (sinon session du module)
+
+    Returns:
+        list[dict]: Conflits ({"key", "first", "second"}), chaque événement sous forme
+            {"id", "name", "date_start", "date_end"}.
     """
-    try:
-        from models.client import Client
-
-        contracts = (
-            session.query(Contract, Client, User)
-            .join(Client, Contract.client_id == Client.id)
-            .join(User, Contract.sales_contact_id == User.id)
-            .filter(Contract.signed)
-            .all()
+    if by not in ("support", "location"):
+        raise Exception(f"Critère inconnu : {by} (choix : support, location).")
+
+    session_to_use = db_session if db_session is not None else session
+    if by == "support":
+        key = User.name
+        query = (
+            session_to_use.query(Event.support_contact_id.label("group"), key.label("key"),
+                                 Event.id, Event.name, Event.date_start, Event.date_end)
+            .join(User, User.id == Event.support_contact_id)
+            .order_by(Event.support_contact_id, Event.date_start)
+        )
+    else:
+        query = (
+            session_to_use.query(Event.location.label("group"), Event.location.label("key"),
+                                 Event.id, Event.name, Event.date_start, Event.date_end)
+            .order_by(Event.location, Event.date_start)
         )
 
-        if not contracts:
-            raise Exception("Aucun contrat signé trouvé.")
+    conflicts = []
+    for _, rows in groupby(query.yield_per(batch_size), key=lambda row: row.group):
+        for first, second in find_overlaps((row.date_start, row.date_end, row) for row in rows):
+            conflicts.append({
+                "key": first.key,
+                "first": {"id": first.id, "name": first.name,
+                          "date_start": first.date_start, "date_end": first.date_end},
+                "second": {"id": second.id, "name": second.name,
+                           "date_start": second.date_start, "date_end": second.date_end},
+            })
+            if limit is not None and len(conflicts) >= limit:
+                return conflicts
+    return conflicts
 
-        contracts_dict = {}
-        for contract, client, commercial in contracts:
-            contracts_dict[contract.id] = {
-                "id": contract.id,
-                "client_name": client.name,
-                "client_email": client.email,
-                "commercial_name": commercial.name,
-                "amount_total": contract.amount_total,
-                "signed_date": (contract.signed_date.strftime('%Y-%m-%d')
-                                if contract.signed_date else "Non défini")
 
-            }
+@require_role("gestion")
+@invalidates("events")
+def auto_assign_events(date_from=None, date_to=None, dry_run=False, db_session=None, current_user=None):
+    """
+    Assigne automatiquement un support à chaque événement non assigné d'une période.
 
-        return contracts_dict
+    Les événements sont traités par date de début. Pour chacun, le support le moins
+    chargé (heures d'événements assignés sur la période, file de priorité heapq) qui
+    n'a pas d'événement simultané est retenu ; les plannings sont tenus dans un arbre
+    d'intervalles par support, alimenté au fur et à mesure des affectations.
+    Toutes les affectations sont enregistrées dans une seule transaction ; elle est
+    annulée si un événement a été assigné ou si le planning d'un support retenu a
+    changé depuis la lecture.
 
-    except Exception as e:
-        raise Exception(f"Erreur lors de la récupération des contrats signés : {e}")
+    Args:
+        date_from (datetime | None): Début de la période (événements commençant à partir de cette date).
+        date_to (datetime | None): Fin de la période (événements commençant avant cette date).
+        dry_run (bool): Calculer le plan sans rien enregistrer.
+        db_session (Session | None): session de test (sinon session du module)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        dict: {"assignments": [dict, ...] (événement et support retenu),
+               "unassigned": [dict, ...] (événements sans support disponible),
+               "dry_run": bool}.
+
+    Raises:
+        Exception: S'il n'y a aucun support, ou si un événement ou un planning a changé entre-temps.
+    """
+    session_to_use = db_session if db_session is not None else session
 
+    supports = dict(
+        session_to_use.query(User.id, User.name)
+        .filter(User.department.has(name="support"))
+        .all()
+    )
+    if not supports:
+        raise Exception("Aucun utilisateur support trouvé.")
 
-def list_support_users():
+    query = session_to_use.query(Event.id, Event.name, Event.date_start, Event.date_end).filter(
+        Event.support_contact_id.is_(None)
+    )
+    if date_from is not None:
+        query = query.filter(Event.date_start >= date_from)
+    if date_to is not None:
+        query = query.filter(Event.date_start < date_to)
+    events = query.order_by(Event.date_start, Event.id).all()
+    if not events:
+        return {"assignments": [], "unassigned": [], "dry_run": dry_run}
+
+    # Plannings et charge actuels des supports, limités aux événements qui recoupent la période
+    window_start = events[0].date_start
+    window_end = max(event.date_end for event in events)
+    schedules = {support_id: IntervalTree() for support_id in supports}
+    hours = dict.fromkeys(supports, 0.0)
+    dialect_name = session_to_use.get_bind().dialect.name
+    booked = session_to_use.query(Event.support_contact_id, Event.date_start, Event.date_end).filter(
+        Event.support_contact_id.in_(supports),
+        overlap_condition(dialect_name, window_start, window_end),
+    )
+    for support_id, start, end in booked:
+        schedules[support_id].insert(start, end)
+        hours[support_id] += (end - start).total_seconds() / 3600
+
+    # File de priorité : le support le moins chargé en premier (ID en cas d'égalité)
+    queue = [(load, support_id) for support_id, load in hours.items()]
+    heapq.heapify(queue)
+
+    assignments, unassigned = [], []
+    for event in events:
+        busy = []
+        chosen = None
+        while queue:
+            load, support_id = heapq.heappop(queue)
+            if schedules[support_id].overlaps(event.date_start, event.date_end):
+                busy.append((load, support_id))
+                continue
+            chosen = support_id
+            duration = (event.date_end - event.date_start).total_seconds() / 3600
+            schedules[support_id].insert(event.date_start, event.date_end, event.id)
+            heapq.heappush(queue, (load + duration, support_id))
+            break
+        for entry in busy:
+            heapq.heappush(queue, entry)
+
+        row = {"event_id": event.id, "event_name": event.name,
+               "date_start": event.date_start, "date_end": event.date_end}
+        if chosen is None:
+            unassigned.append(row)
+        else:
+            assignments.append({**row, "support_id": chosen, "support_name": supports[chosen]})
+
+    if not dry_run and assignments:
+        try:
+            # L'événement ne doit pas avoir été assigné depuis la lecture
+            assigned = _write_assignments(session_to_use, assignments)
+            if assigned != {a["event_id"] for a in assignments}:
+                raise Exception("des événements ont été assignés entre-temps, relancez la commande")
+            # Ni un support avoir reçu entre-temps un événement simultané
+            if _assignment_conflicts(session_to_use, assignments, window_start, window_end):
+                raise Exception("le planning d'un support a changé entre-temps, relancez la commande")
+            session_to_use.commit()
+        except Exception as e:
+            session_to_use.rollback()
+            raise Exception(f"Erreur lors de l'assignation automatique : {e}")
+
+    return {"assignments": assignments, "unassigned": unassigned, "dry_run": dry_run}
+
+
+def _write_assignments(session_to_use, assignments):
     """
-    Retourne la liste des utilisateurs du support sous forme de dictionnaire.
+    Enregistre les affectations par lots de UPDATE ... SET support_contact_id = CASE id ...
+    limités aux événements encore non assignés.
+
+    Returns:
+        set[int]: IDs des événements réellement assignés (RETURNING, ou nombre de lignes
+        d'une requête unique si le dialecte ne le permet pas).
     """
-    try:
-        support_users = session.query(User).filter(
-            User.department.has(name="support")
-        ).all()
-
-        if not support_users:
-            raise Exception("Aucun utilisateur support trouvé.")
-
-        users_dict = {}
-        for user in support_users:
-            users_dict[user.email] = {
-                "id": user.id,
-                "name": user.name,
-                "email": user.email
-            }
+    events_table = Event.__table__
+    returning = session_to_use.get_bind().dialect.update_returning
+    assigned = set()
+    for start in range(0, len(assignments), AUTO_ASSIGN_BATCH_SIZE):
+        batch = {a["event_id"]: a["support_id"] for a in assignments[start:start + AUTO_ASSIGN_BATCH_SIZE]}
+        stmt = (
+            events_table.update()
+            .where(events_table.c.id.in_(batch), events_table.c.support_contact_id.is_(None))
+            .values(support_contact_id=case(batch, value=events_table.c.id))
+        )
+        if returning:
+            assigned.update(session_to_use.execute(stmt.returning(events_table.c.id)).scalars())
+        elif session_to_use.execute(stmt).rowcount == len(batch):
+            assigned.update(batch)
+    return assigned
 
-        return users_dict
 
-    except Exception as e:
-        raise Exception(f"Erreur lors de la récupération des utilisateurs support : {e}")
+def _assignment_conflicts(session_to_use, assignments, window_start, window_end):
+    """
+    Relit, après écriture, les plannings des supports retenus et indique si l'un des
+    événements assignés en chevauche un autre (affectation concurrente depuis la lecture).
+    """
+    ours = {a["event_id"] for a in assignments}
+    dialect_name = session_to_use.get_bind().dialect.name
+    rows = session_to_use.query(Event.support_contact_id, Event.date_start, Event.date_end, Event.id).filter(
+        Event.support_contact_id.in_({a["support_id"] for a in assignments}),
+        overlap_condition(dialect_name, window_start, window_end),
+    ).order_by(Event.support_contact_id)
+    for _, intervals in groupby(rows, key=lambda row: row[0]):
+        for first, second in find_overlaps((start, end, event_id) for _, start, end, event_id in intervals):
+            if first in ours or second in ours:
+                return True
+    return False
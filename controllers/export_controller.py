@@ -0,0 +1,110 @@
+import csv
+import json
+from sqlalchemy.orm import sessionmaker
+from controllers.client_controller import iter_clients, client_rows_query
+from controllers.contract_controller import iter_contracts, contract_rows_query
+from controllers.event_controller import iter_events, event_rows_query
+from models.client import Client
+from models.contract import Contract
+from models.event import Event
+from utils.auth_utils import require_role
+from utils.connection import engine
+from utils.pagination import STREAM_BATCH_SIZE
+
+# Création d'une session SQLAlchemy pour interagir avec la base de données
+session = sessionmaker(bind=engine)()
+
+# Pour chaque entité exportable : parcours en flux, requête en colonnes et clé de tri
+EXPORTS = {
+    "clients": (iter_clients, client_rows_query, Client.id),
+    "contracts": (iter_contracts, contract_rows_query, Contract.id),
+    "events": (iter_events, event_rows_query, Event.id),
+}
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+
+@require_role("commercial", "gestion", "support")
+def export_rows(entity, output, fmt="csv", use_copy=False, batch_size=STREAM_BATCH_SIZE, db_session=None,
+                current_user=None):
+    """
+    Exporte une table en flux vers un fichier ou la sortie standard.
+
+    Les lignes sont lues par lots via un curseur côté serveur et écrites au fil de l'eau :
+    la mémoire utilisée ne dépend pas du nombre de lignes. Les colonnes sont celles
+    des commandes de liste (list_clients, list_contracts, list_events).
+
+    Args:
+        entity (str): "clients", "contracts" ou "events".
+        output (TextIO): Flux de sortie (ouvert en mode texte).
+        fmt (str): "csv" ou "ndjson".
+        use_copy (bool): Sous PostgreSQL et en CSV, utiliser COPY ... TO STDOUT
+            (valeurs brutes, sans formatage des dates).
+        batch_size (int): Nombre de lignes lues par lot.
+        db_session (Session | None): session de test (sinon session du module)
+        current_user (Identity | None): Utilisateur authentifié (injecté par require_role).
+
+    Returns:
+        int | None: Nombre de lignes exportées (None avec COPY, le comptage restant côté serveur).
+
+    Raises:
+        Exception: Si l'entité ou le format est inconnu, ou si COPY n'est pas disponible.
+    """
+    if entity not in EXPORTS:
+        raise Exception(f"Export inconnu : {entity}.")
+    if fmt not in EXPORT_FORMATS:
+        raise Exception(f"Format d'export inconnu : {fmt}.")
+
+    session_to_use = db_session if db_session is not None else session
+    iter_rows, rows_query, key_column = EXPORTS[entity]
+
+    if use_copy:
+        if fmt != "csv" or session_to_use.get_bind().dialect.name != "postgresql":
+            raise Exception("L'export COPY n'est disponible qu'en CSV avec PostgreSQL.")
+        _copy_to(session_to_use, rows_query(session_to_use).order_by(key_column), output)
+        return None
+
+    rows = iter_rows(batch_size=batch_size, db_session=session_to_use, current_user=current_user)
+    if fmt == "ndjson":
+        return _write_ndjson(rows, output)
+    # Les colonnes de la requête portent les noms des champs de *_to_dict, dans le même ordre
+    fieldnames = [column["name"] for column in rows_query(session_to_use).column_descriptions]
+    return _write_csv(rows, output, fieldnames)
+
+
+def _write_csv(rows, output, fieldnames):
+    """
+    Écrit les lignes en CSV au fil de l'eau, précédées de l'en-tête (même sans aucune ligne).
+    """
+    writer = csv.DictWriter(output, fieldnames=fieldnames, lineterminator="\n")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def _write_ndjson(rows, output):
+    """
+    Écrit une ligne JSON par enregistrement, au fil de l'eau.
+    """
+    count = 0
+    for row in rows:
+        output.write(json.dumps(row, ensure_ascii=False, default=str))
+        output.write("\n")
+        count += 1
+    return count
+
+
+def _copy_to(session_to_use, query, output):
+    """
+    Exporte le résultat d'une requête via COPY (...) TO STDOUT (PostgreSQL / psycopg2).
+    """
+    connection = session_to_use.connection()
+    sql = str(query.statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", output)
+    finally:
+        cursor.close()
@@ -1,18 +1,34 @@
-import sentry_sdk
-from sqlalchemy.orm import sessionmaker
+import os
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy.orm import sessionmaker, joinedload
+from controllers.client_controller import validate_email
 from models.department import Department
 from models.user import User
-from utils.auth import hash_password, get_current_user, get_user_role
+from utils.auth import hash_password, get_user_role
 from utils.auth_utils import require_role
+from utils.bulk import bulk_insert
+from utils.datafiles import iter_records, batched, RejectWriter
+from utils.pagination import keyset_paginate
 from utils.connection import engine
+from utils.telemetry import audit
+from utils.cache import cached, invalidates
+from utils.refcache import bump_reference_version, cached_reference
 
 
 # Création d'une session SQLAlchemy
 session = sessionmaker(bind=engine)()
 
+# Colonnes attendues dans un fichier d'import d'utilisateurs
+# (department : ID ou nom du département)
+IMPORT_FIELDS = ["name", "email", "password", "department"]
+# Colonnes recopiées dans le fichier de rejets : jamais le mot de passe en clair
+REJECT_FIELDS = ["name", "email", "department"]
+IMPORT_BATCH_SIZE = 500
+
 
 @require_role("gestion")
-def create_user(name, email, department_id, password):
+@invalidates("users")
+def create_user(name, email, department_id, password, current_user=None):
     """
     Crée un nouvel utilisateur avec le département et mot de passe spécifiés.
     """
@@ -32,11 +48,11 @@ def create_user(name, email, department_id, password):
         # Création et ajout de l'utilisateur
         user = User(name=name, email=email, password=hashed, department=department)
         session.add(user)
+        bump_reference_version(session)
         session.commit()
 
-        # Log pour Sentry
-        current_user = get_current_user()
-        sentry_sdk.capture_message(f"Utilisateur créé : {email} par {current_user.email}")
+        # Audit (envoyé par lot à Sentry en arrière-plan)
+        audit("user_created", user=email, by=current_user.email)
 
         return "Utilisateur créé avec succès."
 
@@ -45,7 +61,8 @@ def create_user(name, email, department_id, password):
 
 
 @require_role("gestion")
-def update_user(email, name=None, password=None, department_id=None):
+@invalidates("users")
+def update_user(email, name=None, password=None, department_id=None, current_user=None):
     """
     Met à jour un utilisateur existant.
     """
@@ -65,8 +82,11 @@ def update_user(email, name=None, password=None, department_id=None):
                 raise Exception("Département introuvable.")
             user.department = department
 
+        if name or department_id:
+            # Nom ou rôle modifié : données de référence en cache disque à relire
+            bump_reference_version(session)
         session.commit()
-        sentry_sdk.capture_message(f"Utilisateur modifié : {email} par {get_current_user().email}")
+        audit("user_updated", user=email, by=current_user.email)
         return "Utilisateur mis à jour avec succès."
 
     except Exception as e:
@@ -74,11 +94,11 @@ def update_user(email, name=None, password=None, department_id=None):
 
 
 @require_role("gestion")
-def delete_user(email):
+@invalidates("users")
+def delete_user(email, current_user=None):
     """
     Supprime un utilisateur identifié par son email.
     """
-    current_user = get_current_user()
     if get_user_role(current_user) != "gestion":
         raise Exception("Vous n'avez pas les droits pour supprimer un utilisateur.")
 
@@ -94,48 +114,223 @@ def delete_user(email):
         )
 
     session.delete(user)
+    bump_reference_version(session)
     session.commit()
-    sentry_sdk.capture_message(f"Utilisateur supprimé : {email} par {current_user.email}")
+    audit("user_deleted", user=email, by=current_user.email)
     return f"Utilisateur avec l'email '{email}' supprimé avec succès."
 
 
 @require_role("gestion")
-def list_users():
+def list_users(limit=None, after=None, db_session=None):
     """
     Retourne la liste de tous les utilisateurs enregistrés sous forme de dictionnaire.
+
+    Les utilisateurs sont paginés sur leur email (colonne unique et indexée),
+    qui est aussi la clé du dictionnaire retourné.
+
+    Args:
+        limit (int | None): Nombre maximum d'utilisateurs à retourner (None = tous).
+        after (str | None): Email du dernier utilisateur de la page précédente.
+        db_session (Session | None): session de test (sinon session du module)
     """
     try:
-        users = session.query(User).all()
-        if not users:
-            raise Exception("Aucun utilisateur trouvé.")
-
-        users_dict = {}
-        for user in users:
-            dept_name = user.department.name if user.department else "Non défini"
-            users_dict[user.email] = {
-                "id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "department_name": dept_name
-            }
-
-        return users_dict
+        return _users_page(limit=limit, after=after, db_session=db_session)
 
     except Exception as e:
         return f"Erreur lors de la récupération des utilisateurs : {e}"
 
 
+@cached("users", "departments")
+def _users_page(limit=None, after=None, db_session=None):
+    """
+    Page d'utilisateurs de list_users. Seuls les résultats sont mis en cache : une erreur
+    est levée, donc recalculée à l'appel suivant.
+    """
+    session_to_use = db_session if db_session is not None else session
+    # Le département est chargé dans la même requête (pas de requête par utilisateur)
+    query = session_to_use.query(User).options(joinedload(User.department))
+    users = keyset_paginate(query, User.email, limit, after).all()
+    if not users:
+        raise Exception("Aucun utilisateur trouvé.")
+
+    users_dict = {}
+    for user in users:
+        dept_name = user.department.name if user.department else "Non défini"
+        users_dict[user.email] = {
+            "id": user.id,
+            "name": user.name,
+            "email": user.email,
+            "department_name": dept_name
+        }
+
+    return users_dict
+
+
 def list_departments():
     """
     Retourne la liste de tous les départements enregistrés.
     """
     try:
-        departments = session.query(Department).all()
-        if not departments:
-            raise Exception("Aucun département trouvé.")
-
-        lines = [f"{dept.id} | {dept.name}" for dept in departments]
-        return "\n".join(lines)
+        return _departments_text()
 
     except Exception as e:
         return f"Erreur lors de la récupération des départements : {e}"
+
+
+@cached("departments")
+def _departments_text():
+    """
+    Liste des départements de list_departments (les erreurs levées ne sont pas mises en cache).
+    """
+    departments = department_choices()
+    if not departments:
+        raise Exception("Aucun département trouvé.")
+    return "\n".join(f"{dept['id']} | {dept['name']}" for dept in departments)
+
+
+def department_choices(db_session=None):
+    """
+    Retourne les départements (ID et nom, triés par ID) proposés lors de la saisie d'un utilisateur.
+
+    Données de référence : relues d'une commande à l'autre dans le cache disque (utils.refcache).
+
+    Args:
+        db_session (Session | None): session de test (sinon session du module)
+
+    Returns:
+        list[dict]: [{"id": 1, "name": "commercial"}, ...]
+    """
+    session_to_use = db_session if db_session is not None else session
+    query = session_to_use.query(Department.id, Department.name).order_by(Department.id)
+    return cached_reference(session_to_use, "department_rows", lambda: [
+        {"id": department_id, "name": name} for department_id, name in query
+    ])
+
+
+def department_map(session_to_use):
+    """
+    Charge en une requête la correspondance département -> ID, par ID et par nom.
+
+    Args:
+        session_to_use (Session): Session SQLAlchemy.
+
+    Returns:
+        dict: {"1": 1, "commercial": 1, ...} (clés en minuscules).
+    """
+    mapping = {}
+    for department_id, name in session_to_use.query(Department.id, Department.name):
+        mapping[str(department_id)] = department_id
+        mapping[name.strip().lower()] = department_id
+    return mapping
+
+
+def validate_user_record(record, departments):
+    """
+    Valide une ligne d'import d'utilisateur avec les mêmes règles que create_user.
+
+    Args:
+        record (dict): Ligne lue dans le fichier (name, email, password, department).
+        departments (dict): Correspondance retournée par department_map.
+
+    Returns:
+        dict: Valeurs nettoyées (name, email, password, department_id).
+
+    Raises:
+        Exception: Si un champ manque, si l'email est invalide ou le département inconnu.
+    """
+    values = {field: str(record.get(field) or "").strip() for field in IMPORT_FIELDS}
+    if not values["name"]:
+        raise Exception("Nom de l'utilisateur manquant.")
+    validate_email(values["email"])
+    if not values["password"]:
+        raise Exception("Mot de passe manquant.")
+    department_id = departments.get(values.pop("department").lower())
+    if department_id is None:
+        raise Exception("Département introuvable.")
+    values["department_id"] = department_id
+    return values
+
+
+@require_role("gestion")
+@invalidates("users")
+def import_users(path, reject_path=None, fmt=None, batch_size=IMPORT_BATCH_SIZE, workers=None,
+                 db_session=None, current_user=None):
+    """
+    Crée en masse des utilisateurs depuis un fichier CSV ou JSONL.
+
+    Les départements sont chargés une seule fois ; les emails déjà utilisés sont
+    recherchés par lot (une requête IN par lot). Les mots de passe d'un lot sont
+    hashés en parallèle dans un pool de processus (bcrypt est coûteux en CPU), puis
+    le lot est inséré en une fois (COPY sous PostgreSQL) et validé.
+
+    Args:
+        path (str): Fichier à importer (colonnes name, email, password, department).
+        reject_path (str | None): Fichier CSV des rejets (par défaut `<path>.rejects.csv`).
+        fmt (str | None): "csv" ou "jsonl" (déduit de l'extension par défaut).
+        batch_size (int): Nombre d'utilisateurs hashés et insérés par transaction.
+        workers (int | None): Nombre de processus de hash (par défaut : nombre de CPU).
+        db_session (Session | None): session de test (sinon session du module)
+        current_user (Identity | User | None): utilisateur connecté (fourni par require_role)
+
+    Returns:
+        dict: Nombre d'utilisateurs importés et rejetés, et chemin du fichier de rejets.
+    """
+    session_to_use = db_session if db_session is not None else session
+    reject_path = reject_path or f"{path}.rejects.csv"
+    departments = department_map(session_to_use)
+    table = User.__table__
+    workers = workers or os.cpu_count() or 1
+    seen = set()
+    imported = 0
+
+    def valid_rows(rejects):
+        for line_number, record, error in iter_records(path, fmt):
+            values = None
+            if error is None:
+                try:
+                    values = validate_user_record(record, departments)
+                except Exception as e:
+                    error = str(e)
+            if error is None and values["email"] in seen:
+                error = "Email en double dans le fichier."
+            if error is not None:
+                rejects.write(line_number, record, error)
+                continue
+            seen.add(values["email"])
+            yield line_number, record, values
+
+    with RejectWriter(reject_path, REJECT_FIELDS) as rejects, ProcessPoolExecutor(workers) as pool:
+        for batch in batched(valid_rows(rejects), batch_size):
+            emails = [values["email"] for _, _, values in batch]
+            existing = {email for (email,) in session_to_use.query(User.email).filter(User.email.in_(emails))}
+            rows = []
+            for line_number, record, values in batch:
+                if values["email"] in existing:
+                    rejects.write(line_number, record, "Utilisateur déjà existant.")
+                else:
+                    rows.append(values)
+
+            # Quelques morceaux par processus : peu d'échanges inter-processus, charge équilibrée
+            hashes = pool.map(hash_password, [row["password"] for row in rows],
+                              chunksize=max(1, len(rows) // (4 * workers)))
+            for row, hashed in zip(rows, hashes):
+                row["password"] = hashed
+
+            try:
+                imported += bulk_insert(session_to_use.connection(), table, rows)
+                bump_reference_version(session_to_use)
+                session_to_use.commit()
+            except Exception as e:
+                session_to_use.rollback()
+                raise Exception(
+                    f"Erreur lors de l'import des utilisateurs (après {imported} utilisateurs importés) : {e}"
+                )
+
+    # Un seul événement d'audit pour tout l'import
+    audit("users_imported", imported=imported, rejected=rejects.count, by=current_user.email)
+
+    return {
+        "imported": imported,
+        "rejected": rejects.count,
+        "reject_path": reject_path if rejects.count else None,
+    }
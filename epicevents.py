@@ -1,35 +1,48 @@
 import click
-import os
-from commands.client import client_cli
-from commands.contract import contract_cli
-from commands.event import event_cli
-from commands.user import user_cli
-from utils.auth import login
-import sentry_sdk
-from dotenv import load_dotenv
-
-
-load_dotenv()
-sentry_sdk.init(
-    os.getenv("SENTRY_KEY")
+from utils.cli import LazyGroup
+
+
+@click.group(
+    cls=LazyGroup,
+    lazy_subcommands={
+        "user": ("commands.user:user_cli", "Commandes liées aux utilisateurs."),
+        "client": ("commands.client:client_cli", "Commandes liées à la gestion des clients."),
+        "contract": ("commands.contract:contract_cli", "Commandes liées aux contrats."),
+        "event": ("commands.event:event_cli", "Commandes liées aux événements."),
+        "dashboard": ("commands.dashboard:dashboard_cli", "Tableau de bord par commercial et par mois."),
+        "export": ("commands.export:export_cmd", "Exporter les données en CSV ou NDJSON."),
+        "seed": ("commands.seed:seed_cmd", "Générer un jeu de données synthétique (tests de charge)."),
+        "password": ("commands.password:password_cli", "Politique de hash des mots de passe."),
+        "db": ("commands.db:db_cli", "Commandes d'administration de la base de données."),
+    },
 )
-
-@click.group()
-def cli():
+@click.option("--profile-sql", is_flag=True, default=False,
+              help="Afficher en fin de commande le nombre, la durée et les lignes des requêtes SQL.")
+@click.pass_context
+def cli(ctx, profile_sql):
     """Application CRM Epic Events"""
-    pass
+    # Exceptions non gérées signalées à Sentry (sentry_sdk chargé seulement en cas d'erreur)
+    from utils.telemetry import install_crash_reporting
+
+    install_crash_reporting()
+    if profile_sql:
+        # Import local : SQLAlchemy n'est chargé que si le profilage est demandé
+        from utils.profiling import enable_sql_profiling
+
+        enable_sql_profiling(ctx)
 
 
 @cli.command()
 def login_cmd():
     """Se connecter"""
-    login()
+    from utils.settings import load_env
+
+    load_env()
+    # Import local : bcrypt, jwt et SQLAlchemy ne sont chargés que pour la connexion
+    from utils.auth import login
 
+    login()
 
-cli.add_command(user_cli, name="user")
-cli.add_command(client_cli, name="client")
-cli.add_command(contract_cli, name="contract")
-cli.add_command(event_cli, name="event")
 
 if __name__ == "__main__":
-    cli()
\ No newline at end of file
+    cli()
@@ -0,0 +1,97 @@
+from logging.config import fileConfig
+
+from sqlalchemy import create_engine
+from sqlalchemy import pool
+
+from alembic import context
+
+from models.base import Base
+from utils.schema import include_in_autogenerate
+
+# this is the Alembic Config object, which provides
+# access to the values within the .ini file in use.
+config = context.config
+
+# Interpret the config file for Python logging.
+# This line sets up loggers basically.
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+# Métadonnées des modèles, utilisées par `alembic revision --autogenerate`
+target_metadata = Base.metadata
+
+
+def get_url():
+    """
+    Retourne l'URL de la base : celle passée par la configuration (tests, utils.schema)
+    ou, à défaut, celle de utils/connection.py.
+    """
+    url = config.get_main_option("sqlalchemy.url")
+    if url:
+        return url
+
+    from utils.settings import load_env
+
+    load_env()
+    from utils.connection import db_url
+
+    return db_url
+
+
+def run_migrations_offline() -> None:
+    """Run migrations in 'offline' mode.
+
+    This configures the context with just a URL
+    and not an Engine, though an Engine is acceptable
+    here as well.  By skipping the Engine creation
+    we don't even need a DBAPI to be available.
+
+    Calls to context.execute() here emit the given string to the
+    script output.
+
+    """
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        include_object=include_in_autogenerate,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode.
+
+    Une connexion peut être fournie par l'appelant via config.attributes["connection"]
+    (commande `epicevents.py db upgrade`) ; sinon un moteur est créé à partir de get_url().
+
+    """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata, transaction_per_migration=True,
+            include_object=include_in_autogenerate,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    connectable = create_engine(get_url(), poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection, target_metadata=target_metadata, transaction_per_migration=True,
+            include_object=include_in_autogenerate,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
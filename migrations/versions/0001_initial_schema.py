@@ -0,0 +1,84 @@
+"""initial schema
+
+Schéma tel que créé auparavant par Base.metadata.create_all : départements,
+utilisateurs, clients, contrats, événements et table de version `schema_info`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "departments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+    )
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False, unique=True),
+        sa.Column("password", sa.String(), nullable=False),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.id"), nullable=False),
+    )
+    op.create_table(
+        "clients",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("phone", sa.String()),
+        sa.Column("company", sa.String()),
+        sa.Column("created_date", sa.DateTime()),
+        sa.Column("updated_date", sa.DateTime()),
+        sa.Column("sales_contact_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    )
+    op.create_table(
+        "contracts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("client_id", sa.Integer(), sa.ForeignKey("clients.id"), nullable=False),
+        sa.Column("sales_contact_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("amount_total", sa.Float(), nullable=False),
+        sa.Column("amount_remaining", sa.Float(), nullable=False),
+        sa.Column("signed", sa.Boolean()),
+        sa.Column("signed_date", sa.DateTime(), nullable=True),
+        sa.Column("created_date", sa.DateTime()),
+    )
+    op.create_table(
+        "events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("contract_id", sa.Integer(), sa.ForeignKey("contracts.id"), nullable=False),
+        sa.Column("support_contact_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("date_start", sa.DateTime(), nullable=False),
+        sa.Column("date_end", sa.DateTime(), nullable=False),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("attendees", sa.Integer(), nullable=False),
+        sa.Column("notes", sa.String()),
+    )
+    op.create_table(
+        "schema_info",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.CheckConstraint("id = 1", name="ck_schema_info_single_row"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ["schema_info", "events", "contracts", "clients", "users", "departments"]:
+        op.drop_table(table)
@@ -0,0 +1,64 @@
+"""hot path indexes
+
+Index sur les clés étrangères et filtres les plus utilisés :
+événements par support / contrat / date de début, contrats signés par commercial,
+clients par commercial, plus un index partiel des événements non assignés.
+
+Sous PostgreSQL, les index sont créés avec CREATE INDEX CONCURRENTLY (hors transaction)
+pour ne pas bloquer les écritures sur les tables existantes.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from contextlib import nullcontext
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNASSIGNED = sa.text("support_contact_id IS NULL")
+
+# (nom, table, colonnes, options)
+INDEXES = [
+    ("ix_events_support_contact_id", "events", ["support_contact_id"], {}),
+    ("ix_events_contract_id", "events", ["contract_id"], {}),
+    ("ix_events_date_start", "events", ["date_start"], {}),
+    ("ix_events_unassigned", "events", ["id"],
+     {"postgresql_where": UNASSIGNED, "sqlite_where": UNASSIGNED}),
+    ("ix_contracts_signed_sales_contact_id", "contracts", ["signed", "sales_contact_id"], {}),
+    ("ix_contracts_client_id", "contracts", ["client_id"], {}),
+    ("ix_clients_sales_contact_id", "clients", ["sales_contact_id"], {}),
+]
+
+
+def _index_block():
+    """
+    CREATE INDEX CONCURRENTLY est interdit dans une transaction :
+    sous PostgreSQL, les index sont créés en autocommit.
+    """
+    if op.get_context().dialect.name == "postgresql":
+        return op.get_context().autocommit_block()
+    return nullcontext()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with _index_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, **options)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with _index_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
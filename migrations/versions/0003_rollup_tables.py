@@ -0,0 +1,82 @@
+"""rollup tables
+
+Tables d'agrégats par commercial et par mois (nombre de contrats, montants total et
+restant, nombre d'événements), maintenues à chaque écriture par les contrôleurs.
+Elles sont remplies ici à partir des données existantes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRICS = "contracts, amount_total, amount_remaining, events"
+
+
+def _metric_columns():
+    return [
+        sa.Column("contracts", sa.Integer(), nullable=False),
+        sa.Column("amount_total", sa.Float(), nullable=False),
+        sa.Column("amount_remaining", sa.Float(), nullable=False),
+        sa.Column("events", sa.Integer(), nullable=False),
+    ]
+
+
+def _month(column):
+    if op.get_context().dialect.name == "postgresql":
+        return f"to_char({column}, 'YYYY-MM')"
+    return f"strftime('%Y-%m', {column})"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "rollup_sales_contact",
+        sa.Column("sales_contact_id", sa.Integer(), autoincrement=False, nullable=False),
+        *_metric_columns(),
+        sa.PrimaryKeyConstraint("sales_contact_id"),
+    )
+    op.create_table(
+        "rollup_monthly",
+        sa.Column("month", sa.String(length=7), nullable=False),
+        *_metric_columns(),
+        sa.PrimaryKeyConstraint("month"),
+    )
+
+    # Remplissage initial (même calcul que utils.rollups.rebuild_rollups)
+    op.execute(
+        f"INSERT INTO rollup_sales_contact (sales_contact_id, {METRICS}) "
+        "SELECT key, SUM(contracts), SUM(amount_total), SUM(amount_remaining), SUM(events) FROM ("
+        "SELECT sales_contact_id AS key, 1 AS contracts, amount_total, amount_remaining, 0 AS events "
+        "FROM contracts "
+        "UNION ALL "
+        "SELECT contracts.sales_contact_id, 0, 0, 0, 1 "
+        "FROM events JOIN contracts ON contracts.id = events.contract_id"
+        ") AS source GROUP BY key"
+    )
+    op.execute(
+        f"INSERT INTO rollup_monthly (month, {METRICS}) "
+        "SELECT key, SUM(contracts), SUM(amount_total), SUM(amount_remaining), SUM(events) FROM ("
+        f"SELECT {_month('created_date')} AS key, 1 AS contracts, amount_total, amount_remaining, "
+        "0 AS events FROM contracts "
+        "UNION ALL "
+        f"SELECT {_month('date_start')}, 0, 0, 0, 1 FROM events"
+        ") AS source GROUP BY key"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rollup_monthly")
+    op.drop_table("rollup_sales_contact")
@@ -0,0 +1,74 @@
+"""event schedule indexes
+
+Index servant à détecter les chevauchements d'événements pour un même support
+(planning) ou un même lieu (double réservation) :
+index couvrants (clé, début, fin) sur toutes les bases, et index GiST sur la
+période tsrange(date_start, date_end) sous PostgreSQL (extension btree_gist,
+nécessaire pour combiner une colonne scalaire et une période dans un index GiST).
+
+Les chevauchements restent vérifiés par l'application (utils.scheduling) plutôt
+que par une contrainte d'exclusion : les données existantes peuvent déjà en
+contenir, et un chevauchement peut être accepté explicitement (--allow-overlap).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from contextlib import nullcontext
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PERIOD = sa.text("tsrange(date_start, date_end)")
+
+# (nom, colonnes, options)
+INDEXES = [
+    ("ix_events_support_schedule", ["support_contact_id", "date_start", "date_end"], {}),
+    ("ix_events_location_schedule", ["location", "date_start", "date_end"], {}),
+]
+GIST_INDEXES = [
+    ("ix_events_support_period", ["support_contact_id", PERIOD], {"postgresql_using": "gist"}),
+    ("ix_events_location_period", ["location", PERIOD], {"postgresql_using": "gist"}),
+]
+
+
+def _is_postgresql():
+    return op.get_context().dialect.name == "postgresql"
+
+
+def _index_block():
+    """
+    CREATE INDEX CONCURRENTLY est interdit dans une transaction :
+    sous PostgreSQL, les index sont créés en autocommit.
+    """
+    if _is_postgresql():
+        return op.get_context().autocommit_block()
+    return nullcontext()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    indexes = INDEXES
+    if _is_postgresql():
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        indexes = INDEXES + GIST_INDEXES
+    with _index_block():
+        for name, columns, options in indexes:
+            op.create_index(name, "events", columns, postgresql_concurrently=True, **options)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    indexes = INDEXES + GIST_INDEXES if _is_postgresql() else INDEXES
+    with _index_block():
+        for name, _, _ in reversed(indexes):
+            op.drop_index(name, table_name="events", postgresql_concurrently=True)
@@ -0,0 +1,79 @@
+"""client search index
+
+Index de recherche des clients (client search) sur le nom, l'email et l'entreprise :
+index GIN trigramme (extension pg_trgm) sous PostgreSQL, table virtuelle FTS5
+adossée à `clients` et tenue à jour par des triggers sous SQLite. Si SQLite n'a pas
+été compilé avec FTS5, aucun index n'est créé et la recherche se fait par LIKE.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_DOCUMENT = "(name || ' ' || email || ' ' || coalesce(company, ''))"
+
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE clients_fts USING fts5(name, email, company, content='clients', "
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER clients_fts_insert AFTER INSERT ON clients BEGIN "
+    "INSERT INTO clients_fts(rowid, name, email, company) VALUES (new.id, new.name, new.email, new.company); "
+    "END",
+    "CREATE TRIGGER clients_fts_delete AFTER DELETE ON clients BEGIN "
+    "INSERT INTO clients_fts(clients_fts, rowid, name, email, company) "
+    "VALUES ('delete', old.id, old.name, old.email, old.company); "
+    "END",
+    "CREATE TRIGGER clients_fts_update AFTER UPDATE OF name, email, company ON clients BEGIN "
+    "INSERT INTO clients_fts(clients_fts, rowid, name, email, company) "
+    "VALUES ('delete', old.id, old.name, old.email, old.company); "
+    "INSERT INTO clients_fts(rowid, name, email, company) VALUES (new.id, new.name, new.email, new.company); "
+    "END",
+]
+FTS_TRIGGERS = ["clients_fts_insert", "clients_fts_delete", "clients_fts_update"]
+
+
+def _dialect():
+    return op.get_context().dialect.name
+
+
+def _fts5_available():
+    rows = op.get_bind().exec_driver_sql("PRAGMA compile_options")
+    return "ENABLE_FTS5" in {row[0] for row in rows}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _dialect() == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        # CREATE INDEX CONCURRENTLY est interdit dans une transaction
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_clients_search_trgm "
+                f"ON clients USING gin ({SEARCH_DOCUMENT} gin_trgm_ops)"
+            )
+    elif _dialect() == "sqlite" and _fts5_available():
+        for statement in FTS_DDL:
+            op.execute(statement)
+        # Indexation des clients existants
+        op.execute("INSERT INTO clients_fts(clients_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _dialect() == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_clients_search_trgm")
+    elif _dialect() == "sqlite":
+        for trigger in FTS_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS clients_fts")
@@ -0,0 +1,34 @@
+"""reference version
+
+Version des données de référence (départements, utilisateurs) dans schema_info,
+incrémentée par chaque écriture sur ces tables. Le cache disque de la CLI
+(utils.refcache) la compare à celle de ses entrées en une seule petite requête.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("schema_info") as batch_op:
+        batch_op.add_column(sa.Column("reference_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("schema_info") as batch_op:
+        batch_op.drop_column("reference_version")
@@ -1,8 +1,30 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import DDL, Column, Integer, String, ForeignKey, DateTime, Index, event, text
 from sqlalchemy.orm import relationship
 from .base import Base
 
+# Texte indexé pour la recherche de clients (index trigramme sous PostgreSQL)
+SEARCH_DOCUMENT = "(name || ' ' || email || ' ' || coalesce(company, ''))"
+
+# Index plein texte FTS5 sous SQLite : table virtuelle adossée à `clients`
+# (content=) et tenue à jour par des triggers
+CLIENTS_FTS_DDL = [
+    "CREATE VIRTUAL TABLE clients_fts USING fts5(name, email, company, content='clients', "
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER clients_fts_insert AFTER INSERT ON clients BEGIN "
+    "INSERT INTO clients_fts(rowid, name, email, company) VALUES (new.id, new.name, new.email, new.company); "
+    "END",
+    "CREATE TRIGGER clients_fts_delete AFTER DELETE ON clients BEGIN "
+    "INSERT INTO clients_fts(clients_fts, rowid, name, email, company) "
+    "VALUES ('delete', old.id, old.name, old.email, old.company); "
+    "END",
+    "CREATE TRIGGER clients_fts_update AFTER UPDATE OF name, email, company ON clients BEGIN "
+    "INSERT INTO clients_fts(clients_fts, rowid, name, email, company) "
+    "VALUES ('delete', old.id, old.name, old.email, old.company); "
+    "INSERT INTO clients_fts(rowid, name, email, company) VALUES (new.id, new.name, new.email, new.company); "
+    "END",
+]
+
 
 # Client
 class Client(Base):
@@ -23,6 +45,14 @@ class Client(Base):
            contracts (list[Contract]): Liste des contrats associés à ce client.
        """
     __tablename__ = "clients"
+    __table_args__ = (
+        # Recherche (client search) : trigrammes sur nom, email et entreprise sous PostgreSQL
+        Index(
+            "ix_clients_search_trgm",
+            text(f"{SEARCH_DOCUMENT} gin_trgm_ops"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
@@ -33,10 +63,26 @@ class Client(Base):
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Commercial associé
-    sales_contact_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    sales_contact_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     sales_contact = relationship("User", back_populates="clients")
 
     contracts = relationship("Contract", back_populates="client")
 
     def __repr__(self):
-        return f"<Client(name={self.name}, sales_contact={self.sales_contact.name})>"
+        # Uniquement des colonnes : afficher un client ne doit pas déclencher de chargement paresseux
+        return f"<Client(name={self.name}, sales_contact_id={self.sales_contact_id})>"
+
+
+def fts5_available(ddl, target, bind, **kw):
+    """
+    Indique si la bibliothèque SQLite a été compilée avec FTS5.
+    """
+    options = {row[0] for row in bind.exec_driver_sql("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in options
+
+
+for statement in CLIENTS_FTS_DDL:
+    event.listen(Client.__table__, "after_create",
+                 DDL(statement).execute_if(dialect="sqlite", callable_=fts5_available))
+event.listen(Client.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS clients_fts").execute_if(dialect="sqlite"))
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -23,9 +23,13 @@ class Contract(Base):
             events (list[Event]): Liste des événements liés à ce contrat.
         """
     __tablename__ = "contracts"
+    __table_args__ = (
+        # Filtres signé / non signé, éventuellement restreints à un commercial
+        Index("ix_contracts_signed_sales_contact_id", "signed", "sales_contact_id"),
+    )
 
     id = Column(Integer, primary_key=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     client = relationship("Client", back_populates="contracts")
 
     sales_contact_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -40,4 +44,5 @@ class Contract(Base):
     events = relationship("Event", back_populates="contract")
 
     def __repr__(self):
-        return f"<Contract(client={self.client.name}, signed={self.signed})>"
+        # Uniquement des colonnes : afficher un contrat ne doit pas déclencher de chargement paresseux
+        return f"<Contract(client_id={self.client_id}, signed={self.signed})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -22,17 +22,42 @@ class Event(Base):
            notes (str, optionnel): Notes complémentaires concernant l'événement.
        """
     __tablename__ = "events"
+    __table_args__ = (
+        # Index partiel : seuls les événements non assignés y figurent (list_unassigned_events)
+        Index(
+            "ix_events_unassigned",
+            "id",
+            postgresql_where=text("support_contact_id IS NULL"),
+            sqlite_where=text("support_contact_id IS NULL"),
+        ),
+        # Détection des chevauchements de planning (support) et de réservation (lieu) :
+        # index couvrants (clé, début, fin), et index GiST sur la période sous PostgreSQL
+        Index("ix_events_support_schedule", "support_contact_id", "date_start", "date_end"),
+        Index("ix_events_location_schedule", "location", "date_start", "date_end"),
+        Index(
+            "ix_events_support_period",
+            "support_contact_id",
+            text("tsrange(date_start, date_end)"),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_events_location_period",
+            "location",
+            text("tsrange(date_start, date_end)"),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
 
-    contract_id = Column(Integer, ForeignKey("contracts.id"), nullable=False)
+    contract_id = Column(Integer, ForeignKey("contracts.id"), nullable=False, index=True)
     contract = relationship("Contract", back_populates="events")
 
-    support_contact_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    support_contact_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     support_contact = relationship("User", back_populates="supported_events")
 
-    date_start = Column(DateTime, nullable=False)
+    date_start = Column(DateTime, nullable=False, index=True)
     date_end = Column(DateTime, nullable=False)
     location = Column(String, nullable=False)
     attendees = Column(Integer, nullable=False)
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, Float, String
+from .base import Base
+
+
+class SalesContactRollup(Base):
+    """
+        Agrégats des contrats et événements par commercial, maintenus à chaque écriture
+        (voir utils.rollups) et reconstruits par `dashboard rebuild`.
+
+        Table dérivée : pas de clé étrangère, pour ne pas empêcher la suppression d'un
+        utilisateur dont tous les contrats ont été supprimés.
+
+        Attributs:
+            sales_contact_id (int): Identifiant du commercial.
+            contracts (int): Nombre de contrats.
+            amount_total (float): Somme des montants totaux.
+            amount_remaining (float): Somme des montants restants.
+            events (int): Nombre d'événements liés aux contrats du commercial.
+        """
+    __tablename__ = "rollup_sales_contact"
+
+    sales_contact_id = Column(Integer, primary_key=True, autoincrement=False)
+    contracts = Column(Integer, nullable=False, default=0)
+    amount_total = Column(Float, nullable=False, default=0)
+    amount_remaining = Column(Float, nullable=False, default=0)
+    events = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SalesContactRollup(sales_contact_id={self.sales_contact_id}, contracts={self.contracts})>"
+
+
+class MonthlyRollup(Base):
+    """
+        Agrégats mensuels : contrats par mois de création, événements par mois de début.
+
+        Attributs:
+            month (str): Mois au format "AAAA-MM".
+            contracts (int): Nombre de contrats créés dans le mois.
+            amount_total (float): Somme des montants totaux de ces contrats.
+            amount_remaining (float): Somme des montants restants de ces contrats.
+            events (int): Nombre d'événements commençant dans le mois.
+        """
+    __tablename__ = "rollup_monthly"
+
+    month = Column(String(7), primary_key=True)
+    contracts = Column(Integer, nullable=False, default=0)
+    amount_total = Column(Float, nullable=False, default=0)
+    amount_remaining = Column(Float, nullable=False, default=0)
+    events = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MonthlyRollup(month={self.month}, contracts={self.contracts})>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, CheckConstraint
+from .base import Base
+
+
+class SchemaInfo(Base):
+    """
+        Table de métadonnées à une seule ligne décrivant l'état du schéma.
+
+        Attributs:
+            id (int): Toujours 1 (une seule ligne autorisée).
+            version (int): Version du schéma appliquée à la base.
+            reference_version (int): Version des données de référence (départements, utilisateurs),
+            incrémentée à chaque écriture ; sert à revalider le cache disque (utils.refcache).
+        """
+    __tablename__ = "schema_info"
+    __table_args__ = (CheckConstraint("id = 1", name="ck_schema_info_single_row"),)
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    reference_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<SchemaInfo(version={self.version})>"
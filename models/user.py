@@ -39,4 +39,5 @@ class User(Base):
                                     foreign_keys="Event.support_contact_id")
 
     def __repr__(self):
-        return f"<User(name={self.name}, role={self.department.name})>"
+        # Uniquement des colonnes : afficher un utilisateur ne doit pas déclencher de chargement paresseux
+        return f"<User(name={self.name}, department_id={self.department_id})>"
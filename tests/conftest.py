@@ -1,10 +1,17 @@
 # conftest.py
+from contextlib import contextmanager
+from datetime import timedelta
 import pytest
 from click.testing import CliRunner
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from models.base import Base
+from models.client import Client
+from models.contract import Contract
 from models.department import Department
+from models.event import Event
+from models.user import User
+from utils.auth import Identity, _current_identity
 
 
 @pytest.fixture(scope='session')
@@ -24,6 +31,78 @@ def test_session(engine):
     session.close()
 
 
+@pytest.fixture
+def isolated_session():
+    # Base vide propre au test, pour les vérifications qui dépendent du contenu exact des tables
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class CrmFactory:
+    """
+    Crée des données de test dans une session, avec des valeurs par défaut pour les champs obligatoires.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.departments = {}
+
+    def department(self, name):
+        if name not in self.departments:
+            self.departments[name] = Department(name=name)
+            self.session.add(self.departments[name])
+            self.session.flush()
+        return self.departments[name]
+
+    def _add(self, obj):
+        self.session.add(obj)
+        self.session.flush()
+        return obj
+
+    def user(self, name, department="commercial", email=None):
+        return self._add(User(name=name, email=email or f"{name.lower()}@example.com", password="x",
+                              department_id=self.department(department).id))
+
+    def client(self, name, owner, email=None, company=None):
+        email = email or f"{name.split()[0].lower()}@example.com"
+        return self._add(Client(name=name, email=email, phone="0101010101", company=company,
+                                sales_contact_id=owner.id))
+
+    def contract(self, client, owner=None, amount_total=10, amount_remaining=0, signed=True, **fields):
+        owner_id = owner.id if owner is not None else client.sales_contact_id
+        return self._add(Contract(client_id=client.id, sales_contact_id=owner_id, amount_total=amount_total,
+                                  amount_remaining=amount_remaining, signed=signed, **fields))
+
+    def event(self, contract, name, start, hours=2, location="Lyon", support=None):
+        return self._add(Event(name=name, contract_id=contract.id, location=location, attendees=10,
+                               date_start=start, date_end=start + timedelta(hours=hours),
+                               support_contact_id=support.id if support is not None else None))
+
+
+@pytest.fixture
+def crm(isolated_session):
+    return CrmFactory(isolated_session)
+
+
+@pytest.fixture
+def as_user():
+    # with as_user("gestion"): ... ou with as_user("commercial", user): ... pour les appels protégés
+    @contextmanager
+    def use(role, user=None):
+        identity = Identity(user.id, user.email, role) if user is not None else \
+            Identity(0, f"{role}@example.com", role)
+        token = _current_identity.set(identity)
+        try:
+            yield identity
+        finally:
+            _current_identity.reset(token)
+    return use
+
+
 @pytest.fixture
 def setup_department(test_session):
     dep = Department(name="gestion")
@@ -32,6 +111,24 @@ def setup_department(test_session):
     return dep
 
 
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    # Chaque test part d'un cache de résultats vide (moteurs et sessions différents d'un test à l'autre)
+    from utils.cache import result_cache
+
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reference_cache_file(tmp_path, monkeypatch):
+    # Cache disque des données de référence isolé dans un fichier temporaire par test
+    from utils.refcache import reference_cache
+
+    monkeypatch.setattr(reference_cache, "path", str(tmp_path / "reference_cache.db"))
+
+
 @pytest.fixture
 def runner():
     return CliRunner()
@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from controllers import async_client_controller, async_contract_controller, async_event_controller
+from models.base import Base
+from models.department import Department
+from models.user import User
+from utils.auth import Identity
+
+
+async def _scenario(url):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with Session() as session:
+        dep = Department(name="commercial")
+        session.add(dep)
+        await session.flush()
+        owner = User(name="Async Sales", email="async@example.com", password="x", department_id=dep.id)
+        other = User(name="Other Sales", email="other@example.com", password="x", department_id=dep.id)
+        session.add_all([owner, other])
+        await session.commit()
+    seller = Identity(owner.id, owner.email, "commercial")
+    intruder = Identity(other.id, other.email, "commercial")
+
+    # Plusieurs créations concurrentes, chacune avec sa propre session
+    async def create(i):
+        async with Session() as session:
+            return await async_client_controller.create_client(
+                f"Async {i}", f"async{i}@example.com", "0101010101", "AsyncCo",
+                db_session=session, current_user=seller)
+
+    results = await asyncio.gather(*(create(i) for i in range(5)))
+    assert results == ["Client créé avec succès."] * 5
+
+    async with Session() as session:
+        clients = await async_client_controller.list_clients(limit=3, db_session=session, current_user=seller)
+        assert len(clients) == 3
+        assert next(iter(clients.values()))["sales_contact_name"] == "Async Sales"
+        client_id = next(iter(clients))
+
+        with pytest.raises(Exception, match="vos propres clients"):
+            await async_client_controller.update_client(
+                client_id, "X", "x@example.com", "0101010101", "X", db_session=session, current_user=intruder)
+
+        await async_contract_controller.create_contract(
+            client_id, 1000, 500, "non", db_session=session, current_user=seller)
+        contracts = await async_contract_controller.list_unsigned_contracts(
+            db_session=session, current_user=seller)
+        contract_id = next(iter(contracts))
+
+        # Règle métier conservée : pas d'événement sur un contrat non signé
+        with pytest.raises(Exception, match="pas signé"):
+            await async_event_controller.create_event(
+                contract_id, "Gala", "2030-01-01 10:00", "2030-01-01 12:00", "Paris", 10, "",
+                db_session=session, current_user=seller)
+
+        with pytest.raises(Exception, match="contrats ou événements"):
+            await async_client_controller.delete_client(client_id, db_session=session, current_user=seller)
+
+    await engine.dispose()
+
+
+def test_async_controllers_keep_business_rules(tmp_path):
+    asyncio.run(_scenario(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}"))
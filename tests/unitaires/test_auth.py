@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+
+from utils import auth
+from utils.auth_utils import require_role
+
+
+@pytest.fixture
+def token_file(tmp_path, monkeypatch):
+    """Écrit un token signé pour un commercial et isole l'identité de la commande."""
+    path = tmp_path / ".epic_token"
+    payload = {
+        "user_id": 42,
+        "email": "sales@example.com",
+        "department": "commercial",
+        "exp": datetime.utcnow() + timedelta(hours=1),
+    }
+    path.write_text(jwt.encode(payload, auth.SECRET_KEY, algorithm=auth.ALGORITHM))
+    monkeypatch.setattr(auth, "TOKEN_FILE", str(path))
+    auth.reset_identity()
+    yield path
+    auth.reset_identity()
+
+
+def test_identity_is_resolved_once_per_command(token_file):
+    identity = auth.get_current_identity()
+    token_file.unlink()  # un second appel ne doit plus relire le token
+
+    assert auth.get_current_identity() is identity
+    assert (identity.id, identity.email, identity.role) == (42, "sales@example.com", "commercial")
+
+
+def test_require_role_passes_identity_to_controller(token_file, monkeypatch):
+    # Aucune requête utilisateur ne doit être faite pour vérifier le rôle
+    monkeypatch.setattr(auth, "get_current_user", lambda: pytest.fail("requête utilisateur inattendue"))
+
+    @require_role("commercial")
+    def controller(current_user=None):
+        return current_user
+
+    assert controller().id == 42
+
+
+def test_require_role_rejects_other_roles(token_file):
+    @require_role("gestion")
+    def controller():
+        return "ok"
+
+    with pytest.raises(PermissionError):
+        controller()
+
+
+def test_revalidation_detects_role_change(test_session):
+    from models.department import Department
+    from models.user import User
+
+    dep = test_session.query(Department).filter_by(name="support").first()
+    if not dep:
+        dep = Department(name="support")
+        test_session.add(dep)
+        test_session.commit()
+    user = User(name="Support", email="revalidate@example.com", password="x", department_id=dep.id)
+    test_session.add(user)
+    test_session.commit()
+
+    auth.revalidate_identity(auth.Identity(user.id, user.email, "support"), db_session=test_session)
+    with pytest.raises(Exception, match="rôle a changé"):
+        auth.revalidate_identity(auth.Identity(user.id, user.email, "gestion"), db_session=test_session)
+
+
+@pytest.fixture
+def policy_file(tmp_path, monkeypatch):
+    """Isole la politique de hash dans un fichier temporaire."""
+    from utils import password_policy
+
+    path = tmp_path / ".epic_password_policy.json"
+    monkeypatch.setattr(password_policy, "POLICY_FILE", str(path))
+    monkeypatch.setattr(password_policy, "_policy", None)
+    yield path
+    password_policy._policy = None
+
+
+def test_calibrate_picks_highest_cost_within_target(policy_file):
+    from utils import password_policy
+
+    # Chaque incrément du coût double la durée : 10 -> 60 ms, 11 -> 120 ms, 12 -> 240 ms...
+    measured = []
+
+    def fake_measure(rounds, samples):
+        measured.append(rounds)
+        return 60 * 2 ** (rounds - 10)
+
+    policy = password_policy.calibrate(target_ms=250, measure=fake_measure)
+    assert policy["rounds"] == 12
+    assert measured == [10, 11, 12, 13]  # la mesure s'arrête au premier dépassement
+
+    # Plancher de sécurité : le coût minimal est gardé même s'il dépasse la cible
+    assert password_policy.calibrate(target_ms=10, measure=fake_measure)["rounds"] == 10
+
+    password_policy.save_policy(policy)
+    password_policy._policy = None
+    assert password_policy.get_rounds() == 12
+
+
+def test_policy_outside_loaded_bounds_is_refused(policy_file, runner):
+    from commands.password import calibrate_cmd
+    from utils import password_policy
+
+    result = runner.invoke(calibrate_cmd, ["--min-rounds", "8"])
+    assert result.exit_code == 2 and "--min-rounds" in result.output
+    with pytest.raises(Exception, match="hors des bornes"):
+        password_policy.save_policy({"rounds": 8})
+    assert not policy_file.exists()
+    assert password_policy.get_rounds() == password_policy.DEFAULT_ROUNDS
+
+
+def test_login_rehashes_password_when_cost_differs(test_session, policy_file, tmp_path, monkeypatch):
+    from models.department import Department
+    from models.user import User
+    from utils import password_policy
+
+    dep = test_session.query(Department).filter_by(name="support").first()
+    if not dep:
+        dep = Department(name="support")
+        test_session.add(dep)
+        test_session.commit()
+    user = User(name="Rehash", email="rehash@example.com", password=auth.hash_password("Secret-1", rounds=4),
+                department_id=dep.id)
+    test_session.add(user)
+    test_session.commit()
+
+    password_policy.save_policy({"rounds": 10})
+    monkeypatch.setattr(auth, "TOKEN_FILE", str(tmp_path / ".epic_token"))
+    monkeypatch.setattr("builtins.input", lambda prompt: "rehash@example.com")
+    monkeypatch.setattr(auth.getpass, "getpass", lambda prompt: "Secret-1")
+
+    auth.login(db_session=test_session)
+    test_session.refresh(user)
+
+    assert password_policy.hash_rounds(user.password) == 10
+    assert auth.check_password("Secret-1", user.password)
+    assert not password_policy.needs_rehash(user.password)
+    auth.reset_identity()
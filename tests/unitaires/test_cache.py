@@ -0,0 +1,81 @@
+import asyncio
+
+from utils.auth import Identity, _current_identity
+from utils.cache import ResultCache, cached, invalidates, result_cache, table_versions
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.put("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.info() == {"hits": 1, "misses": 1, "size": 2, "maxsize": 2}
+
+
+def test_cached_results_are_keyed_by_user_and_invalidated_by_writes():
+    calls = []
+
+    @cached("things")
+    def list_things(limit=None, db_session=None):
+        calls.append(limit)
+        return {"rows": len(calls)}
+
+    @invalidates("things")
+    def create_thing():
+        pass
+
+    @invalidates("things")
+    async def delete_thing():
+        raise Exception("échec")
+
+    token = _current_identity.set(Identity(1, "a@example.com", "gestion"))
+    try:
+        first = list_things(limit=5)
+        assert list_things(limit=5) is first and calls == [5]
+        list_things(limit=10)
+        assert calls == [5, 10]
+
+        # Autre utilisateur : autre entrée
+        _current_identity.set(Identity(2, "b@example.com", "support"))
+        list_things(limit=5)
+        assert calls == [5, 10, 5]
+
+        # Session explicite : pas de cache
+        list_things(limit=5, db_session=object())
+        assert len(calls) == 4
+
+        # Une écriture (même en échec) rend les entrées obsolètes
+        version = table_versions(["things"])
+        create_thing()
+        list_things(limit=5)
+        assert len(calls) == 5
+        try:
+            asyncio.run(delete_thing())
+        except Exception:
+            pass
+        assert table_versions(["things"])[0] == version[0] + 2
+        list_things(limit=5)
+        assert len(calls) == 6 and result_cache.info()["hits"] == 1
+    finally:
+        _current_identity.reset(token)
+
+
+def test_list_errors_are_not_cached(monkeypatch, as_user):
+    from controllers import user_controller
+
+    calls = []
+
+    def department_choices():
+        calls.append(1)
+        if len(calls) == 1:
+            raise Exception("base indisponible")
+        return [{"id": 1, "name": "gestion"}]
+
+    monkeypatch.setattr(user_controller, "department_choices", department_choices)
+    with as_user("gestion"):
+        assert user_controller.list_departments().startswith("Erreur lors de la récupération")
+        assert user_controller.list_departments() == "1 | gestion"
+        assert user_controller.list_departments() == "1 | gestion"
+    assert len(calls) == 2
@@ -1,5 +1,6 @@
 import uuid
-from controllers.client_controller import update_client
+from sqlalchemy import text
+from controllers.client_controller import search_clients, update_client
 from models.user import User
 from models.department import Department
 from models.client import Client
@@ -62,3 +63,40 @@ def test_update_client(test_session):
     assert updated_client.name == "New Name"
 
     print("Test passé avec succès, client mis à jour:", updated_client.name)
+
+
+def test_search_clients_ranks_matches_and_follows_writes(crm, as_user):
+    session = crm.session
+    user = crm.user("Sales")
+    kevin, elodie, john = [
+        crm.client(name, user, email=email, company=company)
+        for name, email, company in [
+            ("Kevin Casey", "kevin@startup.io", "Cool Startup LLC"),
+            ("Élodie Durand", "elodie@acme.fr", "Acme"),
+            ("John Acme", "john@example.com", None),
+        ]
+    ]
+    session.commit()
+
+    def names(query):
+        return [c["name"] for c in search_clients(query, db_session=session).values()]
+
+    with as_user("commercial", user):
+        # Le nom pèse plus que l'entreprise ; préfixes et accents sont pris en compte
+        assert names("acme") == ["John Acme", "Élodie Durand"]
+        assert names("elod") == ["Élodie Durand"]
+        assert names("startup kev") == ["Kevin Casey"]
+        assert names("%") == [] and names("inconnu") == []
+
+        # Les triggers tiennent l'index à jour
+        john.name = "Jane Doe"
+        john.email = "jane@example.com"
+        session.delete(kevin)
+        session.commit()
+        assert names("acme") == ["Élodie Durand"]
+        assert names("jane") == ["Jane Doe"] and names("kevin") == []
+
+        # Sans table FTS5, la recherche se fait par LIKE
+        session.execute(text("DROP TABLE clients_fts"))
+        session.commit()
+        assert names("DURAND") == ["Élodie Durand"]
@@ -1,8 +1,18 @@
+from datetime import datetime
+import click
+import pytest
+from sqlalchemy import select
+from controllers.contract_controller import (
+    AMOUNTS_INVALID, bulk_update_contracts, contract_stats, sign_contracts, update_contract
+)
 from models.contract import Contract
+from models.rollup import SalesContactRollup
 from models.client import Client
 from models.user import User
 from models.department import Department
 from utils.auth import hash_password
+from utils.cli import parse_ids
+from utils.rollups import rebuild_rollups
 
 
 def test_update_contract(test_session, monkeypatch):
@@ -67,3 +77,102 @@ def test_update_contract(test_session, monkeypatch):
     assert updated_contract.amount_remaining == 5500.0
     assert updated_contract.signed is True
     assert updated_contract.signed_date is not None
+
+
+def test_contract_stats_groups_in_sql(crm, as_user):
+    # Base dédiée : les totaux ne doivent pas dépendre des contrats des autres tests
+    alice, bob = crm.user("Alice"), crm.user("Bob")
+    acme, globex = crm.client("Acme", alice), crm.client("Globex", bob)
+    crm.contract(acme, amount_total=1000, amount_remaining=400, signed_date=datetime(2025, 1, 10))
+    crm.contract(acme, amount_total=500, amount_remaining=500, signed=False)
+    crm.contract(globex, amount_total=3000, amount_remaining=0, signed_date=datetime(2025, 2, 3))
+    crm.session.commit()
+
+    with as_user("gestion"):
+        by_seller = contract_stats("sales_contact", db_session=crm.session)
+        by_month = contract_stats("month", db_session=crm.session)
+        top_client = contract_stats("client", limit=1, db_session=crm.session)
+
+    bob_stats, alice_stats = by_seller["groups"]
+    assert (bob_stats["label"], bob_stats["rank"], bob_stats["share"]) == ("Bob", 1, 0.75)
+    assert (alice_stats["contracts"], alice_stats["signed"], alice_stats["signing_rate"]) == (2, 1, 0.5)
+    assert alice_stats["outstanding"] == 400
+    assert by_seller["totals"] == {"contracts": 3, "signed": 2, "signing_rate": 2 / 3,
+                                   "signed_amount": 4000, "outstanding": 400}
+
+    assert [(g["label"], g["cumulative"]) for g in by_month["groups"]] == [
+        ("2025-01", 1000), ("2025-02", 4000), ("non signé", 4000)
+    ]
+    # Le LIMIT ne s'applique qu'aux groupes affichés, pas aux totaux
+    assert [g["label"] for g in top_client["groups"]] == ["Globex"]
+    assert top_client["totals"]["contracts"] == 3
+
+
+def test_parse_ids_keeps_order_and_caps_ranges():
+    assert parse_ids("3, 1-2\n3") == [3, 1, 2]
+    with pytest.raises(click.BadParameter, match="Trop d'IDs"):
+        parse_ids("1-100000000", limit=5000)
+
+
+def test_bulk_contract_operations_report_each_id(crm, as_user):
+    session = crm.session
+    me, other = crm.user("me"), crm.user("other")
+    client = crm.client("Bulk", me, company="Bulk")
+    unsigned, signed, foreign = [
+        crm.contract(client, owner, amount_total=100.0, amount_remaining=100.0, signed=is_signed)
+        for owner, is_signed in [(me, False), (me, True), (other, False)]
+    ]
+    session.commit()
+    rebuild_rollups(session.connection())
+    session.commit()
+
+    with as_user("commercial", me):
+        result = sign_contracts([unsigned.id, signed.id, foreign.id, 999], db_session=session)
+        assert result["updated"] == [unsigned.id]
+        assert result["rejected"] == {
+            signed.id: "Contrat déjà signé.",
+            foreign.id: "Vous ne pouvez modifier que vos propres contrats.",
+            999: "Contrat introuvable.",
+        }
+        assert session.get(Contract, foreign.id).signed is False
+
+        result = bulk_update_contracts([unsigned.id, signed.id], amount_remaining=150.0, db_session=session)
+        assert result["updated"] == []
+        assert set(result["rejected"].values()) == {"Le montant restant dépasserait le montant total."}
+
+        result = bulk_update_contracts([unsigned.id, signed.id], amount_total=300.0, amount_remaining=40.0,
+                                       db_session=session)
+        assert result == {"updated": [unsigned.id, signed.id], "rejected": {}}
+
+    # Agrégats maintenus par variations : identiques à un recalcul complet
+    def rollups():
+        return sorted(tuple(row) for row in session.execute(select(SalesContactRollup.__table__)))
+
+    maintained = rollups()
+    rebuild_rollups(session.connection())
+    assert maintained == rollups()
+    assert [c.amount_total for c in session.query(Contract).order_by(Contract.id)] == [300.0, 300.0, 100.0]
+
+
+def test_single_and_bulk_updates_share_the_amount_rule(crm, as_user):
+    session = crm.session
+    seller = crm.user("Seller")
+    client = crm.client("Acme", seller)
+    single, bulk = [crm.contract(client, amount_total=100.0, amount_remaining=50.0) for _ in range(2)]
+    session.commit()
+
+    with as_user("commercial", seller):
+        for changes, accepted in [({"amount_remaining": 150.0}, False), ({"amount_total": 40.0}, False),
+                                  ({"amount_total": 80.0, "amount_remaining": 80.0}, True)]:
+            result = bulk_update_contracts([bulk.id], db_session=session, **changes)
+            assert (result["updated"] == [bulk.id]) is accepted
+            if accepted:
+                update_contract(single.id, changes.get("amount_total"), changes.get("amount_remaining"), None,
+                                db_session=session)
+            else:
+                assert result["rejected"] == {bulk.id: AMOUNTS_INVALID}
+                with pytest.raises(Exception, match=AMOUNTS_INVALID):
+                    update_contract(single.id, changes.get("amount_total"), changes.get("amount_remaining"),
+                                    None, db_session=session)
+    session.expire_all()
+    assert [(c.amount_total, c.amount_remaining) for c in (single, bulk)] == [(80.0, 80.0), (80.0, 80.0)]
@@ -1,4 +1,7 @@
 from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from controllers import event_controller
 from models.contract import Contract
 from models.event import Event
 
@@ -33,3 +36,111 @@ def test_create_event(test_session):
     # vérifier que l'événement est bien créé
     fetched = test_session.get(Event, event.id)
     assert fetched.name == "Meeting Test"
+
+
+@pytest.fixture
+def schedule(crm, monkeypatch):
+    """Base dédiée avec un contrat signé : les plannings ne dépendent que des événements du test."""
+    monkeypatch.setattr(event_controller, "session", crm.session)
+    seller = crm.user("Seller")
+    crm.contract(crm.client("Acme", seller))
+    return crm
+
+
+def test_assign_support_detects_schedule_conflicts(schedule, as_user):
+    session = schedule.session
+    contract = session.query(Contract).one()
+    tech = schedule.user("Tech", "support")
+    day = datetime(2025, 6, 1)
+    booked = schedule.event(contract, "Salon", day + timedelta(hours=9), hours=3, support=tech)
+    overlapping = schedule.event(contract, "Gala", day + timedelta(hours=11), hours=3, location="Nice")
+    after = schedule.event(contract, "Cocktail", day + timedelta(hours=12), hours=1, location="Nice")
+    session.commit()
+
+    with as_user("gestion"):
+        # Fin de l'un = début de l'autre : pas de chevauchement
+        assert event_controller.assign_support(after.id, tech.email) == "Support Tech assigné à l'événement."
+        with pytest.raises(Exception, match="Tech est déjà assigné à ID"):
+            event_controller.assign_support(overlapping.id, tech.email)
+        assert overlapping.support_contact_id is None
+
+        result = event_controller.assign_support(overlapping.id, tech.email, allow_overlap=True)
+        assert "chevauchement accepté" in result and f"ID {booked.id}" in result
+
+        conflicts = event_controller.list_schedule_conflicts(by="location", db_session=session)
+        assert [(c["key"], c["first"]["id"], c["second"]["id"]) for c in conflicts] == [
+            ("Nice", overlapping.id, after.id)
+        ]
+
+
+def test_auto_assign_balances_load_and_respects_schedules(schedule, as_user):
+    session = schedule.session
+    contract = session.query(Contract).one()
+    busy, free = schedule.user("Busy", "support"), schedule.user("Free", "support")
+    day = datetime(2025, 6, 1)
+    booked, first, long, late, clash, outside = [
+        schedule.event(contract, name, day + timedelta(hours=start), hours=hours)
+        for name, start, hours in [("Salon", 9, 3), ("Atelier", 10, 1), ("Gala", 13, 4),
+                                   ("Cocktail", 13, 1), ("Dîner", 13.5, 1), ("Plus tard", 48, 2)]
+    ]
+    booked.support_contact_id = busy.id
+    session.commit()
+
+    with as_user("gestion"):
+        window = {"date_from": day, "date_to": day + timedelta(days=1)}
+        plan = event_controller.auto_assign_events(dry_run=True, **window)
+        # Atelier : Busy occupé → Free ; Gala : Free moins chargé ; Cocktail : Free occupé → Busy
+        assert [(a["event_id"], a["support_id"]) for a in plan["assignments"]] == [
+            (first.id, free.id), (long.id, free.id), (late.id, busy.id)
+        ]
+        assert [u["event_id"] for u in plan["unassigned"]] == [clash.id]
+        session.expire_all()
+        assert session.get(Event, first.id).support_contact_id is None
+
+        result = event_controller.auto_assign_events(**window)
+        assert result["assignments"] == plan["assignments"] and not result["dry_run"]
+        session.expire_all()
+        assert {e.id: e.support_contact_id for e in session.query(Event)} == {
+            booked.id: busy.id, first.id: free.id, long.id: free.id, late.id: busy.id,
+            clash.id: None, outside.id: None,
+        }
+
+
+def test_auto_assign_is_rolled_back_after_concurrent_changes(schedule, as_user, monkeypatch):
+    session = schedule.session
+    contract = session.query(Contract).one()
+    tech = schedule.user("Tech", "support")
+    day = datetime(2025, 6, 1)
+    gala, late, other = [
+        schedule.event(contract, name, day + timedelta(hours=start), hours=hours)
+        for name, start, hours in [("Gala", 9, 3), ("Cocktail", 13, 1), ("Hors période", 47, 3)]
+    ]
+    session.commit()
+    write = event_controller._write_assignments
+
+    def concurrent_write(change):
+        # Écriture d'une autre commande entre la planification et l'enregistrement
+        def run(session_to_use, assignments):
+            session_to_use.execute(change)
+            return write(session_to_use, assignments)
+        return run
+
+    window = {"date_from": day, "date_to": day + timedelta(days=1)}
+    with as_user("gestion"):
+        # Événement assigné entre-temps : RETURNING ne le renvoie pas
+        monkeypatch.setattr(event_controller, "_write_assignments", concurrent_write(
+            update(Event).where(Event.id == gala.id).values(support_contact_id=tech.id)))
+        with pytest.raises(Exception, match="assignés entre-temps"):
+            event_controller.auto_assign_events(**window)
+
+        # Événement simultané donné au support retenu : conflit détecté à la relecture
+        other_start = day + timedelta(hours=10)
+        monkeypatch.setattr(event_controller, "_write_assignments", concurrent_write(
+            update(Event).where(Event.id == other.id).values(
+                support_contact_id=tech.id, date_start=other_start,
+                date_end=other_start + timedelta(hours=1))))
+        with pytest.raises(Exception, match="planning d'un support"):
+            event_controller.auto_assign_events(**window)
+
+    session.expire_all()
+    assert all(event.support_contact_id is None for event in session.query(Event))
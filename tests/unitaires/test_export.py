@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+import uuid
+import pytest
+from controllers.client_controller import list_clients
+from controllers.export_controller import export_rows
+from models.client import Client
+from models.department import Department
+from models.user import User
+from utils.auth import Identity
+
+
+def _seed_clients(test_session, count=3):
+    dep = test_session.query(Department).filter_by(name="commercial").first()
+    if not dep:
+        dep = Department(name="commercial")
+        test_session.add(dep)
+        test_session.commit()
+    user = User(name="Export Sales", email=f"export_{uuid.uuid4().hex[:8]}@example.com",
+                password="x", department_id=dep.id)
+    test_session.add(user)
+    test_session.commit()
+    test_session.add_all([Client(name=f"Export {i}", email=f"export{i}@example.com", phone="0101010101",
+                                 company="ExportCo", sales_contact_id=user.id) for i in range(count)])
+    test_session.commit()
+    return Identity(user.id, user.email, "commercial")
+
+
+def test_export_clients_csv_and_ndjson_match_list(test_session):
+    identity = _seed_clients(test_session)
+    listed = list(list_clients(db_session=test_session, current_user=identity).values())
+
+    output = io.StringIO()
+    count = export_rows("clients", output, fmt="csv", batch_size=2, db_session=test_session,
+                        current_user=identity)
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert count == len(listed)
+    assert list(rows[0].keys()) == list(listed[0].keys())
+    assert [row["email"] for row in rows] == [row["email"] for row in listed]
+
+    output = io.StringIO()
+    export_rows("clients", output, fmt="ndjson", db_session=test_session, current_user=identity)
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [line["name"] for line in lines] == [row["name"] for row in listed]
+
+
+def test_export_copy_requires_postgresql(test_session):
+    identity = _seed_clients(test_session, count=1)
+    with pytest.raises(Exception, match="PostgreSQL"):
+        export_rows("clients", io.StringIO(), use_copy=True, db_session=test_session, current_user=identity)
+
+
+def test_export_without_rows_still_writes_header(isolated_session):
+    identity = _seed_clients(isolated_session, count=1)
+    output = io.StringIO()
+    count = export_rows("events", output, fmt="csv", db_session=isolated_session, current_user=identity)
+    assert count == 0
+    assert output.getvalue() == ("id,name,date_start,date_end,location,attendees,notes,"
+                                 "support_contact_id\n")
@@ -0,0 +1,65 @@
+import csv
+import json
+import uuid
+from controllers.client_controller import import_clients
+from models.client import Client
+from models.department import Department
+from models.user import User
+from utils.auth import Identity
+
+
+def create_commercial(test_session):
+    dep = test_session.query(Department).filter_by(name="commercial").first()
+    if not dep:
+        dep = Department(name="commercial")
+        test_session.add(dep)
+        test_session.commit()
+    user = User(name="Import Sales", email=f"import_{uuid.uuid4().hex[:8]}@example.com",
+                password="x", department_id=dep.id)
+    test_session.add(user)
+    test_session.commit()
+    return Identity(user.id, user.email, "commercial")
+
+
+def test_import_clients_csv_with_rejects(test_session, tmp_path):
+    identity = create_commercial(test_session)
+    source = tmp_path / "clients.csv"
+    with open(source, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "email", "phone", "company"])
+        for i in range(7):
+            writer.writerow([f"Import {i}", f"import{i}@example.com", "0101010101", "ImportCo"])
+        writer.writerow(["Bad email", "not-an-email", "0101010101", ""])
+        writer.writerow(["Bad phone", "phone@example.com", "12", ""])
+
+    result = import_clients(str(source), batch_size=3, db_session=test_session, current_user=identity)
+
+    assert result["imported"] == 7
+    assert result["rejected"] == 2
+    assert test_session.query(Client).filter_by(sales_contact_id=identity.id).count() == 7
+    with open(result["reject_path"], newline="") as f:
+        rejects = list(csv.DictReader(f))
+    assert [r["line"] for r in rejects] == ["9", "10"]
+    assert "email" in rejects[0]["error"]
+
+
+def test_import_clients_jsonl(test_session, tmp_path):
+    identity = create_commercial(test_session)
+    source = tmp_path / "clients.jsonl"
+    lines = [json.dumps({"name": "Json", "email": "json@example.com", "phone": "+33101010101"}), "{oops"]
+    source.write_text("\n".join(lines))
+
+    result = import_clients(str(source), db_session=test_session, current_user=identity)
+
+    assert (result["imported"], result["rejected"]) == (1, 1)
+    client = test_session.query(Client).filter_by(sales_contact_id=identity.id).one()
+    assert client.company is None and client.created_date is not None
+
+
+def test_csv_line_numbers_follow_multiline_fields(tmp_path):
+    from utils.datafiles import iter_records
+
+    source = tmp_path / "multiline.csv"
+    source.write_text('name,company\nA,"Acme\nParis"\nB,Globex\n', encoding="utf-8")
+
+    assert [(line, record["name"]) for line, record, _ in iter_records(str(source))] == [(3, "A"), (4, "B")]
@@ -0,0 +1,26 @@
+import random
+
+from utils.intervals import IntervalTree, find_overlaps
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(4)
+    starts = [rng.randint(0, 200) for _ in range(300)]
+    intervals = [(start, start + rng.randint(1, 20), i) for i, start in enumerate(starts)]
+    tree = IntervalTree(intervals)
+
+    for _ in range(200):
+        start = rng.randint(-10, 210)
+        end = start + rng.randint(1, 15)
+        expected = {value for s, e, value in intervals if s < end and e > start}
+        found = tree.overlapping(start, end)
+        assert {value for _, _, value in found} == expected
+        assert [s for s, _, _ in found] == sorted(s for s, _, _ in found)
+        assert tree.overlaps(start, end) == bool(expected)
+
+
+def test_touching_intervals_do_not_overlap():
+    tree = IntervalTree([(10, 20, "a")])
+    assert not tree.overlaps(20, 30)
+    assert not tree.overlaps(0, 10)
+    assert find_overlaps([(0, 10, "a"), (10, 20, "b"), (5, 15, "c")]) == [("a", "c"), ("c", "b")]
@@ -0,0 +1,60 @@
+import uuid
+from commands.client import list_clients_cmd
+from controllers.client_controller import list_clients
+from controllers.user_controller import list_users
+from models.client import Client
+from models.department import Department
+from models.user import User
+from utils.auth import Identity
+from utils.pagination import next_page_hint
+
+
+def create_commercial(test_session):
+    dep = test_session.query(Department).filter_by(name="commercial").first()
+    if not dep:
+        dep = Department(name="commercial")
+        test_session.add(dep)
+        test_session.commit()
+    user = User(name="Paginated Sales", email=f"page_{uuid.uuid4().hex[:8]}@example.com",
+                password="x", department_id=dep.id)
+    test_session.add(user)
+    test_session.commit()
+    return user
+
+
+def test_list_clients_keyset_pages(test_session):
+    user = create_commercial(test_session)
+    clients = [Client(name=f"Page {i}", email=f"page{i}@example.com", phone="0101010101",
+                      company="PageCo", sales_contact_id=user.id) for i in range(5)]
+    test_session.add_all(clients)
+    test_session.commit()
+    start = clients[0].id - 1
+    identity = Identity(user.id, user.email, "commercial")
+
+    first = list_clients(limit=2, after=start, db_session=test_session, current_user=identity)
+    assert list(first) == [clients[0].id, clients[1].id]
+    assert next_page_hint(first, 2) == f"Page suivante : --after {clients[1].id}"
+
+    second = list_clients(limit=2, after=clients[1].id, db_session=test_session, current_user=identity)
+    assert list(second) == [clients[2].id, clients[3].id]
+
+    last = list_clients(limit=2, after=clients[3].id, db_session=test_session, current_user=identity)
+    assert clients[4].id in last
+    assert all(client_id > clients[3].id for client_id in last)
+
+
+def test_list_users_pages_on_email(test_session):
+    create_commercial(test_session)
+    identity = Identity(0, "admin@example.com", "gestion")
+
+    first = list_users(limit=1, db_session=test_session, current_user=identity)
+    (email,) = first
+    following = list_users(limit=1, after=email, db_session=test_session, current_user=identity)
+    assert all(other > email for other in following)
+
+
+def test_list_options_reject_unbounded_pages(runner):
+    # Rejetées par click, avant tout appel au contrôleur
+    for args in (["--limit", "0"], ["--limit", "-1"], ["--after", "-5"]):
+        result = runner.invoke(list_clients_cmd, args)
+        assert result.exit_code == 2 and "is not in the range" in result.output
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import click
+from click.testing import CliRunner
+
+from controllers.client_controller import pick_clients
+from controllers.contract_controller import pick_contracts
+from controllers.event_controller import pick_events, pick_support_users
+from utils.picker import pick
+
+
+def test_pick_pages_filters_and_returns_choice():
+    rows = {i: {"id": i, "name": f"Client {i}"} for i in range(1, 8)}
+    calls = []
+
+    def fetch(search, limit, after):
+        calls.append((search, limit, after))
+        matching = [r for r in rows.values()
+                    if (after is None or r["id"] > after) and (not search or search in r["name"])]
+        return {r["id"]: r for r in matching[:limit]}
+
+    @click.command()
+    def choose():
+        choice = pick(fetch, lambda r: f"[{r['id']}] {r['name']}", "clients", page_size=3)
+        click.echo(f"choix={choice[0] if choice else None}")
+
+    # Filtre vide, page suivante, ID non affiché refusé, puis choix
+    result = CliRunner().invoke(choose, input="\n\n1\n5\n")
+    assert calls == [(None, 4, None), (None, 4, 3)]
+    assert "Choisissez un ID affiché." in result.output and "choix=5" in result.output
+
+    # Nouveau filtre, puis annulation
+    calls.clear()
+    result = CliRunner().invoke(choose, input="\n/7\nq\n")
+    assert calls == [(None, 4, None), ("7", 4, None)]
+    assert "[7] Client 7" in result.output and "choix=None" in result.output
+
+
+def test_pick_queries_are_scoped_to_caller(crm, as_user):
+    session = crm.session
+    me, other, tech = crm.user("Me"), crm.user("Other"), crm.user("Tech", "support")
+    mine = crm.client("Acme Corp", me, company="Acme")
+    theirs = crm.client("Globex Inc", other, company="Globex")
+    signed, unsigned, foreign = [
+        crm.contract(client, signed=is_signed)
+        for client, is_signed in [(mine, True), (mine, False), (theirs, True)]
+    ]
+    day = datetime(2025, 6, 1)
+    gala = crm.event(signed, "Gala", day, location="Nice", support=tech)
+    salon = crm.event(foreign, "Salon", day, location="Lyon")
+    session.commit()
+
+    with as_user("commercial", me):
+        assert list(pick_clients(mine=True, db_session=session)) == [mine.id]
+        assert list(pick_clients(search="globex", db_session=session)) == [theirs.id]
+        assert list(pick_clients(limit=1, after=mine.id, db_session=session)) == [theirs.id]
+        assert list(pick_contracts(signed=True, mine=True, db_session=session)) == [signed.id]
+        assert list(pick_contracts(search="globex", db_session=session)) == [foreign.id]
+        assert list(pick_events(mine=True, db_session=session)) == [gala.id]
+
+    with as_user("support", tech):
+        assert list(pick_events(mine=True, db_session=session)) == [gala.id]
+
+    with as_user("gestion"):
+        assert list(pick_events(search="lyon", unassigned=True, db_session=session)) == [salon.id]
+        assert list(pick_contracts(mine=True, db_session=session)) == [signed.id, unsigned.id, foreign.id]
+        assert pick_support_users(search="tech", db_session=session) == {
+            tech.id: {"id": tech.id, "name": "Tech", "email": "tech@example.com"}
+        }
@@ -0,0 +1,42 @@
+from controllers.client_controller import list_clients
+from models.client import Client
+from models.department import Department
+from models.user import User
+from utils.auth import Identity
+from utils.profiling import SQLProfiler, percentile
+
+
+def test_percentile_nearest_rank():
+    assert percentile([], 95) == 0.0
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(list(range(1, 101)), 95) == 95
+
+
+def test_profiler_counts_statements_and_rows(engine, test_session):
+    dep = test_session.query(Department).filter_by(name="commercial").first()
+    if not dep:
+        dep = Department(name="commercial")
+        test_session.add(dep)
+        test_session.flush()
+    user = User(name="Profil", email="profil@example.com", password="x", department_id=dep.id)
+    test_session.add(user)
+    test_session.flush()
+    test_session.add_all([Client(name=f"P{i}", email=f"p{i}@example.com", phone="0101010101",
+                                 company="Co", sales_contact_id=user.id) for i in range(4)])
+    test_session.flush()
+
+    profiler = SQLProfiler()
+    profiler.install(engine)
+    try:
+        identity = Identity(user.id, user.email, "commercial")
+        clients = list_clients(db_session=test_session, current_user=identity)
+        test_session.query(Client).filter(Client.email == "p0@example.com").update({"company": "NewCo"})
+    finally:
+        profiler.uninstall()
+
+    assert len(profiler.durations) == 2
+    assert profiler.rows == len(clients)
+    assert profiler.rows_written == 1
+    report = profiler.report()
+    assert report.startswith("Profil SQL : 2 requête(s)")
+    assert "UPDATE clients" in report
@@ -0,0 +1,83 @@
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from controllers.client_controller import list_clients
+from controllers.user_controller import list_users
+from models.client import Client
+from models.department import Department
+from models.user import User
+from utils.auth import Identity
+
+
+@contextmanager
+def count_queries(engine):
+    """Compte les requêtes SQL émises sur le moteur pendant le bloc."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def add_clients(test_session, count):
+    """Crée `count` clients, chacun avec son propre commercial (pire cas pour le N+1)."""
+    dep = test_session.query(Department).filter_by(name="commercial").first()
+    if not dep:
+        dep = Department(name="commercial")
+        test_session.add(dep)
+        test_session.commit()
+    for _ in range(count):
+        suffix = uuid.uuid4().hex[:8]
+        user = User(name=f"N+1 {suffix}", email=f"n1_{suffix}@example.com", password="x",
+                    department_id=dep.id)
+        test_session.add(user)
+        test_session.flush()
+        test_session.add(Client(name=f"N+1 {suffix}", email=f"n1_{suffix}@example.com",
+                                phone="0101010101", company="N1Co", sales_contact_id=user.id))
+    test_session.commit()
+
+
+def queries_for(engine, controller, role):
+    # Session neuve : rien n'est déjà présent dans la map d'identité
+    session = sessionmaker(bind=engine)()
+    try:
+        with count_queries(engine) as statements:
+            controller(db_session=session, current_user=Identity(0, "x@example.com", role))
+        return len(statements)
+    finally:
+        session.close()
+
+
+def test_list_clients_query_count_is_constant(engine, test_session):
+    add_clients(test_session, 2)
+    small = queries_for(engine, list_clients, "gestion")
+    add_clients(test_session, 10)
+    assert queries_for(engine, list_clients, "gestion") == small
+
+
+def test_list_users_query_count_is_constant(engine, test_session):
+    add_clients(test_session, 2)
+    small = queries_for(engine, list_users, "gestion")
+    add_clients(test_session, 10)
+    assert queries_for(engine, list_users, "gestion") == small
+
+
+def test_repr_does_not_lazy_load(engine, test_session):
+    add_clients(test_session, 1)
+    session = sessionmaker(bind=engine)()
+    try:
+        client = session.query(Client).first()
+        user = session.query(User).first()
+        with count_queries(engine) as statements:
+            repr(client), repr(user)
+        assert statements == []
+    finally:
+        session.close()
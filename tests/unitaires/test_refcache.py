@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from controllers.event_controller import pick_support_users
+from controllers.user_controller import department_choices
+from models.department import Department
+from models.user import User
+from utils import auth
+from utils.cache import result_cache
+from utils.refcache import bump_reference_version, cached_reference, reference_version
+from utils.schema import init_db
+
+
+@pytest.fixture
+def crm_session(tmp_path):
+    url = f"sqlite:///{tmp_path / 'crm.db'}"
+    init_db(url)
+    engine = create_engine(url)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_reference_data_is_reloaded_only_after_a_version_bump(crm_session):
+    loads = []
+
+    def load():
+        loads.append(1)
+        return sorted(name for (name,) in crm_session.query(Department.name))
+
+    version = reference_version(crm_session)
+    assert cached_reference(crm_session, "departments", load) == ["commercial", "gestion", "support"]
+    assert cached_reference(crm_session, "departments", load) == ["commercial", "gestion", "support"]
+    assert len(loads) == 1
+
+    # Écriture d'une donnée de référence : l'entrée du cache est obsolète
+    crm_session.add(Department(name="marketing"))
+    bump_reference_version(crm_session)
+    crm_session.commit()
+    assert reference_version(crm_session) == version + 1
+    assert "marketing" in cached_reference(crm_session, "departments", load)
+    assert len(loads) == 2
+
+
+def test_database_without_version_bypasses_the_cache(isolated_session):
+    loads = []
+    assert reference_version(isolated_session) is None
+    for _ in range(2):
+        cached_reference(isolated_session, "departments", lambda: loads.append(1) or [])
+    assert len(loads) == 2
+
+
+def test_role_check_ignores_the_local_cache_file(crm_session):
+    support = crm_session.query(Department).filter_by(name="support").one()
+    user = User(name="Support", email="cached@example.com", password="x", department_id=support.id)
+    crm_session.add(user)
+    bump_reference_version(crm_session)
+    crm_session.commit()
+
+    # Entrée forgée dans le fichier local : elle ne doit pas accorder un autre rôle
+    cached_reference(crm_session, f"identity:{user.id}", lambda: "gestion")
+    with pytest.raises(Exception, match="rôle a changé"):
+        auth.revalidate_identity(auth.Identity(user.id, user.email, "gestion"), db_session=crm_session)
+    auth.revalidate_identity(auth.Identity(user.id, user.email, "support"), db_session=crm_session)
+
+
+def test_support_picker_and_department_choices_use_the_cache(crm_session, as_user):
+    support = crm_session.query(Department).filter_by(name="support").one()
+    crm_session.add(User(name="Tech", email="tech@example.com", password="x", department_id=support.id))
+    bump_reference_version(crm_session)
+    crm_session.commit()
+    with as_user("gestion"):
+        assert [u["name"] for u in pick_support_users(db_session=crm_session).values()] == ["Tech"]
+        assert sorted(d["name"] for d in department_choices(db_session=crm_session)) == [
+            "commercial", "gestion", "support"]
+
+        # Écriture sans changement de version : la liste vient du fichier de cache
+        crm_session.add(User(name="Other", email="other@example.com", password="x", department_id=support.id))
+        crm_session.commit()
+        result_cache.clear()
+        assert [u["name"] for u in pick_support_users(db_session=crm_session).values()] == ["Tech"]
+        # La recherche interroge toujours la base
+        assert [u["name"] for u in pick_support_users(search="oth", db_session=crm_session).values()] == [
+            "Other"]
+
+        bump_reference_version(crm_session)
+        crm_session.commit()
+        result_cache.clear()
+        tech, other = pick_support_users(db_session=crm_session).values()
+        assert (tech["name"], other["name"]) == ("Tech", "Other")
+        assert list(pick_support_users(limit=1, after=tech["id"], db_session=crm_session)) == [other["id"]]
@@ -0,0 +1,60 @@
+import pytest
+
+from controllers import contract_controller, event_controller
+from controllers.dashboard_controller import get_dashboard
+from models.contract import Contract
+from models.rollup import MonthlyRollup, SalesContactRollup
+from utils.rollups import rebuild_rollups
+
+
+@pytest.fixture
+def rollup_session(isolated_session, monkeypatch):
+    """Base dédiée : les agrégats sont comparés à un recalcul complet."""
+    monkeypatch.setattr(contract_controller, "session", isolated_session)
+    monkeypatch.setattr(event_controller, "session", isolated_session)
+    return isolated_session
+
+
+def snapshot(session):
+    sales = session.query(SalesContactRollup).order_by(SalesContactRollup.sales_contact_id).all()
+    months = session.query(MonthlyRollup).order_by(MonthlyRollup.month).all()
+    return (
+        [(r.sales_contact_id, r.contracts, r.amount_total, r.amount_remaining, r.events) for r in sales],
+        [(r.month, r.contracts, r.amount_total, r.amount_remaining, r.events) for r in months],
+    )
+
+
+def test_rollups_follow_writes_and_match_rebuild(rollup_session, crm, as_user):
+    session = rollup_session
+    seller = crm.user("Seller")
+    client = crm.client("Acme", seller)
+    session.commit()
+
+    with as_user("commercial", seller):
+        contract_controller.create_contract(client.id, 1000.0, 1000.0, "oui")
+        contract_controller.create_contract(client.id, 500.0, 500.0, "non")
+        first, second = session.query(Contract).order_by(Contract.id).all()
+        contract_controller.update_contract(first.id, 1200.0, 200.0, None, db_session=session)
+        event_controller.create_event(first.id, "Salon", "2025-03-01 10:00", "2025-03-01 18:00", "Lyon", 50,
+                                      None)
+        event_controller.create_event(first.id, "Gala", "2025-04-01 10:00", "2025-04-01 18:00", "Nice", 80,
+                                      None)
+        gala = first.events[-1]
+        event_controller.delete_event(gala.id)
+        contract_controller.delete_contract(second.id, db_session=session)
+
+    incremental = snapshot(session)
+    assert incremental[0] == [(seller.id, 1, 1200.0, 200.0, 1)]
+    assert ("2025-03", 0, 0.0, 0.0, 1) in incremental[1]
+
+    rebuild_rollups(session.connection())
+    session.commit()
+    rebuilt = snapshot(session)
+    # Les mois vidés restent présents (à zéro) côté incrémental : seules les lignes non nulles comptent
+    assert incremental[0] == rebuilt[0]
+    assert [row for row in incremental[1] if any(row[1:])] == rebuilt[1]
+
+    with as_user("gestion"):
+        dashboard = get_dashboard(db_session=session)
+    assert dashboard == [{"label": "Seller", "contracts": 1, "amount_total": 1200.0,
+                          "amount_remaining": 200.0, "events": 1}]
@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+from models.department import Department
+from utils.schema import init_db, check_schema_version, set_schema_version, SCHEMA_VERSION
+
+
+def make_checked_engine(url):
+    engine = create_engine(url)
+    event.listen(engine, "first_connect", check_schema_version)
+    return engine
+
+
+def test_uninitialised_database_is_rejected(tmp_path):
+    engine = make_checked_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    with pytest.raises(Exception, match="db init"):
+        engine.connect()
+
+
+def test_init_db_creates_departments_and_version(tmp_path):
+    url = f"sqlite:///{tmp_path / 'crm.db'}"
+    init_db(url)
+    init_db(url)  # idempotent
+
+    engine = make_checked_engine(url)
+    with engine.connect() as conn:
+        names = sorted(conn.execute(text(f"SELECT name FROM {Department.__tablename__}")).scalars())
+        version = conn.execute(text("SELECT version FROM schema_info")).scalar_one()
+    assert names == ["commercial", "gestion", "support"]
+    assert version == SCHEMA_VERSION
+
+
+def test_outdated_schema_is_rejected(tmp_path):
+    url = f"sqlite:///{tmp_path / 'old.db'}"
+    init_db(url)
+    set_schema_version(create_engine(url), SCHEMA_VERSION - 1)
+
+    with pytest.raises(Exception, match="db upgrade"):
+        make_checked_engine(url).connect()
+
+
+# Tables telles que créées par create_all dans le code d'origine : ni schema_info ni alembic_version
+LEGACY_TABLES = [
+    "CREATE TABLE departments (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL UNIQUE)",
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, email VARCHAR NOT NULL UNIQUE, "
+    "password VARCHAR NOT NULL, department_id INTEGER NOT NULL REFERENCES departments (id))",
+    "CREATE TABLE clients (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, email VARCHAR NOT NULL, "
+    "phone VARCHAR, company VARCHAR, created_date DATETIME, updated_date DATETIME, "
+    "sales_contact_id INTEGER NOT NULL REFERENCES users (id))",
+    "CREATE TABLE contracts (id INTEGER PRIMARY KEY, client_id INTEGER NOT NULL REFERENCES clients (id), "
+    "sales_contact_id INTEGER NOT NULL REFERENCES users (id), amount_total FLOAT NOT NULL, "
+    "amount_remaining FLOAT NOT NULL, signed BOOLEAN, signed_date DATETIME, created_date DATETIME)",
+    "CREATE TABLE events (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+    "contract_id INTEGER NOT NULL REFERENCES contracts (id), "
+    "support_contact_id INTEGER REFERENCES users (id), date_start DATETIME NOT NULL, "
+    "date_end DATETIME NOT NULL, location VARCHAR NOT NULL, attendees INTEGER NOT NULL, notes VARCHAR)",
+]
+
+
+def test_upgrade_of_database_created_by_original_code(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    legacy = create_engine(url)
+    with legacy.begin() as conn:
+        for ddl in LEGACY_TABLES:
+            conn.exec_driver_sql(ddl)
+        conn.exec_driver_sql("INSERT INTO departments (name) VALUES ('gestion')")
+    legacy.dispose()
+
+    init_db(url)
+
+    engine = make_checked_engine(url)
+    with engine.connect() as conn:
+        names = sorted(conn.execute(text(f"SELECT name FROM {Department.__tablename__}")).scalars())
+        version = conn.execute(text("SELECT version FROM schema_info")).scalar_one()
+    assert names == ["commercial", "gestion", "support"]
+    assert version == SCHEMA_VERSION
+
+
+def test_autogenerate_ignores_full_text_index_tables(tmp_path):
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+    from models.base import Base
+    from utils.schema import include_in_autogenerate
+
+    url = f"sqlite:///{tmp_path / 'crm.db'}"
+    init_db(url)
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"include_object": include_in_autogenerate})
+        with pytest.warns(UserWarning, match="expression-based index"):
+            diffs = compare_metadata(context, Base.metadata)
+    engine.dispose()
+    assert diffs == []
@@ -0,0 +1,109 @@
+from sqlalchemy import create_engine, func, select
+from models.base import Base
+from models.client import Client
+from models.contract import Contract
+from models.department import Department
+from models.event import Event
+from models.user import User
+from utils.auth import check_password
+from utils.refcache import REFERENCE_VERSION_QUERY
+from utils.schema import init_db
+from utils.seed import seed_database
+
+
+def test_seed_generates_consistent_data(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        departments = [{"name": name} for name in ("commercial", "support", "gestion")]
+        connection.execute(Department.__table__.insert(), departments)
+        connection.commit()
+
+        counts = seed_database(connection, users=20, clients=50, contracts=80, events=60, batch_size=7,
+                               password_hash="x")
+        assert counts == {"users": 20, "clients": 50, "contracts": 80, "events": 60}
+
+        departments = dict(connection.execute(select(Department.id, Department.name)).all())
+        roles = dict(connection.execute(select(User.id, User.department_id)).all())
+
+        # Clients et contrats rattachés à des commerciaux, contrat = commercial du client
+        for sales_contact_id, owner_id in connection.execute(
+                select(Contract.sales_contact_id, Client.sales_contact_id).join(Client)):
+            assert sales_contact_id == owner_id
+            assert departments[roles[owner_id]] == "commercial"
+
+        # Événements : contrats signés, support du bon département, dates cohérentes
+        for signed, support_id, start, end, signed_date in connection.execute(
+                select(Contract.signed, Event.support_contact_id, Event.date_start, Event.date_end,
+                       Contract.signed_date).join(Contract)):
+            assert signed
+            assert end > start > signed_date
+            assert support_id is None or departments[roles[support_id]] == "support"
+
+        # Une seconde génération complète la base sans conflit d'identifiants
+        seed_database(connection, clients=5, password_hash="x", seed=1)
+        assert connection.execute(select(func.count()).select_from(Client)).scalar() == 55
+    engine.dispose()
+
+
+def test_seed_command_uses_bulk_path(tmp_path, runner, monkeypatch):
+    from commands.seed import seed_cmd
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed_cmd.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(Department.__table__.insert(), [{"name": "commercial"}, {"name": "support"},
+                                                           {"name": "gestion"}])
+    monkeypatch.setattr("utils.connection.engine", engine)
+
+    args = ["--users", "5", "--clients", "30", "--contracts", "20", "--events", "10"]
+    result = runner.invoke(seed_cmd, args)
+    assert "Données générées : 5 users, 30 clients, 20 contracts, 10 events" in result.output
+    password = result.output.split("Mot de passe des utilisateurs générés : ")[1].strip()
+    with engine.connect() as connection:
+        stored = connection.execute(select(User.password).limit(1)).scalar()
+    assert check_password(password, stored)
+
+    result = runner.invoke(seed_cmd, [])
+    assert "Rien à générer" in result.output
+    engine.dispose()
+
+
+def test_seed_command_guards_populated_database(tmp_path, runner, monkeypatch, as_user):
+    from commands.seed import seed_cmd
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'populated.db'}")
+    Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        connection.execute(Department.__table__.insert(), [{"name": "commercial"}, {"name": "support"},
+                                                           {"name": "gestion"}])
+        seed_database(connection, users=5, clients=3, password_hash="x")
+    monkeypatch.setattr("utils.connection.engine", engine)
+
+    # Sans utilisateur gestion connecté : refus
+    with as_user("commercial"):
+        result = runner.invoke(seed_cmd, ["--clients", "2", "--yes"])
+    assert "Accès refusé" in result.output
+
+    with as_user("gestion"):
+        result = runner.invoke(seed_cmd, ["--clients", "2"], input="n\n")
+        assert "Génération annulée." in result.output
+        result = runner.invoke(seed_cmd, ["--clients", "2", "--yes"])
+        assert "Données générées : 2 clients" in result.output
+    with engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(Client)).scalar() == 5
+    engine.dispose()
+
+
+def test_seeded_users_invalidate_the_reference_cache(tmp_path):
+    url = f"sqlite:///{tmp_path / 'crm.db'}"
+    init_db(url)
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        version = connection.execute(REFERENCE_VERSION_QUERY).scalar()
+        seed_database(connection, users=3, password_hash="x")
+        assert connection.execute(REFERENCE_VERSION_QUERY).scalar() == version + 1
+        # Sans nouvel utilisateur, les données de référence sont inchangées
+        seed_database(connection, clients=2, password_hash="x")
+        assert connection.execute(REFERENCE_VERSION_QUERY).scalar() == version + 1
+    engine.dispose()
@@ -0,0 +1,38 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["sqlalchemy", "bcrypt", "jwt", "sentry_sdk", "dotenv"]
+
+
+def loaded_modules(*args):
+    """Lance la CLI dans un processus neuf et retourne les modules lourds chargés."""
+    code = (
+        "import json, sys\n"
+        "from epicevents import cli\n"
+        f"cli({list(args)!r}, standalone_mode=False)\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_help_does_not_import_heavy_modules():
+    assert loaded_modules("--help") == []
+
+
+def test_help_lists_lazy_subcommands(runner):
+    from epicevents import cli
+
+    result = runner.invoke(cli, ["--help"])
+    assert result.exit_code == 0
+    for name in ["client", "contract", "event", "user", "login"]:
+        assert name in result.output
+
+
+def test_login_help_does_not_import_heavy_modules():
+    assert loaded_modules("login", "--help") == []
+
+
+def test_subcommand_help_does_not_init_sentry():
+    assert "sentry_sdk" not in loaded_modules("client", "--help")
@@ -0,0 +1,33 @@
+import inspect
+import uuid
+from controllers.client_controller import iter_clients, list_clients
+from models.client import Client
+from models.department import Department
+from models.user import User
+from utils.auth import Identity
+
+
+def test_iter_clients_streams_same_rows_as_list(test_session):
+    dep = test_session.query(Department).filter_by(name="commercial").first()
+    if not dep:
+        dep = Department(name="commercial")
+        test_session.add(dep)
+        test_session.commit()
+    user = User(name="Stream Sales", email=f"stream_{uuid.uuid4().hex[:8]}@example.com",
+                password="x", department_id=dep.id)
+    test_session.add(user)
+    test_session.commit()
+    clients = [Client(name=f"Stream {i}", email=f"stream{i}@example.com", phone="0101010101",
+                      company="StreamCo", sales_contact_id=user.id) for i in range(5)]
+    test_session.add_all(clients)
+    test_session.commit()
+    identity = Identity(user.id, user.email, "commercial")
+    after = clients[0].id - 1
+
+    rows = iter_clients(after=after, batch_size=2, db_session=test_session, current_user=identity)
+    assert inspect.isgenerator(rows)
+
+    streamed = list(rows)
+    listed = list_clients(after=after, db_session=test_session, current_user=identity)
+    assert streamed == list(listed.values())
+    assert streamed[0]["sales_contact_name"] == "Stream Sales"
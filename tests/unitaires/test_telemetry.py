@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from utils.telemetry import AuditPipeline, format_audit_event
+
+
+def test_events_are_sent_in_batches_off_the_calling_thread():
+    sent = []
+    done = threading.Event()
+
+    def sender(batch):
+        sent.append((threading.current_thread().name, list(batch)))
+        done.set()
+
+    pipeline = AuditPipeline(sender, batch_size=3, flush_interval=60)
+    for i in range(3):
+        pipeline.record("client_created", client=f"c{i}@example.com", by="sales@example.com")
+    assert done.wait(2)
+    pipeline.close()
+
+    thread_name, batch = sent[0]
+    assert thread_name == "audit-pipeline"
+    assert [event["fields"]["client"] for event in batch] == [f"c{i}@example.com" for i in range(3)]
+    assert format_audit_event(batch[0]) == "Client créé : c0@example.com par sales@example.com"
+
+
+def test_sampling_drops_events():
+    sent = []
+    pipeline = AuditPipeline(sent.extend, sample_rate=0.0)
+    for _ in range(50):
+        pipeline.record("user_deleted", user="u@example.com", by="admin@example.com")
+    pipeline.close()
+    assert sent == []
+
+
+def test_close_is_bounded_and_keeps_unsent_events_in_outbox(tmp_path):
+    outbox = tmp_path / "outbox.jsonl"
+    release = threading.Event()
+
+    def failing_sender(batch):
+        release.wait(5)
+        raise Exception("Sentry injoignable")
+
+    pipeline = AuditPipeline(failing_sender, flush_interval=60, exit_timeout=0.1, outbox_path=str(outbox))
+    pipeline.record("client_deleted", client=1, by="sales@example.com")
+    start = time.perf_counter()
+    pipeline.close()
+    assert time.perf_counter() - start < 1
+    release.set()
+    pipeline._thread.join(2)
+
+    assert [json.loads(line)["kind"] for line in outbox.read_text().splitlines()] == ["client_deleted"]
+
+    # Le démarrage suivant reprend la boîte d'envoi
+    sent = []
+    pipeline = AuditPipeline(sent.extend, flush_interval=60, outbox_path=str(outbox))
+    pipeline.close()
+    assert [event["kind"] for event in sent] == ["client_deleted"]
+    assert not outbox.exists()
+
+
+def test_batch_sent_after_close_is_not_sent_again(tmp_path):
+    outbox = tmp_path / "outbox.jsonl"
+    sending, release, delivered = threading.Event(), threading.Event(), []
+
+    def slow_sender(batch):
+        sending.set()
+        release.wait(5)
+        delivered.extend(batch)
+
+    pipeline = AuditPipeline(slow_sender, batch_size=1, flush_interval=60, exit_timeout=0.1,
+                             outbox_path=str(outbox))
+    pipeline.record("client_deleted", client=1, by="sales@example.com")
+    assert sending.wait(2)
+    pipeline.record("client_deleted", client=2, by="sales@example.com")
+    pipeline.close()
+    # Le lot en cours d'envoi est écrit dans la boîte d'envoi, puis son envoi aboutit
+    release.set()
+    pipeline._thread.join(2)
+    assert [event["fields"]["client"] for event in delivered] == [1]
+
+    sent = []
+    AuditPipeline(sent.extend, flush_interval=60, outbox_path=str(outbox)).close()
+    assert [event["fields"]["client"] for event in sent] == [2]
+    assert not outbox.exists()
+
+
+def test_unhandled_exception_is_reported_to_sentry(monkeypatch):
+    import sentry_sdk
+    from utils import telemetry
+
+    captured, shown = [], []
+    monkeypatch.setenv("SENTRY_KEY", "https://key@sentry.example.com/1")
+    monkeypatch.setattr(telemetry, "_sentry_ready", False)
+    monkeypatch.setattr(telemetry, "_previous_excepthook", lambda *exc_info: shown.append(exc_info[1]))
+    monkeypatch.setattr(telemetry, "init_sentry", lambda: None)
+    monkeypatch.setattr(telemetry, "flush_sentry", lambda timeout: None)
+    monkeypatch.setattr(sentry_sdk, "capture_exception", lambda exc_info: captured.append(exc_info[1]))
+
+    error = RuntimeError("boom")
+    telemetry.report_crash(RuntimeError, error, None)
+    assert captured == [error] and shown == [error]
+
+
+def test_outbox_is_claimed_under_lock(tmp_path):
+    import fcntl
+
+    outbox = tmp_path / "outbox.jsonl"
+    outbox.write_text(json.dumps({"kind": "client_deleted", "fields": {}, "ts": 0}) + "\n")
+    sent, loaded = [], threading.Event()
+
+    # Un autre processus écrit dans la boîte d'envoi : la reprise attend la fin de son ajout
+    with open(f"{outbox}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        def load():
+            AuditPipeline(sent.extend, flush_interval=60, outbox_path=str(outbox)).close()
+            loaded.set()
+
+        threading.Thread(target=load).start()
+        assert not loaded.wait(0.2)
+        with open(outbox, "a") as f:
+            f.write(json.dumps({"kind": "user_deleted", "fields": {}, "ts": 0}) + "\n")
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    assert loaded.wait(5)
+    assert [event["kind"] for event in sent] == ["client_deleted", "user_deleted"]
+    assert not outbox.exists()
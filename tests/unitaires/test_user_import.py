@@ -0,0 +1,49 @@
+import csv
+import uuid
+from controllers.user_controller import import_users
+from models.department import Department
+from models.user import User
+from utils.auth import Identity, check_password
+
+
+def get_department(test_session, name):
+    dep = test_session.query(Department).filter_by(name=name).first()
+    if not dep:
+        dep = Department(name=name)
+        test_session.add(dep)
+        test_session.commit()
+    return dep
+
+
+def test_import_users_with_rejects(test_session, tmp_path):
+    gestion = get_department(test_session, "gestion")
+    support = get_department(test_session, "support")
+    identity = Identity(0, f"admin_{uuid.uuid4().hex[:8]}@example.com", "gestion")
+    existing = User(name="Existing", email="existing_import@example.com", password="x",
+                    department_id=gestion.id)
+    test_session.add(existing)
+    test_session.commit()
+
+    source = tmp_path / "users.csv"
+    with open(source, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "email", "password", "department"])
+        writer.writerow(["Alice", "alice_import@example.com", "Secret-1", "Support"])
+        writer.writerow(["Bob", "bob_import@example.com", "Secret-2", str(gestion.id)])
+        writer.writerow(["Bob bis", "bob_import@example.com", "Secret-3", "support"])
+        writer.writerow(["Carol", "existing_import@example.com", "Secret-4", "support"])
+        writer.writerow(["Dave", "dave_import@example.com", "Secret-5", "marketing"])
+
+    result = import_users(str(source), batch_size=2, workers=2,
+                          db_session=test_session, current_user=identity)
+
+    assert (result["imported"], result["rejected"]) == (2, 3)
+    alice = test_session.query(User).filter_by(email="alice_import@example.com").one()
+    assert alice.department_id == support.id
+    assert check_password("Secret-1", alice.password)
+    with open(result["reject_path"], newline="") as f:
+        reader = csv.DictReader(f)
+        errors = {r["line"]: r["error"] for r in reader}
+    assert reader.fieldnames == ["line", "name", "email", "department", "error"]
+    assert set(errors) == {"4", "5", "6"}
+    assert "double" in errors["4"] and "existant" in errors["5"] and "Département" in errors["6"]
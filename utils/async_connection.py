@@ -0,0 +1,105 @@
+from contextlib import asynccontextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from utils.connection import db_url
+from utils.schema import check_schema_version
+
+# Pilote asynchrone utilisé pour chaque pilote synchrone connu
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def to_async_url(url):
+    """
+    Convertit une URL de connexion synchrone en URL utilisant le pilote asynchrone équivalent.
+
+    Args:
+        url (str): URL SQLAlchemy (par exemple postgresql+psycopg2://...).
+
+    Returns:
+        URL: URL avec le pilote asynchrone (postgresql+asyncpg, sqlite+aiosqlite).
+
+    Raises:
+        Exception: Si aucun pilote asynchrone n'est connu pour cette base.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise Exception(f"Aucun pilote asynchrone disponible pour {backend}.")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def get_async_engine():
+    """
+    Retourne le moteur asynchrone de l'application, créé au premier appel.
+
+    Le pilote (asyncpg, aiosqlite) n'est importé qu'à ce moment : la CLI synchrone
+    n'en dépend pas. La version du schéma est vérifiée à la première connexion,
+    comme pour le moteur synchrone.
+
+    Returns:
+        AsyncEngine: Moteur asynchrone.
+    """
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        _async_engine = create_async_engine(to_async_url(db_url))
+        event.listen(_async_engine.sync_engine, "first_connect", check_schema_version)
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    """
+    Retourne la fabrique de sessions asynchrones liée au moteur de l'application.
+
+    Returns:
+        async_sessionmaker: Fabrique d'AsyncSession (expire_on_commit=False).
+    """
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), expire_on_commit=False)
+    return _async_sessionmaker
+
+
+@asynccontextmanager
+async def async_session_scope(db_session=None):
+    """
+    Fournit une AsyncSession pour une opération.
+
+    Contrairement aux contrôleurs synchrones qui partagent une session de module,
+    chaque opération ouvre sa propre session : plusieurs opérations peuvent
+    s'exécuter en parallèle dans la même boucle d'événements.
+
+    Args:
+        db_session (AsyncSession | None): session fournie par l'appelant (tests, transaction englobante).
+
+    Yields:
+        AsyncSession: La session fournie, ou une nouvelle session fermée en sortie.
+    """
+    if db_session is not None:
+        yield db_session
+        return
+    async with get_async_sessionmaker()() as session:
+        yield session
+
+
+async def dispose_async_engine():
+    """
+    Ferme les connexions du moteur asynchrone, s'il a été créé.
+
+    À appeler en fin de boucle d'événements : les connexions aiosqlite restées
+    ouvertes dans le pool empêchent sinon le processus de se terminer.
+    """
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
@@ -2,9 +2,11 @@ import bcrypt
 import getpass
 import jwt
 import os
+from contextvars import ContextVar
 from sqlalchemy.orm import sessionmaker, joinedload
 from models.user import User
 from utils.connection import engine
+from utils.password_policy import get_rounds, needs_rehash
 from datetime import datetime, timedelta
 
 
@@ -13,46 +15,28 @@ SECRET_KEY = os.getenv("EPIC_SECRET_KEY", "change_me")
 ALGORITHM = "HS256"
 TOKEN_FILE = "../.epic_token"
 
+# Politique de revalidation de l'identité : "never" (rôle issu du token signé) ou "always"
+# (une requête par commande pour vérifier que l'utilisateur et son rôle sont inchangés)
+IDENTITY_REVALIDATION = os.getenv("EPIC_IDENTITY_REVALIDATION", "never")
+
 # Création d'une session SQLAlchemy
 Session = sessionmaker(bind=engine)
 session = Session()
 
 
-def populate_departments():
-    """
-    Initialise la table Department avec les départements 'commercial', 'support' et 'gestion'
-    si ceux-ci n'existent pas déjà.
-    """
-    # Import local pour éviter les problèmes d'import circulaire
-    from models.department import Department
-
-    Session = sessionmaker(bind=engine)
-    with Session() as session:
-        # Ajout des départements par défaut
-        for name in ["commercial", "support", "gestion"]:
-            if not session.query(Department).filter_by(name=name).first():
-                session.add(Department(name=name))
-        session.commit()
-
-
-# Initialisation des départements si nécessaire
-populate_departments()
-
-session.commit()
-session.close()
-
-
-def hash_password(password: str) -> str:
+def hash_password(password: str, rounds: int = None) -> str:
     """
     Hash un mot de passe en utilisant bcrypt.
 
     Args:
         password (str): Mot de passe en clair.
+        rounds (int | None): Coût bcrypt (par défaut celui de la politique calibrée, voir
+            utils.password_policy).
 
     Returns:
         str: Mot de passe hashé.
     """
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds or get_rounds())).decode()
 
 
 def check_password(password: str, hashed: str) -> bool:
@@ -69,16 +53,23 @@ def check_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode(), hashed.encode())
 
 
-def login():
+def login(db_session=None):
     """
     Gère la procédure d'authentification de l'utilisateur.
     Demande l'email et le mot de passe, vérifie les identifiants,
     puis génère et stocke un token JWT en cas de succès.
+
+    Si le mot de passe a été hashé avec un autre coût que celui de la politique
+    courante, il est hashé à nouveau (le mot de passe en clair n'est connu qu'ici).
+
+    Args:
+        db_session (Session | None): session de test (sinon session du module)
     """
+    session_to_use = db_session if db_session is not None else session
     email = input("Email : ")
     password = getpass.getpass("Mot de passe : ")
 
-    user = session.query(User).filter_by(email=email).first()
+    user = session_to_use.query(User).filter_by(email=email).first()
     if not user:
         print("Utilisateur introuvable.")
         return
@@ -87,6 +78,10 @@ def login():
         print("Mot de passe incorrect.")
         return
 
+    if needs_rehash(user.password):
+        user.password = hash_password(password)
+        session_to_use.commit()
+
     # Création du payload du token JWT avec expiration
     payload = {
         "user_id": user.id,
@@ -100,19 +95,19 @@ def login():
     with open(TOKEN_FILE, "w") as f:
         f.write(token)
 
+    reset_identity()
     print("Authentification réussie.")
 
 
-def get_current_user():
+def read_token_payload():
     """
-    Récupère l'utilisateur courant en décodant le token JWT stocké localement.
+    Lit et décode le token JWT stocké localement.
 
     Returns:
-        User: Objet utilisateur correspondant au token.
+        dict: Claims signés du token (user_id, email, department, exp).
 
     Raises:
-        Exception: Si aucun token n'est trouvé, token invalide ou expiré,
-                   ou si l'utilisateur n'existe pas en base.
+        Exception: Si aucun token n'est trouvé, ou si le token est invalide ou expiré.
     """
     if not os.path.exists(TOKEN_FILE):
         raise Exception("Vous n'êtes pas connecté.")
@@ -127,10 +122,25 @@ def get_current_user():
     except jwt.InvalidTokenError:
         raise Exception("Jeton invalide. Veuillez vous reconnecter.")
 
-    user_id = payload.get("user_id")
-    if user_id is None:
+    if payload.get("user_id") is None:
         raise Exception("Jeton invalide : user_id manquant.")
 
+    return payload
+
+
+def get_current_user():
+    """
+    Récupère l'utilisateur courant en décodant le token JWT stocké localement.
+
+    Returns:
+        User: Objet utilisateur correspondant au token.
+
+    Raises:
+        Exception: Si aucun token n'est trouvé, token invalide ou expiré,
+                   ou si l'utilisateur n'existe pas en base.
+    """
+    user_id = read_token_payload()["user_id"]
+
     session = Session()
     try:
         # Chargement de l'utilisateur avec son département en une seule requête
@@ -142,16 +152,116 @@ def get_current_user():
         session.close()
 
 
+class Identity:
+    """
+    Identité de l'utilisateur connecté, construite à partir des claims signés du token JWT.
+
+    Elle est résolue une seule fois par commande puis transmise aux contrôleurs,
+    sans requête en base.
+
+    Attributs:
+        id (int): Identifiant de l'utilisateur.
+        email (str): Adresse email de l'utilisateur.
+        role (str): Nom du département (claim `department`).
+    """
+
+    def __init__(self, id, email, role):
+        self.id = id
+        self.email = email
+        self.role = role
+
+    def __repr__(self):
+        return f"<Identity(email={self.email}, role={self.role})>"
+
+
+# Identité de la commande en cours ; une ContextVar isole chaque commande (ou tâche asyncio)
+_current_identity = ContextVar("current_identity", default=None)
+
+
+def get_current_identity(revalidate=None):
+    """
+    Retourne l'identité de l'utilisateur connecté, résolue une seule fois par commande.
+
+    Le rôle est lu dans le claim signé `department` : aucune requête n'est faite,
+    sauf si la politique de revalidation est active.
+
+    Args:
+        revalidate (bool | None): Force (ou désactive) la revalidation en base.
+            Par défaut, suit la politique IDENTITY_REVALIDATION.
+
+    Returns:
+        Identity: Identité de l'utilisateur connecté.
+    """
+    identity = _current_identity.get()
+    if identity is not None:
+        return identity
+
+    payload = read_token_payload()
+    identity = Identity(payload["user_id"], payload.get("email"), payload.get("department"))
+
+    if revalidate is None:
+        revalidate = IDENTITY_REVALIDATION == "always"
+    if revalidate:
+        revalidate_identity(identity)
+
+    _current_identity.set(identity)
+    return identity
+
+
+def revalidate_identity(identity, db_session=None):
+    """
+    Vérifie en une requête que l'utilisateur du token existe toujours
+    et que son rôle n'a pas changé depuis l'émission du token.
+
+    Le rôle est toujours lu en base (une ligne par clé primaire) : une donnée
+    d'autorisation ne doit pas provenir d'un fichier local modifiable.
+
+    Args:
+        identity (Identity): Identité issue du token.
+        db_session (Session | None): Session à utiliser (sinon une session dédiée).
+
+    Raises:
+        Exception: Si l'utilisateur n'existe plus ou si son rôle a changé.
+    """
+    from models.department import Department
+
+    session_to_use = db_session if db_session is not None else Session()
+    try:
+        row = (
+            session_to_use.query(User.id, Department.name)
+            .join(Department, User.department_id == Department.id)
+            .filter(User.id == identity.id)
+            .first()
+        )
+    finally:
+        if db_session is None:
+            session_to_use.close()
+
+    if not row:
+        raise Exception("Utilisateur introuvable pour l'ID du token.")
+    if row.name != identity.role:
+        raise Exception("Votre rôle a changé. Veuillez vous reconnecter.")
+
+
+def reset_identity():
+    """
+    Oublie l'identité résolue pour la commande en cours (après une connexion, dans les tests...).
+    """
+    _current_identity.set(None)
+
+
 def get_user_role(user):
     """
     Récupère le rôle (nom du département) d'un utilisateur donné.
 
     Args:
-        user (User): Objet utilisateur.
+        user (User | Identity): Objet utilisateur ou identité issue du token.
 
     Returns:
         str or None: Nom du département de l'utilisateur, ou None si absent.
     """
+    if isinstance(user, Identity):
+        return user.role
     if user and user.department:
         return user.department.name
     return None
@@ -1,33 +1,67 @@
-from utils.auth import get_current_user
+import functools
+import inspect
+from utils.auth import get_current_identity, get_user_role
 
 
 def require_role(*allowed_roles):
     """
     Décorateur qui vérifie le rôle de l'utilisateur avant exécution.
     Lève une exception si l'accès est refusé.
+
+    L'identité est résolue une seule fois par commande (voir get_current_identity)
+    puis transmise au contrôleur via l'argument `current_user` s'il l'accepte.
     """
 
+    def authorize(kwargs):
+        # Récupère l'utilisateur courant (fourni par l'appelant ou issu du token)
+        current_user = kwargs.get('current_user') or get_current_identity()
+
+        if not current_user:
+            raise PermissionError("Utilisateur non authentifié")
+
+        # Vérifie si l'utilisateur a le département attendu
+        user_role = get_user_role(current_user)
+        if not user_role:
+            raise PermissionError("L'utilisateur n'a pas de département défini")
+
+        # Normalise les noms de rôles (enlève espaces et met en minuscule)
+        user_role = user_role.strip().lower()
+        allowed = {role.strip().lower() for role in allowed_roles}
+
+        if user_role not in allowed:
+            required_roles = " ou ".join(allowed_roles)
+            raise PermissionError(f"Accès refusé. Rôle(s) requis : {required_roles}")
+
+        return current_user
+
     def decorator(func):
-        def wrapper(*args, **kwargs):
-            try:
-                # Récupère l'utilisateur courant
-                current_user = kwargs.get('current_user') or get_current_user()
+        accepts_user = "current_user" in inspect.signature(func).parameters
 
-                if not current_user:
-                    raise PermissionError("Utilisateur non authentifié")
+        def prepare(kwargs):
+            current_user = authorize(kwargs)
+            if accepts_user:
+                kwargs['current_user'] = current_user
+            else:
+                kwargs.pop('current_user', None)
 
-                # Vérifie si l'utilisateur a le département attendu
-                if not hasattr(current_user, 'department') or not current_user.department:
-                    raise PermissionError("L'utilisateur n'a pas de département défini")
+        # Les contrôleurs asynchrones (async def) restent des coroutines une fois décorés
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    prepare(kwargs)
+                    return await func(*args, **kwargs)
 
-                # Normalise les noms de rôles (enlève espaces et met en minuscule)
-                user_role = current_user.department.name.strip().lower()
-                allowed = {role.strip().lower() for role in allowed_roles}
+                except Exception as e:
+                    print(f"Erreur d'autorisation : {str(e)}")
+                    raise  # Relance l'exception pour les tests
 
-                if user_role not in allowed:
-                    required_roles = " ou ".join(allowed_roles)
-                    raise PermissionError(f"Accès refusé. Rôle(s) requis : {required_roles}")
+            return async_wrapper
 
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                prepare(kwargs)
                 return func(*args, **kwargs)
 
             except Exception as e:
@@ -0,0 +1,63 @@
+import io
+from datetime import date, datetime
+
+
+def bulk_insert(connection, table, rows):
+    """
+    Insère un lot de lignes en une seule opération.
+
+    Sous PostgreSQL, les lignes sont envoyées avec COPY ... FROM STDIN ; ailleurs, un
+    INSERT exécuté en executemany. Les valeurs par défaut Python des colonnes ne sont pas
+    appliquées par COPY : chaque ligne doit fournir toutes les colonnes à renseigner.
+
+    Args:
+        connection (Connection): Connexion SQLAlchemy (par exemple session.connection()).
+        table (Table): Table cible (Model.__table__).
+        rows (list[dict]): Lignes à insérer, toutes avec les mêmes clés.
+
+    Returns:
+        int: Nombre de lignes insérées.
+    """
+    if not rows:
+        return 0
+
+    if connection.dialect.name == "postgresql":
+        _copy_rows(connection, table, rows)
+    else:
+        connection.execute(table.insert(), rows)
+    return len(rows)
+
+
+def _copy_value(value):
+    """
+    Formate une valeur pour COPY au format CSV : champ vide non quoté pour NULL,
+    chaînes toujours quotées (une chaîne vide reste donc une chaîne vide).
+    """
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_rows(connection, table, rows):
+    """
+    Envoie les lignes à PostgreSQL via COPY ... FROM STDIN (psycopg2).
+    """
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(_copy_value(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    column_list = ", ".join(columns)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
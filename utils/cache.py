@@ -0,0 +1,162 @@
+import functools
+import inspect
+import os
+import threading
+from collections import OrderedDict
+
+from utils.auth import _current_identity, get_user_role
+
+# Nombre maximum de résultats gardés en mémoire (0 désactive le cache)
+CACHE_SIZE = int(os.getenv("EPIC_CACHE_SIZE", "256"))
+
+# Version de chaque table, incrémentée par les contrôleurs d'écriture (invalidates)
+_table_versions = {}
+_versions_lock = threading.Lock()
+
+
+def table_versions(tables):
+    """
+    Versions courantes des tables, dans l'ordre demandé.
+    """
+    return tuple(_table_versions.get(table, 0) for table in tables)
+
+
+def bump_tables(*tables):
+    """
+    Incrémente la version des tables : les résultats en cache qui en dépendent ne sont plus servis.
+    """
+    with _versions_lock:
+        for table in tables:
+            _table_versions[table] = _table_versions.get(table, 0) + 1
+
+
+class ResultCache:
+    """
+    Cache LRU borné des résultats des contrôleurs de liste.
+
+    Les clés contiennent les versions des tables lues : après une écriture, les anciennes
+    entrées ne sont plus jamais demandées et sortent du cache au fil des évictions.
+
+    Args:
+        maxsize (int): Nombre maximum d'entrées (0 désactive le cache).
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Retourne (True, valeur) si la clé est en cache, (False, None) sinon.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        """
+        Statistiques du cache : {"hits", "misses", "size", "maxsize"}.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+
+result_cache = ResultCache()
+
+
+def _caller(kwargs):
+    """
+    (rôle, ID) de l'utilisateur pour lequel le résultat est calculé.
+    """
+    user = kwargs.get("current_user") or _current_identity.get()
+    if user is None:
+        return None, None
+    return get_user_role(user), user.id
+
+
+def cached(*tables):
+    """
+    Met en cache le résultat d'un contrôleur de liste qui lit les tables indiquées.
+
+    La clé comprend la fonction, ses arguments, le rôle et l'ID de l'utilisateur connecté,
+    et la version des tables. Un appel avec une session explicite (db_session) n'utilise
+    pas le cache, ni un appel dont les arguments ne sont pas hachables.
+
+    Le résultat retourné est partagé entre les appels : il ne doit pas être modifié.
+
+    Args:
+        *tables (str): Tables lues par le contrôleur.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if result_cache.maxsize <= 0 or kwargs.get("db_session") is not None:
+                return func(*args, **kwargs)
+            arguments = {k: v for k, v in kwargs.items() if k != "current_user"}
+            key = (name, args, tuple(sorted(arguments.items())), _caller(kwargs), table_versions(tables))
+            try:
+                found, value = result_cache.get(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            if found:
+                return value
+            value = func(*args, **kwargs)
+            result_cache.put(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*tables):
+    """
+    Déclare un contrôleur d'écriture : la version des tables indiquées est incrémentée
+    après chaque appel (même en cas d'erreur, l'écriture ayant pu être partielle).
+
+    Args:
+        *tables (str): Tables modifiées par le contrôleur.
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    bump_tables(*tables)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                bump_tables(*tables)
+
+        return wrapper
+
+    return decorator
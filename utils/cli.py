@@ -0,0 +1,113 @@
+import importlib
+import click
+from utils.settings import load_env
+
+
+class LazyGroup(click.Group):
+    """
+    Groupe Click dont les sous-commandes ne sont importées qu'au moment où elles sont invoquées.
+
+    Chaque sous-commande paresseuse est décrite par un chemin d'import "module:attribut"
+    et une aide courte, utilisée par `--help` sans importer le module (et donc sans charger
+    SQLAlchemy, bcrypt, jwt...).
+    """
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # {nom: ("module:attribut", "aide courte")}
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return self._load_command(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        """
+        Affiche la liste des commandes en utilisant l'aide déclarée pour les commandes
+        paresseuses, sans les importer.
+        """
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.lazy_subcommands:
+                rows.append((name, self.lazy_subcommands[name][1]))
+                continue
+            cmd = super().get_command(ctx, name)
+            if cmd is None or cmd.hidden:
+                continue
+            rows.append((name, cmd.get_short_help_str(formatter.width)))
+
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+    def _load_command(self, cmd_name):
+        """
+        Importe le module de la sous-commande et retourne l'objet Click correspondant.
+
+        Raises:
+            ValueError: Si l'attribut importé n'est pas une commande Click.
+        """
+        # Les modules importés lisent l'environnement (mot de passe BDD, clé JWT...)
+        load_env()
+
+        import_path = self.lazy_subcommands[cmd_name][0]
+        module_name, attr_name = import_path.split(":", 1)
+        cmd = getattr(importlib.import_module(module_name), attr_name)
+        if not isinstance(cmd, click.Command):
+            raise ValueError(f"{import_path} n'est pas une commande Click.")
+        return cmd
+
+
+def echo_stream(rows, format_line, empty_message):
+    """
+    Affiche les lignes au fur et à mesure qu'elles arrivent d'un parcours en flux.
+
+    Args:
+        rows (Iterable[dict]): Lignes produites par un contrôleur iter_*.
+        format_line (Callable[[dict], str]): Formatage d'une ligne.
+        empty_message (str): Message affiché si aucune ligne n'est produite.
+
+    Returns:
+        int: Nombre de lignes affichées.
+    """
+    count = 0
+    for row in rows:
+        click.echo(format_line(row))
+        count += 1
+    if not count:
+        click.echo(empty_message)
+    return count
+
+
+def parse_ids(text, limit=None):
+    """
+    Lit une liste d'IDs : séparés par des virgules, espaces ou retours à la ligne,
+    avec des plages ("1,2,10-20").
+
+    Args:
+        text (str): Liste saisie ou contenu d'un fichier.
+        limit (int | None): Nombre maximum d'IDs (vérifié avant d'étendre une plage).
+
+    Returns:
+        list[int]: IDs dans l'ordre, sans doublons.
+
+    Raises:
+        click.BadParameter: Si un élément n'est ni un entier positif ni une plage valide,
+            ou si la liste dépasse `limit` IDs.
+    """
+    ids = []
+    for item in text.replace(",", " ").split():
+        start, _, end = item.partition("-")
+        if not start.isdigit() or (end and not end.isdigit()):
+            raise click.BadParameter(f"ID ou plage invalide : {item!r}.")
+        if end and int(end) < int(start):
+            raise click.BadParameter(f"Plage invalide : {item!r}.")
+        first, last = int(start), int(end or start)
+        if limit is not None and len(ids) + last - first + 1 > limit:
+            raise click.BadParameter(f"Trop d'IDs : {limit} au maximum par commande.")
+        ids.extend(range(first, last + 1))
+    return list(dict.fromkeys(ids))
@@ -1,6 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 import os
-from models.base import Base
+from utils.schema import check_schema_version
 
 # Informations de connexion à la base de données
 db_user = "crm"  # Nom d'utilisateur pour la base de données
@@ -11,17 +11,15 @@ db_port = "5432"  # Port utilisé par PostgreSQL par défaut
 db_name = "epic_crm"  # Nom de la base de données
 
 # Construction de l'URL de connexion pour SQLAlchemy avec PostgreSQL et psycopg2
-db_url = f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+# (EPIC_DB_URL permet de pointer vers une autre base, par exemple SQLite pour les benchmarks)
+db_url = os.getenv("EPIC_DB_URL") or (
+    f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+)
 
-# Création de l'objet engine SQLAlchemy qui gère la connexion à la base de données
+# Création de l'objet engine SQLAlchemy qui gère la connexion à la base de données.
+# Aucune connexion n'est ouverte ici : elle l'est au premier usage réel.
 engine = create_engine(db_url)
 
-try:
-    # Connexion à la base pour tester la connexion
-    conn = engine.connect()
-
-    # Création des tables en base définies dans les classes héritant de Base (ORM)
-    Base.metadata.create_all(bind=engine)
-except Exception as ex:
-    # Affiche l'erreur si la connexion ou la création des tables échoue
-    print(ex)
+# À la première connexion du processus, une seule requête vérifie la version du schéma
+# (à la place de la réflexion complète faite auparavant par create_all à chaque appel)
+event.listen(engine, "first_connect", check_schema_version)
@@ -0,0 +1,126 @@
+import csv
+import json
+import os
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+
+
+def detect_format(path, fmt=None):
+    """
+    Détermine le format d'un fichier d'import à partir de son extension.
+
+    Args:
+        path (str): Chemin du fichier.
+        fmt (str | None): Format imposé ("csv" ou "jsonl").
+
+    Returns:
+        str: "csv" ou "jsonl".
+
+    Raises:
+        Exception: Si le format n'est pas pris en charge.
+    """
+    if fmt is None:
+        ext = os.path.splitext(path)[1].lower().lstrip(".")
+        fmt = "jsonl" if ext in ("jsonl", "ndjson") else ext
+    if fmt not in SUPPORTED_FORMATS:
+        raise Exception(f"Format de fichier non pris en charge : {fmt} (csv ou jsonl attendu).")
+    return fmt
+
+
+def iter_records(path, fmt=None):
+    """
+    Lit un fichier CSV (avec en-tête) ou JSONL ligne par ligne, sans le charger en mémoire.
+
+    Args:
+        path (str): Chemin du fichier.
+        fmt (str | None): Format imposé ("csv" ou "jsonl").
+
+    Yields:
+        tuple[int, dict | None, str | None]: Numéro de ligne (en CSV, dernière ligne de
+        l'enregistrement), enregistrement lu (ou None) et message d'erreur de lecture (ou None).
+    """
+    fmt = detect_format(path, fmt)
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            # Numéro de la dernière ligne lue de l'enregistrement : juste même si un champ
+            # entre guillemets s'étend sur plusieurs lignes
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record, None
+            return
+
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, None, f"JSON invalide : {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Objet JSON attendu."
+                continue
+            yield line_number, record, None
+
+
+def batched(iterable, size):
+    """
+    Regroupe les éléments d'un itérable en listes d'au plus `size` éléments.
+
+    Args:
+        iterable (Iterable): Éléments à regrouper.
+        size (int): Taille maximale d'un lot.
+
+    Yields:
+        list: Lot d'éléments.
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class RejectWriter:
+    """
+    Écrit les lignes rejetées lors d'un import dans un fichier CSV,
+    avec leur numéro de ligne et le motif du rejet.
+
+    Le fichier n'est créé qu'au premier rejet.
+    """
+
+    def __init__(self, path, fields):
+        self.path = path
+        self.fields = ["line", *fields, "error"]
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, line_number, record, error):
+        """
+        Enregistre une ligne rejetée.
+
+        Args:
+            line_number (int): Numéro de la ligne dans le fichier source.
+            record (dict | None): Enregistrement lu (None si illisible).
+            error (str): Motif du rejet.
+        """
+        if self._writer is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fields, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow({**(record or {}), "line": line_number, "error": error})
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,153 @@
+class _Node:
+    __slots__ = ("start", "end", "value", "max_end", "height", "left", "right")
+
+    def __init__(self, start, end, value):
+        self.start = start
+        self.end = end
+        self.value = value
+        self.max_end = end
+        self.height = 1
+        self.left = None
+        self.right = None
+
+
+def _height(node):
+    return node.height if node else 0
+
+
+def _update(node):
+    node.height = 1 + max(_height(node.left), _height(node.right))
+    node.max_end = node.end
+    if node.left and node.left.max_end > node.max_end:
+        node.max_end = node.left.max_end
+    if node.right and node.right.max_end > node.max_end:
+        node.max_end = node.right.max_end
+
+
+def _rotate_right(node):
+    pivot = node.left
+    node.left, pivot.right = pivot.right, node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+
+def _rotate_left(node):
+    pivot = node.right
+    node.right, pivot.left = pivot.left, node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+
+def _rebalance(node):
+    _update(node)
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+
+class IntervalTree:
+    """
+    Arbre d'intervalles semi-ouverts [start, end) : arbre AVL trié sur le début,
+    dont chaque nœud connaît la plus grande fin de son sous-arbre.
+
+    Insertion en O(log n) ; recherche des k intervalles chevauchant une période
+    en O(log n + k). Deux intervalles qui se touchent (fin de l'un = début de
+    l'autre) ne se chevauchent pas.
+
+    Args:
+        intervals (iterable | None): Triplets (start, end, value) insérés à la création.
+    """
+
+    def __init__(self, intervals=None):
+        self._root = None
+        self._size = 0
+        for start, end, value in intervals or ():
+            self.insert(start, end, value)
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, start, end, value=None):
+        """
+        Ajoute l'intervalle [start, end) associé à `value`.
+        """
+        self._root = self._insert(self._root, _Node(start, end, value))
+        self._size += 1
+
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if (new.start, new.end) < (node.start, node.end):
+            node.left = self._insert(node.left, new)
+        else:
+            node.right = self._insert(node.right, new)
+        return _rebalance(node)
+
+    def overlapping(self, start, end):
+        """
+        Retourne les intervalles qui chevauchent [start, end), triés par début.
+
+        Returns:
+            list[tuple]: Triplets (start, end, value).
+        """
+        found = []
+        stack, node = [], self._root
+        # Parcours infixe élagué : un sous-arbre dont la plus grande fin est <= start
+        # ne contient aucun chevauchement ; à droite d'un nœud commençant à >= end non plus.
+        while stack or node is not None:
+            while node is not None and node.max_end > start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if node.start >= end:
+                break
+            if node.end > start:
+                found.append((node.start, node.end, node.value))
+            node = node.right
+        return found
+
+    def overlaps(self, start, end):
+        """
+        Indique si au moins un intervalle chevauche [start, end).
+        """
+        node = self._root
+        while node is not None:
+            if node.start < end and node.end > start:
+                return True
+            # Tout chevauchement à gauche a une fin > start ; sinon seul le sous-arbre droit peut convenir
+            if node.left is not None and node.left.max_end > start:
+                node = node.left
+            elif node.start < end:
+                node = node.right
+            else:
+                return False
+        return False
+
+
+def find_overlaps(intervals):
+    """
+    Liste les paires d'intervalles qui se chevauchent, en O(n log n + k).
+
+    Args:
+        intervals (iterable): Triplets (start, end, value).
+
+    Returns:
+        list[tuple]: Paires (value, value) : la première commence au plus tard avec la seconde.
+    """
+    tree = IntervalTree()
+    pairs = []
+    for start, end, value in sorted(intervals, key=lambda interval: (interval[0], interval[1])):
+        pairs.extend((other, value) for _, _, other in tree.overlapping(start, end))
+        tree.insert(start, end, value)
+    return pairs
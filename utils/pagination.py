@@ -0,0 +1,47 @@
+# Nombre de lignes lues par lot lors des parcours en flux (yield_per)
+STREAM_BATCH_SIZE = 1000
+
+# Nombre de lignes affichées par page dans les sélecteurs interactifs (utils.picker)
+PICKER_PAGE_SIZE = 20
+
+
+def keyset_paginate(query, key_column, limit=None, after=None):
+    """
+    Applique une pagination par clé (keyset) à une requête SQLAlchemy.
+
+    Contrairement à OFFSET, la page est lue directement à partir de l'index de la
+    colonne clé : le coût d'une page ne dépend pas de sa position dans la table.
+
+    Args:
+        query (Query): Requête à paginer.
+        key_column: Colonne unique et indexée servant de clé de tri (clé primaire par défaut).
+        limit (int | None): Nombre maximum de lignes à retourner (None = toutes).
+        after: Valeur de clé de la dernière ligne de la page précédente (None = début).
+
+    Returns:
+        Query: Requête triée sur la clé, filtrée et limitée.
+    """
+    if after is not None:
+        query = query.filter(key_column > after)
+    query = query.order_by(key_column)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def next_page_hint(rows, limit, key="id"):
+    """
+    Construit l'indication à afficher pour obtenir la page suivante.
+
+    Args:
+        rows (dict): Lignes retournées par un contrôleur list_*.
+        limit (int | None): Taille de page demandée.
+        key (str): Champ servant de curseur.
+
+    Returns:
+        str | None: Message à afficher, ou None s'il n'y a pas de page suivante.
+    """
+    if not limit or len(rows) < limit:
+        return None
+    last = list(rows.values())[-1]
+    return f"Page suivante : --after {last[key]}"
@@ -0,0 +1,155 @@
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+
+import bcrypt
+
+# Politique de hash des mots de passe, propre à la machine (à côté du token de session)
+POLICY_FILE = os.getenv("EPIC_PASSWORD_POLICY", "../.epic_password_policy.json")
+
+# Coût bcrypt utilisé sans calibration (défaut de la bibliothèque)
+DEFAULT_ROUNDS = 12
+# Bornes de la calibration : en dessous de 10, le hash devient trop rapide à attaquer
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+# Durée cible d'un hash (et donc d'une connexion), en millisecondes
+DEFAULT_TARGET_MS = 250
+
+_policy = None
+
+
+def load_policy():
+    """
+    Retourne la politique de hash de la machine (lue une seule fois par processus).
+
+    Returns:
+        dict: Politique ({"rounds", "target_ms", "measured_ms", "calibrated_at", "host"}) ;
+            {"rounds": DEFAULT_ROUNDS} si aucune calibration n'a été faite.
+    """
+    global _policy
+    if _policy is None:
+        _policy = {"rounds": DEFAULT_ROUNDS}
+        try:
+            with open(POLICY_FILE, encoding="utf-8") as f:
+                stored = json.load(f)
+            if MIN_ROUNDS <= int(stored.get("rounds", 0)) <= MAX_ROUNDS:
+                _policy = stored
+        except (OSError, ValueError, TypeError):
+            pass
+    return _policy
+
+
+def save_policy(policy):
+    """
+    Enregistre la politique de hash et la rend active pour le processus courant.
+
+    Args:
+        policy (dict): Politique retournée par calibrate.
+
+    Raises:
+        Exception: Si le coût sort des bornes MIN_ROUNDS..MAX_ROUNDS (load_policy l'ignorerait).
+    """
+    global _policy
+    if not MIN_ROUNDS <= int(policy["rounds"]) <= MAX_ROUNDS:
+        raise Exception(f"Coût bcrypt {policy['rounds']} hors des bornes {MIN_ROUNDS}..{MAX_ROUNDS}.")
+    with open(POLICY_FILE, "w", encoding="utf-8") as f:
+        json.dump(policy, f, indent=2)
+    _policy = policy
+
+
+def get_rounds():
+    """
+    Returns:
+        int: Coût bcrypt à utiliser pour les nouveaux hashs.
+    """
+    return int(load_policy()["rounds"])
+
+
+def hash_rounds(hashed):
+    """
+    Lit le coût d'un hash bcrypt ("$2b$12$...").
+
+    Args:
+        hashed (str): Mot de passe hashé.
+
+    Returns:
+        int | None: Coût du hash, None si le hash n'est pas au format bcrypt.
+    """
+    parts = hashed.split("$")
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed):
+    """
+    Indique si un hash a été calculé avec un autre coût que celui de la politique.
+
+    Args:
+        hashed (str): Mot de passe hashé stocké.
+
+    Returns:
+        bool: True si le mot de passe doit être hashé à nouveau.
+    """
+    return hash_rounds(hashed) != get_rounds()
+
+
+def measure_hash_time(rounds, samples=3):
+    """
+    Mesure la durée médiane d'un hash bcrypt au coût donné sur cette machine.
+
+    Args:
+        rounds (int): Coût bcrypt.
+        samples (int): Nombre de mesures.
+
+    Returns:
+        float: Durée médiane en millisecondes.
+    """
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds))
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def calibrate(target_ms=DEFAULT_TARGET_MS, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS, samples=3,
+              measure=measure_hash_time):
+    """
+    Choisit le coût bcrypt le plus élevé dont le hash tient dans la durée cible.
+
+    Chaque incrément du coût double la durée du hash : les coûts sont mesurés par
+    ordre croissant et la mesure s'arrête au premier qui dépasse la cible.
+    Si même `min_rounds` dépasse la cible, `min_rounds` est retenu (plancher de sécurité).
+
+    Args:
+        target_ms (float): Durée cible d'un hash, en millisecondes.
+        min_rounds (int): Coût minimal accepté.
+        max_rounds (int): Coût maximal essayé.
+        samples (int): Nombre de mesures par coût.
+        measure (callable): Fonction de mesure (rounds, samples) -> millisecondes.
+
+    Returns:
+        dict: Politique à enregistrer avec save_policy.
+    """
+    rounds, measured = min_rounds, None
+    for candidate in range(min_rounds, max_rounds + 1):
+        duration = measure(candidate, samples)
+        if duration > target_ms and measured is not None:
+            break
+        rounds, measured = candidate, duration
+        if duration > target_ms:
+            break
+
+    return {
+        "rounds": rounds,
+        "target_ms": target_ms,
+        "measured_ms": round(measured, 1),
+        "calibrated_at": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+    }
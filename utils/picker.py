@@ -0,0 +1,55 @@
+import click
+
+from utils.pagination import PICKER_PAGE_SIZE
+
+
+def pick(fetch, format_line, label, search=None, page_size=PICKER_PAGE_SIZE):
+    """
+    Sélection interactive d'une ligne, filtrée et paginée côté serveur.
+
+    Seule la page affichée est lue : `fetch` est appelé avec la taille de page + 1
+    (pour savoir s'il existe une page suivante) et l'ID de la dernière ligne affichée.
+    L'utilisateur saisit un ID affiché, Entrée pour la page suivante, `/texte` pour
+    changer de filtre ou `q` pour annuler.
+
+    Args:
+        fetch (Callable): fetch(search, limit, after) -> dict {id: ligne}, trié par ID.
+        format_line (Callable[[dict], str]): Formatage d'une ligne.
+        label (str): Nature des lignes, au pluriel ("clients", "contrats signés"...).
+        search (str | None): Filtre initial (demandé si absent).
+        page_size (int): Nombre de lignes par page.
+
+    Returns:
+        tuple | None: (id, ligne) choisie, ou None si la sélection est annulée.
+    """
+    if search is None:
+        search = click.prompt(f"Filtrer les {label} (vide pour tout afficher)",
+                              default="", show_default=False)
+    after = None
+    while True:
+        rows = fetch(search.strip() or None, page_size + 1, after)
+        page = dict(list(rows.items())[:page_size])
+        more = len(rows) > page_size
+        if page:
+            click.echo("\n".join(format_line(row) for row in page.values()))
+        else:
+            click.echo(f"Aucun résultat parmi les {label}.")
+
+        actions = "Entrée : page suivante, " if more else ""
+        while True:
+            choice = click.prompt(f"\nID ({actions}/texte : nouveau filtre, q : annuler)",
+                                  default="", show_default=False).strip()
+            if choice.lower() == "q":
+                return None
+            if choice.startswith("/"):
+                search, after = choice[1:], None
+                break
+            if not choice:
+                if more:
+                    after = list(page)[-1]
+                    break
+                click.echo("Pas d'autre page.")
+                continue
+            if choice.isdigit() and int(choice) in page:
+                return int(choice), page[int(choice)]
+            click.echo("Choisissez un ID affiché.")
@@ -0,0 +1,165 @@
+import math
+import time
+from sqlalchemy import event
+
+# Longueur maximale d'une requête affichée dans le rapport
+STATEMENT_PREVIEW = 100
+
+
+def percentile(values, pct):
+    """
+    Calcule un percentile par la méthode du rang le plus proche.
+
+    Args:
+        values (list[float]): Valeurs mesurées.
+        pct (float): Percentile voulu (entre 0 et 100).
+
+    Returns:
+        float: Valeur du percentile (0.0 si la liste est vide).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class SQLProfiler:
+    """
+    Mesure les requêtes SQL émises par un moteur SQLAlchemy : nombre, durée et lignes.
+
+    Les durées sont prises autour de l'exécution par le pilote (événements
+    before/after_cursor_execute). Les lignes lues sont comptées au fil des fetch
+    (le curseur du pilote est enveloppé), les lignes modifiées à partir de `rowcount`.
+    """
+
+    def __init__(self, top=5):
+        self.top = top
+        self.durations = []
+        self.rows = 0
+        self.rows_written = 0
+        # {requête: [nombre d'exécutions, durée totale, durée maximale]}
+        self.statements = {}
+        self._engines = []
+
+    def install(self, engine):
+        """
+        Branche le profileur sur un moteur.
+
+        Args:
+            engine (Engine): Moteur SQLAlchemy à observer.
+        """
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        self._engines.append(engine)
+
+    def uninstall(self):
+        """
+        Débranche le profileur de tous les moteurs observés.
+        """
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        self._engines = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_sql_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["profile_sql_start"].pop()
+        self.durations.append(elapsed)
+
+        stats = self.statements.setdefault(statement, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+
+        if cursor.description is not None:
+            # Requête qui retourne des lignes : elles seront comptées à la lecture
+            if context is not None:
+                context.cursor = _CountingCursor(cursor, self)
+        elif cursor.rowcount is not None and cursor.rowcount >= 0:
+            self.rows_written += cursor.rowcount
+
+    def report(self):
+        """
+        Construit le rapport affiché en fin de commande.
+
+        Returns:
+            str: Nombre de requêtes, durée totale et p95, lignes et requêtes les plus coûteuses.
+        """
+        total_ms = sum(self.durations) * 1000
+        p95_ms = percentile(self.durations, 95) * 1000
+        lines = [
+            f"Profil SQL : {len(self.durations)} requête(s), {total_ms:.1f} ms au total, "
+            f"p95 {p95_ms:.1f} ms, {self.rows} ligne(s) lue(s), {self.rows_written} ligne(s) modifiée(s)"
+        ]
+        slowest = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:self.top]
+        if slowest:
+            lines.append("Requêtes les plus coûteuses (exécutions, total, max) :")
+        for statement, (count, total, longest) in slowest:
+            preview = " ".join(statement.split())
+            if len(preview) > STATEMENT_PREVIEW:
+                preview = preview[:STATEMENT_PREVIEW - 3] + "..."
+            lines.append(f"  x{count:<5} {total * 1000:8.1f} ms {longest * 1000:8.1f} ms  {preview}")
+        return "\n".join(lines)
+
+
+class _CountingCursor:
+    """
+    Enveloppe d'un curseur DBAPI qui compte les lignes lues par SQLAlchemy.
+    """
+
+    def __init__(self, cursor, profiler):
+        self._cursor = cursor
+        self._profiler = profiler
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._profiler.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._profiler.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._profiler.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def enable_sql_profiling(ctx):
+    """
+    Active le profilage SQL pour la commande en cours (option globale --profile-sql).
+
+    Le profileur est branché sur le moteur de utils.connection, partagé par tous les
+    contrôleurs ; le rapport est écrit sur la sortie d'erreur à la fin de la commande,
+    pour ne pas se mêler à la sortie (export, listes redirigées).
+
+    Args:
+        ctx (click.Context): Contexte de la commande racine.
+
+    Returns:
+        SQLProfiler: Profileur installé.
+    """
+    import click
+    from utils.settings import load_env
+
+    load_env()
+    from utils.connection import engine
+
+    profiler = SQLProfiler()
+    profiler.install(engine)
+
+    def report():
+        profiler.uninstall()
+        click.echo(profiler.report(), err=True)
+
+    ctx.call_on_close(report)
+    return profiler
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+from sqlalchemy import text
+
+# Cache disque des données de référence, partagé par les invocations de la CLI (à côté du token de session)
+CACHE_FILE = os.getenv("EPIC_REFERENCE_CACHE", "../.epic_reference_cache.db")
+
+REFERENCE_VERSION_QUERY = text("SELECT reference_version FROM schema_info WHERE id = 1")
+BUMP_REFERENCE_VERSION = text("UPDATE schema_info SET reference_version = reference_version + 1 WHERE id = 1")
+
+
+def reference_version(session):
+    """
+    Version des données de référence (départements, utilisateurs) enregistrée en base.
+
+    Une seule petite requête sur la table schema_info (une ligne).
+
+    Args:
+        session (Session): Session SQLAlchemy.
+
+    Returns:
+        int | None: Version courante, ou None si la base ne la fournit pas (non initialisée).
+    """
+    return session.execute(REFERENCE_VERSION_QUERY).scalar()
+
+
+def bump_reference_version(session):
+    """
+    Incrémente la version des données de référence, dans la transaction de l'écriture
+    (validée ensuite par l'appelant) : les entrées du cache disque deviennent obsolètes.
+
+    Args:
+        session (Session | Connection): Session ou connexion de l'écriture.
+    """
+    session.execute(BUMP_REFERENCE_VERSION)
+
+
+async def bump_reference_version_async(session):
+    """
+    Variante de bump_reference_version pour une AsyncSession.
+    """
+    await session.execute(BUMP_REFERENCE_VERSION)
+
+
+def database_key(session):
+    """
+    Identifie la base (URL sans mot de passe) : le cache peut servir plusieurs bases.
+    """
+    return hashlib.sha1(str(session.get_bind().url).encode()).hexdigest()
+
+
+class ReferenceCache:
+    """
+    Cache disque clé -> valeur JSON, stocké dans un fichier SQLite.
+
+    Chaque entrée porte la version des données de référence avec laquelle elle a été lue ;
+    une entrée d'une autre version est ignorée. Le cache ne doit jamais empêcher une commande
+    de fonctionner : toute erreur d'accès au fichier revient à une absence d'entrée.
+
+    Args:
+        path (str | None): Fichier du cache (CACHE_FILE par défaut, lu à l'ouverture).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path or CACHE_FILE, timeout=1)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "database TEXT NOT NULL, key TEXT NOT NULL, version INTEGER NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (database, key))"
+        )
+        return connection
+
+    def get(self, database, key, version):
+        """
+        Retourne (True, valeur) si l'entrée existe pour cette version, (False, None) sinon.
+        """
+        try:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    "SELECT value FROM entries WHERE database = ? AND key = ? AND version = ?",
+                    (database, key, version),
+                ).fetchone()
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return False, None
+        if row is None:
+            return False, None
+        return True, json.loads(row[0])
+
+    def put(self, database, key, version, value):
+        """
+        Enregistre une valeur (sérialisable en JSON) pour cette version.
+        """
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO entries (database, key, version, value) VALUES (?, ?, ?, ?)",
+                        (database, key, version, json.dumps(value)),
+                    )
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            pass
+
+
+reference_cache = ReferenceCache()
+
+
+def cached_reference(session, key, load):
+    """
+    Lit une donnée de référence dans le cache disque, ou la charge puis l'enregistre.
+
+    La validité est vérifiée par la version des données de référence en base ; sans
+    version (base non initialisée), la donnée est chargée sans passer par le cache.
+
+    Args:
+        session (Session): Session SQLAlchemy de la base interrogée.
+        key (str): Nom de la donnée ("departments", "support_users"...).
+        load (Callable[[], object]): Chargement depuis la base, résultat sérialisable en JSON.
+
+    Returns:
+        object: Valeur en cache ou chargée.
+    """
+    version = reference_version(session)
+    if version is None:
+        return load()
+    database = database_key(session)
+    found, value = reference_cache.get(database, key, version)
+    if found:
+        return value
+    value = load()
+    reference_cache.put(database, key, version, value)
+    return value
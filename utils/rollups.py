@@ -0,0 +1,196 @@
+from sqlalchemy import delete, func, literal, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models.contract import Contract
+from models.event import Event
+from models.rollup import MonthlyRollup, SalesContactRollup
+
+# Indicateurs communs aux deux tables d'agrégats
+ROLLUP_METRICS = ("contracts", "amount_total", "amount_remaining", "events")
+
+# Insertion avec ON CONFLICT DO UPDATE, selon le dialecte
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def month_of(column, dialect_name):
+    """
+    Expression SQL du mois ("AAAA-MM") d'une colonne date, selon le dialecte.
+
+    Args:
+        column: Colonne DateTime.
+        dialect_name (str): Nom du dialecte SQLAlchemy ("postgresql", "sqlite"...).
+
+    Returns:
+        ColumnElement: Expression texte du mois.
+    """
+    if dialect_name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+def month_key(value):
+    """
+    Mois ("AAAA-MM") d'une date, identique à month_of côté base.
+    """
+    return value.strftime("%Y-%m")
+
+
+def contract_changes(contract, sign=1):
+    """
+    Variations des agrégats dues à l'ajout (sign=1) ou au retrait (sign=-1) d'un contrat.
+
+    Les valeurs sont lues immédiatement : appeler avec sign=-1 avant de modifier ou de
+    supprimer le contrat, avec sign=1 après l'avoir créé (flush) ou modifié.
+
+    Args:
+        contract (Contract): Contrat concerné.
+        sign (int): 1 pour un ajout, -1 pour un retrait.
+
+    Returns:
+        list[tuple]: (table d'agrégats, clé, {indicateur: variation}).
+    """
+    deltas = {
+        "contracts": sign,
+        "amount_total": sign * contract.amount_total,
+        "amount_remaining": sign * contract.amount_remaining,
+    }
+    return [
+        (SalesContactRollup, contract.sales_contact_id, deltas),
+        (MonthlyRollup, month_key(contract.created_date), deltas),
+    ]
+
+
+def event_changes(sales_contact_id, date_start, sign=1):
+    """
+    Variations des agrégats dues à l'ajout (sign=1) ou au retrait (sign=-1) d'un événement.
+
+    Args:
+        sales_contact_id (int): Commercial du contrat de l'événement.
+        date_start (datetime): Début de l'événement.
+        sign (int): 1 pour un ajout, -1 pour un retrait.
+
+    Returns:
+        list[tuple]: (table d'agrégats, clé, {indicateur: variation}).
+    """
+    return [
+        (SalesContactRollup, sales_contact_id, {"events": sign}),
+        (MonthlyRollup, month_key(date_start), {"events": sign}),
+    ]
+
+
+def rollup_statements(changes, dialect_name):
+    """
+    Construit les UPSERT appliquant des variations aux tables d'agrégats.
+
+    Les variations portant sur une même ligne sont d'abord cumulées ; les lignes dont
+    toutes les variations s'annulent ne donnent lieu à aucune requête.
+
+    Args:
+        changes (list[tuple]): Variations retournées par contract_changes / event_changes.
+        dialect_name (str): Dialecte de la base ("postgresql" ou "sqlite").
+
+    Returns:
+        list: Requêtes à exécuter dans la transaction de l'écriture.
+
+    Raises:
+        Exception: Si le dialecte ne permet pas d'UPSERT.
+    """
+    insert = UPSERT_INSERTS.get(dialect_name)
+    if insert is None:
+        raise Exception(f"Agrégats non pris en charge pour la base {dialect_name}.")
+
+    merged = {}
+    for model, key, deltas in changes:
+        row = merged.setdefault((model, key), dict.fromkeys(ROLLUP_METRICS, 0))
+        for metric, value in deltas.items():
+            row[metric] += value
+
+    statements = []
+    for (model, key), deltas in merged.items():
+        deltas = {metric: value for metric, value in deltas.items() if value}
+        if not deltas:
+            continue
+        table = model.__table__
+        key_column = table.primary_key.columns.values()[0]
+        stmt = insert(table).values({key_column.name: key, **dict.fromkeys(ROLLUP_METRICS, 0), **deltas})
+        statements.append(stmt.on_conflict_do_update(
+            index_elements=[key_column],
+            set_={metric: table.c[metric] + stmt.excluded[metric] for metric in deltas},
+        ))
+    return statements
+
+
+def apply_rollups(session, changes):
+    """
+    Applique des variations aux agrégats dans la transaction en cours de la session.
+
+    Args:
+        session (Session): Session de l'écriture (validée ensuite par l'appelant).
+        changes (list[tuple]): Variations retournées par contract_changes / event_changes.
+    """
+    for stmt in rollup_statements(changes, session.get_bind().dialect.name):
+        session.execute(stmt)
+
+
+async def apply_rollups_async(session, changes):
+    """
+    Variante de apply_rollups pour une AsyncSession.
+    """
+    for stmt in rollup_statements(changes, session.get_bind().dialect.name):
+        await session.execute(stmt)
+
+
+def rebuild_rollups(connection):
+    """
+    Recalcule entièrement les tables d'agrégats depuis les contrats et les événements.
+
+    Chaque table est vidée puis remplie par un seul INSERT ... SELECT : contrats et
+    événements sont réunis (UNION ALL) puis agrégés par commercial ou par mois.
+
+    Args:
+        connection (Connection): Connexion SQLAlchemy (transaction validée par l'appelant).
+
+    Returns:
+        dict: Nombre de lignes de chaque table d'agrégats.
+    """
+    dialect_name = connection.dialect.name
+    zero = literal(0)
+
+    def contract_part(key):
+        return select(key.label("key"), literal(1).label("contracts"),
+                      Contract.amount_total.label("amount_total"),
+                      Contract.amount_remaining.label("amount_remaining"), zero.label("events"))
+
+    def event_part(key, join_contracts=False):
+        query = select(key.label("key"), zero.label("contracts"), zero.label("amount_total"),
+                       zero.label("amount_remaining"), literal(1).label("events"))
+        if join_contracts:
+            query = query.select_from(Event).join(Contract, Contract.id == Event.contract_id)
+        return query
+
+    sources = {
+        SalesContactRollup: union_all(
+            contract_part(Contract.sales_contact_id),
+            event_part(Contract.sales_contact_id, join_contracts=True),
+        ),
+        MonthlyRollup: union_all(
+            contract_part(month_of(Contract.created_date, dialect_name)),
+            event_part(month_of(Event.date_start, dialect_name)),
+        ),
+    }
+
+    counts = {}
+    for model, source in sources.items():
+        rows = source.subquery()
+        table = model.__table__
+        key_column = table.primary_key.columns.values()[0]
+        aggregated = (
+            select(rows.c.key, *(func.sum(rows.c[metric]) for metric in ROLLUP_METRICS))
+            .group_by(rows.c.key)
+        )
+        connection.execute(delete(table))
+        result = connection.execute(
+            table.insert().from_select([key_column.name, *ROLLUP_METRICS], aggregated)
+        )
+        counts[table.name] = result.rowcount
+    return counts
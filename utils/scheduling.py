@@ -0,0 +1,123 @@
+from sqlalchemy import and_, func, select
+
+from models.event import Event
+
+# Nombre maximum de conflits cités dans un message
+CONFLICT_LIMIT = 3
+
+
+def overlap_condition(dialect_name, date_start, date_end):
+    """
+    Condition SQL « l'événement chevauche la période [date_start, date_end) ».
+
+    Sous PostgreSQL, l'opérateur && sur tsrange est servi par les index GiST
+    ix_events_support_period / ix_events_location_period (migration 0004) ; ailleurs,
+    les bornes sont comparées via les index (support / lieu, début, fin).
+
+    Args:
+        dialect_name (str): Dialecte de la base.
+        date_start (datetime): Début de la période.
+        date_end (datetime): Fin de la période (exclue).
+
+    Returns:
+        ColumnElement: Condition à ajouter à une requête sur Event.
+    """
+    if dialect_name == "postgresql":
+        return func.tsrange(Event.date_start, Event.date_end).op("&&")(func.tsrange(date_start, date_end))
+    return and_(Event.date_start < date_end, Event.date_end > date_start)
+
+
+def conflicts_query(dialect_name, date_start, date_end, support_contact_id=None, location=None,
+                    exclude_event_id=None, limit=CONFLICT_LIMIT):
+    """
+    Requête des événements du même support (ou au même lieu) qui chevauchent la période.
+
+    Args:
+        dialect_name (str): Dialecte de la base.
+        date_start (datetime): Début de la période.
+        date_end (datetime): Fin de la période (exclue).
+        support_contact_id (int | None): Support dont le planning est vérifié.
+        location (str | None): Lieu dont les réservations sont vérifiées.
+        exclude_event_id (int | None): Événement à ignorer (celui qui est modifié).
+        limit (int): Nombre maximum d'événements retournés.
+
+    Returns:
+        Select: Requête (id, name, date_start, date_end), triée par début.
+    """
+    query = (
+        select(Event.id, Event.name, Event.date_start, Event.date_end)
+        .where(overlap_condition(dialect_name, date_start, date_end))
+        .order_by(Event.date_start)
+        .limit(limit)
+    )
+    if support_contact_id is not None:
+        query = query.where(Event.support_contact_id == support_contact_id)
+    if location is not None:
+        query = query.where(Event.location == location)
+    if exclude_event_id is not None:
+        query = query.where(Event.id != exclude_event_id)
+    return query
+
+
+def find_conflicts(session, date_start, date_end, **criteria):
+    """
+    Retourne les événements en conflit (voir conflicts_query pour les critères).
+
+    Args:
+        session (Session): Session SQLAlchemy.
+        date_start (datetime): Début de la période.
+        date_end (datetime): Fin de la période (exclue).
+        **criteria: support_contact_id, location, exclude_event_id, limit.
+
+    Returns:
+        list: Lignes (id, name, date_start, date_end).
+    """
+    dialect_name = session.get_bind().dialect.name
+    return session.execute(conflicts_query(dialect_name, date_start, date_end, **criteria)).all()
+
+
+async def find_conflicts_async(session, date_start, date_end, **criteria):
+    """
+    Variante de find_conflicts pour une AsyncSession.
+    """
+    dialect_name = session.get_bind().dialect.name
+    return (await session.execute(conflicts_query(dialect_name, date_start, date_end, **criteria))).all()
+
+
+def describe_conflicts(subject, conflicts):
+    """
+    Décrit des conflits pour un message d'erreur ou d'avertissement.
+
+    Args:
+        subject (str): Début de phrase ("Le support X est déjà assigné à").
+        conflicts (list): Lignes retournées par find_conflicts.
+
+    Returns:
+        str: Description des événements en conflit.
+    """
+    events = ", ".join(
+        f"ID {c.id} « {c.name} » ({c.date_start:%Y-%m-%d %H:%M} → {c.date_end:%Y-%m-%d %H:%M})"
+        for c in conflicts
+    )
+    return f"{subject} {events}."
+
+
+def check_schedule(problems, allow_overlap=False):
+    """
+    Rejette une planification en conflit, ou retourne l'avertissement si le chevauchement est accepté.
+
+    Args:
+        problems (list[str]): Descriptions des conflits (describe_conflicts) ; vide si aucun.
+        allow_overlap (bool): Accepter le chevauchement (avertissement seulement).
+
+    Returns:
+        str: Avertissement à ajouter au message de succès ("" si aucun conflit).
+
+    Raises:
+        Exception: En cas de conflit si allow_overlap est faux.
+    """
+    if not problems:
+        return ""
+    if not allow_overlap:
+        raise Exception("Conflit de planning : " + " ".join(problems))
+    return " Attention, chevauchement accepté : " + " ".join(problems)
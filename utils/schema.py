@@ -0,0 +1,180 @@
+import os
+from sqlalchemy import CheckConstraint, Column, Integer, MetaData, Table, create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+# Version du schéma attendue par le code. À incrémenter à chaque nouvelle migration Alembic.
+SCHEMA_VERSION = 6
+
+# Révision Alembic correspondant au schéma créé par create_all avant l'arrivée des migrations
+BASELINE_REVISION = "0001"
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+DEFAULT_DEPARTMENTS = ["commercial", "support", "gestion"]
+
+# Tables créées hors des modèles (DDL FTS5 de models/client.py et tables internes de FTS5),
+# ignorées par `alembic revision --autogenerate`
+UNMANAGED_TABLE_PREFIXES = ("clients_fts",)
+
+# Table `schema_info` telle que créée par la révision de référence : les bases créées par le
+# code d'origine (avant `db init`) ne l'ont pas et doivent la recevoir avant d'être marquées
+BASELINE_SCHEMA_INFO = Table(
+    "schema_info", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    CheckConstraint("id = 1", name="ck_schema_info_single_row"),
+)
+
+
+def check_schema_version(dbapi_connection, connection_record):
+    """
+    Vérifie, à la première connexion du processus, que la base est initialisée
+    et que son schéma correspond à la version attendue.
+
+    Une seule requête sur la table `schema_info` remplace la réflexion de toutes
+    les tables faite auparavant à chaque invocation de la CLI.
+
+    Args:
+        dbapi_connection: Connexion DBAPI brute fournie par l'événement `first_connect`.
+        connection_record: Enregistrement du pool (non utilisé).
+
+    Raises:
+        Exception: Si la base n'est pas initialisée ou si la version ne correspond pas.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT version FROM schema_info WHERE id = 1")
+        row = cursor.fetchone()
+    except Exception:
+        row = None
+    finally:
+        cursor.close()
+        # Ne laisse pas de transaction ouverte (ou avortée sous PostgreSQL)
+        dbapi_connection.rollback()
+
+    if row is None:
+        raise Exception("Base de données non initialisée. Lancez `epicevents.py db init`.")
+    if row[0] != SCHEMA_VERSION:
+        raise Exception(
+            f"Schéma de la base en version {row[0]}, version {SCHEMA_VERSION} attendue. "
+            "Lancez `epicevents.py db upgrade`."
+        )
+
+
+def include_in_autogenerate(obj, name, type_, reflected, compare_to):
+    """
+    Filtre `include_object` d'Alembic : exclut de la comparaison autogenerate les tables
+    non décrites par les modèles (index plein texte SQLite) et leurs index.
+    """
+    table_name = name if type_ == "table" else getattr(getattr(obj, "table", None), "name", None)
+    return not (table_name or "").startswith(UNMANAGED_TABLE_PREFIXES)
+
+
+def populate_departments(engine):
+    """
+    Initialise la table Department avec les départements 'commercial', 'support' et 'gestion'
+    si ceux-ci n'existent pas déjà.
+
+    Args:
+        engine (Engine): Moteur SQLAlchemy à utiliser.
+    """
+    from models.department import Department
+    from utils.refcache import bump_reference_version
+
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        existing = {name for (name,) in session.query(Department.name)}
+        missing = [name for name in DEFAULT_DEPARTMENTS if name not in existing]
+        if missing:
+            session.add_all(Department(name=name) for name in missing)
+            # Départements en cache disque (utils.refcache) à relire
+            bump_reference_version(session)
+        session.commit()
+
+
+def set_schema_version(engine, version=SCHEMA_VERSION):
+    """
+    Enregistre la version du schéma dans la table `schema_info` (une seule ligne).
+
+    Args:
+        engine (Engine): Moteur SQLAlchemy à utiliser.
+        version (int): Version à enregistrer.
+    """
+    from models.schema_info import SchemaInfo
+
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        info = session.get(SchemaInfo, 1)
+        if info:
+            info.version = version
+        else:
+            session.add(SchemaInfo(id=1, version=version))
+        session.commit()
+
+
+def _bootstrap_engine(url=None):
+    """
+    Crée un moteur dédié à l'initialisation, sans la vérification de version
+    installée sur le moteur applicatif.
+    """
+    if url is None:
+        from utils.settings import load_env
+
+        load_env()
+        from utils.connection import db_url
+
+        url = db_url
+    return create_engine(url)
+
+
+def run_migrations(engine, revision="head"):
+    """
+    Applique les migrations Alembic jusqu'à la révision demandée.
+
+    Une base créée avant l'arrivée d'Alembic (tables présentes, pas de table
+    `alembic_version`) est d'abord marquée comme étant à la révision de référence,
+    après création de la table `schema_info` si elle date du code d'origine.
+
+    Args:
+        engine (Engine): Moteur SQLAlchemy à utiliser.
+        revision (str): Révision cible.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        inspector = inspect(connection)
+        if inspector.has_table("clients") and not inspector.has_table("alembic_version"):
+            if not inspector.has_table("schema_info"):
+                BASELINE_SCHEMA_INFO.create(connection)
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+        connection.commit()
+
+
+def init_db(url=None):
+    """
+    Crée toutes les tables, les départements par défaut et enregistre la version du schéma.
+
+    Args:
+        url (str | None): URL de la base (par défaut celle de utils.connection).
+    """
+    upgrade_db(url)
+
+
+def upgrade_db(url=None):
+    """
+    Met à jour une base (vide ou existante) vers la version de schéma attendue par le code.
+
+    Args:
+        url (str | None): URL de la base (par défaut celle de utils.connection).
+    """
+    engine = _bootstrap_engine(url)
+    try:
+        run_migrations(engine)
+        populate_departments(engine)
+        set_schema_version(engine)
+    finally:
+        engine.dispose()
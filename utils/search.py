@@ -0,0 +1,141 @@
+import re
+
+from sqlalchemy import Float, Integer, String, and_, func, literal, literal_column, or_, text
+
+from models.client import Client
+from utils.pagination import keyset_paginate
+
+# Nombre de résultats retournés par défaut
+SEARCH_LIMIT = 20
+
+# Texte indexé (ix_clients_search_trgm), qualifié pour les requêtes avec jointure
+CLIENT_DOCUMENT = literal_column(
+    "(clients.name || ' ' || clients.email || ' ' || coalesce(clients.company, ''))", String
+)
+
+# Pondération bm25 des colonnes de clients_fts : nom, email, entreprise
+FTS_WEIGHTS = "10.0, 5.0, 3.0"
+
+
+def search_terms(query):
+    """
+    Découpe une recherche en mots (lettres, chiffres, soulignés).
+
+    Args:
+        query (str): Texte saisi.
+
+    Returns:
+        list[str]: Mots de la recherche, dans l'ordre.
+    """
+    return re.findall(r"\w+", query or "")
+
+
+def like_pattern(term):
+    """
+    Motif LIKE « contient `term` », caractères spéciaux échappés par '\\'.
+    """
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def fts_match(terms):
+    """
+    Expression MATCH FTS5 : chaque mot doit apparaître, éventuellement comme préfixe d'un mot indexé.
+    """
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def fts_available(session):
+    """
+    Indique si la table FTS5 clients_fts existe (SQLite compilé avec FTS5, migration 0005).
+    """
+    return session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clients_fts'")
+    ).first() is not None
+
+
+def client_match_condition(session, terms):
+    """
+    Condition SQL « le client correspond à tous les mots », servie par l'index de recherche.
+
+    PostgreSQL : index trigramme (sous-chaîne ILIKE ou mot proche, opérateur <% de pg_trgm) ;
+    SQLite : identifiants trouvés dans clients_fts ; sinon : LIKE sur chaque colonne.
+
+    Args:
+        session (Session): Session SQLAlchemy.
+        terms (list[str]): Mots de la recherche (search_terms), non vide.
+
+    Returns:
+        ColumnElement: Condition à ajouter à une requête portant sur Client.
+    """
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return or_(
+            and_(*(CLIENT_DOCUMENT.ilike(like_pattern(term), escape="\\") for term in terms)),
+            literal(" ".join(terms), String).op("<%")(CLIENT_DOCUMENT),
+        )
+    if dialect_name == "sqlite" and fts_available(session):
+        matches = (
+            text("SELECT rowid FROM clients_fts WHERE clients_fts MATCH :match")
+            .bindparams(match=fts_match(terms))
+            .columns(rowid=Integer)
+        )
+        return Client.id.in_(matches)
+    return and_(*(
+        or_(*(column.ilike(like_pattern(term), escape="\\")
+              for column in (Client.name, Client.email, Client.company)))
+        for term in terms
+    ))
+
+
+def rank_by_fts(query, terms, limit):
+    """
+    Classement SQLite par bm25 : les `limit` meilleurs identifiants sont choisis dans
+    clients_fts avant la jointure.
+    """
+    matches = (
+        text(
+            f"SELECT rowid AS id, bm25(clients_fts, {FTS_WEIGHTS}) AS score FROM clients_fts "
+            f"WHERE clients_fts MATCH :match ORDER BY score LIMIT :limit"
+        )
+        .bindparams(match=fts_match(terms), limit=limit)
+        .columns(id=Integer, score=Float)
+        .subquery("matches")
+    )
+    return query.join(matches, matches.c.id == Client.id).order_by(matches.c.score, Client.id)
+
+
+def search_client_rows(session, query, search, limit=SEARCH_LIMIT, after=None, ranked=True):
+    """
+    Filtre une requête sur les clients selon une recherche textuelle.
+
+    Classement (ranked=True) : bm25 sur la table FTS5 sous SQLite, word_similarity sous
+    PostgreSQL, nom ailleurs. Sinon, les clients sont parcourus par ID (pagination par clé).
+
+    Args:
+        session (Session): Session SQLAlchemy.
+        query (Query): Requête sur les clients (par exemple client_rows_query).
+        search (str): Texte saisi.
+        limit (int): Nombre maximum de résultats.
+        after (int | None): ID du dernier client de la page précédente (si ranked est faux).
+        ranked (bool): Trier par pertinence plutôt que par ID.
+
+    Returns:
+        list: Lignes de la requête (vide si la recherche ne contient aucun mot).
+    """
+    terms = search_terms(search)
+    if not terms:
+        return []
+    if not ranked:
+        query = query.filter(client_match_condition(session, terms))
+        return keyset_paginate(query, Client.id, limit, after).all()
+
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "sqlite" and fts_available(session):
+        return rank_by_fts(query, terms, limit).all()
+    query = query.filter(client_match_condition(session, terms))
+    if dialect_name == "postgresql":
+        order = func.word_similarity(" ".join(terms), CLIENT_DOCUMENT).desc()
+    else:
+        order = Client.name
+    return query.order_by(order, Client.id).limit(limit).all()
@@ -0,0 +1,304 @@
+import random
+import secrets
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, text
+from utils.bulk import bulk_insert
+from utils.datafiles import batched
+
+# Volumes prédéfinis (utilisateurs, clients, contrats, événements)
+SCALES = {
+    "1k": {"users": 50, "clients": 1_000, "contracts": 1_000, "events": 1_000},
+    "100k": {"users": 500, "clients": 100_000, "contracts": 100_000, "events": 100_000},
+    "1m": {"users": 2_000, "clients": 1_000_000, "contracts": 1_000_000, "events": 1_000_000},
+}
+
+# Longueur (en octets aléatoires) du mot de passe tiré à chaque génération
+SEED_PASSWORD_BYTES = 12
+
+SEED_BATCH_SIZE = 10_000
+
+# Répartition des utilisateurs générés par département
+DEPARTMENT_SHARES = (("commercial", 0.6), ("support", 0.3), ("gestion", 0.1))
+
+# Date de référence : les données générées sont identiques d'une exécution à l'autre
+BASE_DATE = datetime(2025, 1, 1)
+
+LOCATIONS = ["Paris", "Lyon", "Marseille", "Bordeaux", "Lille", "Nantes", "Toulouse", "Nice"]
+
+
+def seed_database(connection, users=0, clients=0, contracts=0, events=0, seed=0,
+                  batch_size=SEED_BATCH_SIZE, password_hash=None, progress=None):
+    """
+    Génère un jeu de données synthétique cohérent et l'insère en masse.
+
+    Les lignes sont insérées par lots via bulk_insert (COPY sous PostgreSQL,
+    executemany ailleurs), sans passer par l'unité de travail de l'ORM.
+    Les contraintes du modèle sont respectées :
+        - les clients et contrats sont rattachés à des commerciaux ;
+        - un contrat reprend le commercial de son client, et le montant restant
+          ne dépasse pas le montant total ;
+        - les événements ne portent que sur des contrats signés, leur support
+          (éventuel) appartient au département support et date_end > date_start.
+
+    Les départements doivent exister (db init). Les identifiants sont attribués
+    à la suite des identifiants existants : la base peut déjà contenir des données.
+
+    Args:
+        connection (Connection): Connexion SQLAlchemy (une transaction par lot).
+        users (int): Nombre d'utilisateurs à créer.
+        clients (int): Nombre de clients à créer.
+        contracts (int): Nombre de contrats à créer.
+        events (int): Nombre d'événements à créer.
+        seed (int): Graine du générateur aléatoire (données reproductibles).
+        batch_size (int): Nombre de lignes insérées par lot.
+        password_hash (str | None): Hash du mot de passe des utilisateurs (par défaut celui d'un
+            mot de passe aléatoire jamais communiqué : les comptes générés sont inutilisables).
+        progress (callable | None): Appelée avec (table, nombre de lignes insérées) après chaque lot.
+
+    Returns:
+        dict: Nombre de lignes insérées par table.
+
+    Raises:
+        Exception: Si les départements sont absents, ou s'il manque des commerciaux,
+            des clients ou des contrats signés pour générer les lignes demandées.
+    """
+    from models.client import Client
+    from models.contract import Contract
+    from models.department import Department
+    from models.event import Event
+    from models.user import User
+    from utils.refcache import bump_reference_version
+    from utils.rollups import rebuild_rollups
+
+    rng = random.Random(seed)
+    departments = dict(connection.execute(select(Department.name, Department.id)).all())
+    missing = [name for name, _ in DEPARTMENT_SHARES if name not in departments]
+    if missing:
+        raise Exception(f"Départements manquants : {', '.join(missing)}. Lancez `epicevents.py db init`.")
+
+    counts = {}
+
+    def insert(table, rows):
+        total = 0
+        for batch in batched(rows, batch_size):
+            total += bulk_insert(connection, table, batch)
+            connection.commit()
+            if progress:
+                progress(table.name, total)
+        if total:
+            _sync_sequence(connection, table)
+            connection.commit()
+        counts[table.name] = total
+
+    # Utilisateurs
+    if users:
+        if password_hash is None:
+            from utils.auth import hash_password
+
+            password_hash = hash_password(generate_seed_password())
+        first_id = _next_id(connection, User)
+        insert(User.__table__, _user_rows(rng, users, first_id, departments, password_hash))
+        # Nouveaux utilisateurs : les listes du cache disque (support, départements) sont obsolètes
+        bump_reference_version(connection)
+        connection.commit()
+
+    # Référentiels existants (y compris les utilisateurs qui viennent d'être créés)
+    commercial_ids = _ids_in_department(connection, User, departments["commercial"])
+    support_ids = _ids_in_department(connection, User, departments["support"])
+
+    # Clients
+    if clients:
+        if not commercial_ids:
+            raise Exception("Aucun commercial : impossible de générer des clients.")
+        first_id = _next_id(connection, Client)
+        insert(Client.__table__, _client_rows(rng, clients, first_id, commercial_ids))
+
+    # Contrats
+    signed_contracts = []
+    if contracts:
+        client_owners = connection.execute(select(Client.id, Client.sales_contact_id)).all()
+        if not client_owners:
+            raise Exception("Aucun client : impossible de générer des contrats.")
+        first_id = _next_id(connection, Contract)
+        insert(Contract.__table__,
+               _contract_rows(rng, contracts, first_id, client_owners, signed_contracts))
+
+    # Événements
+    if events:
+        if not signed_contracts:
+            signed_contracts = [
+                (contract_id, signed_date or BASE_DATE)
+                for contract_id, signed_date in connection.execute(
+                    select(Contract.id, Contract.signed_date).where(Contract.signed.is_(True))
+                )
+            ]
+        if not signed_contracts:
+            raise Exception("Aucun contrat signé : impossible de générer des événements.")
+        first_id = _next_id(connection, Event)
+        insert(Event.__table__, _event_rows(rng, events, first_id, signed_contracts, support_ids))
+
+    # Les insertions en masse contournent les contrôleurs : agrégats du tableau de bord recalculés
+    if contracts or events:
+        rebuild_rollups(connection)
+        connection.commit()
+
+    # Statistiques du planificateur à jour après un chargement en masse : sans elles, SQLite
+    # choisit par exemple l'index (signed, sales_contact_id) pour une page de contrats signés
+    # triée par ID, puis trie tous les contrats signés
+    if any(counts.values()):
+        connection.exec_driver_sql("ANALYZE")
+        connection.commit()
+
+    return counts
+
+
+def generate_seed_password():
+    """
+    Tire un mot de passe aléatoire commun aux utilisateurs d'une génération (hashé une seule fois).
+    """
+    return secrets.token_urlsafe(SEED_PASSWORD_BYTES)
+
+
+def is_empty_database(connection):
+    """
+    Indique si la base ne contient encore aucun utilisateur (base tout juste initialisée).
+
+    Args:
+        connection (Connection): Connexion SQLAlchemy.
+    """
+    from models.user import User
+
+    return connection.execute(select(User.id).limit(1)).first() is None
+
+
+def _next_id(connection, model):
+    return (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _ids_in_department(connection, model, department_id):
+    return list(connection.execute(select(model.id).where(model.department_id == department_id)).scalars())
+
+
+def _sync_sequence(connection, table):
+    """
+    Réaligne la séquence PostgreSQL de la clé primaire après une insertion avec identifiants explicites.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT MAX(id) FROM {table.name}))"
+    ))
+
+
+def _pick_department(rng):
+    draw = rng.random()
+    for name, share in DEPARTMENT_SHARES:
+        if draw < share:
+            return name
+        draw -= share
+    return DEPARTMENT_SHARES[-1][0]
+
+
+def _randrange(rng, start, stop):
+    # Équivalent de rng.randrange(start, stop), nettement plus rapide sur des millions de tirages
+    return start + int(rng.random() * (stop - start))
+
+
+def _pick(rng, items):
+    # Équivalent de rng.choice(items)
+    return items[int(rng.random() * len(items))]
+
+
+def _user_rows(rng, count, first_id, departments, password_hash):
+    for offset in range(count):
+        user_id = first_id + offset
+        # Au moins un utilisateur par département, puis tirage selon la répartition
+        if offset < len(DEPARTMENT_SHARES):
+            department = DEPARTMENT_SHARES[offset][0]
+        else:
+            department = _pick_department(rng)
+        yield {
+            "id": user_id,
+            "name": f"Utilisateur {user_id}",
+            "email": f"user{user_id}@seed.epicevents.com",
+            "password": password_hash,
+            "department_id": departments[department],
+        }
+
+
+def _client_rows(rng, count, first_id, commercial_ids):
+    for offset in range(count):
+        client_id = first_id + offset
+        created = BASE_DATE - timedelta(days=_randrange(rng, 0, 730), minutes=_randrange(rng, 0, 1440))
+        yield {
+            "id": client_id,
+            "name": f"Client {client_id}",
+            "email": f"client{client_id}@seed.example.com",
+            "phone": f"0{_randrange(rng, 100_000_000, 999_999_999)}",
+            "company": f"Entreprise {_randrange(rng, 1, 5000)}",
+            "created_date": created,
+            "updated_date": created,
+            "sales_contact_id": _pick(rng, commercial_ids),
+        }
+
+
+def _contract_rows(rng, count, first_id, client_owners, signed_contracts):
+    for offset in range(count):
+        contract_id = first_id + offset
+        client_id, sales_contact_id = _pick(rng, client_owners)
+        created = BASE_DATE - timedelta(days=_randrange(rng, 0, 365), minutes=_randrange(rng, 0, 1440))
+        total = float(_randrange(rng, 1_000, 100_000))
+        signed = rng.random() < 0.7
+        signed_date = created + timedelta(days=_randrange(rng, 0, 30)) if signed else None
+        if signed:
+            signed_contracts.append((contract_id, signed_date))
+        yield {
+            "id": contract_id,
+            "client_id": client_id,
+            "sales_contact_id": sales_contact_id,
+            "amount_total": total,
+            "amount_remaining": round(total * rng.random(), 2) if signed else total,
+            "signed": signed,
+            "signed_date": signed_date,
+            "created_date": created,
+        }
+
+
+def _event_rows(rng, count, first_id, signed_contracts, support_ids):
+    for offset in range(count):
+        event_id = first_id + offset
+        contract_id, signed_date = _pick(rng, signed_contracts)
+        # L'événement a lieu après la signature du contrat
+        start = signed_date + timedelta(days=_randrange(rng, 1, 365), hours=_randrange(rng, 8, 20))
+        # Environ un événement sur quatre reste à assigner
+        support_id = _pick(rng, support_ids) if support_ids and rng.random() >= 0.25 else None
+        yield {
+            "id": event_id,
+            "name": f"Événement {event_id}",
+            "contract_id": contract_id,
+            "support_contact_id": support_id,
+            "date_start": start,
+            "date_end": start + timedelta(hours=_randrange(rng, 1, 49)),
+            "location": _pick(rng, LOCATIONS),
+            "attendees": _randrange(rng, 10, 1000),
+            "notes": None,
+        }
+
+
+def tune_for_bulk_load(connection):
+    """
+    Allège la durabilité des écritures pour la durée de la connexion de chargement.
+
+    Sous PostgreSQL, `synchronous_commit = off` n'attend plus l'écriture du journal à
+    chaque commit ; sous SQLite, `synchronous = OFF` supprime les fsync. Un arrêt brutal
+    peut perdre les derniers lots, sans corrompre la base : acceptable pour des données
+    de test, jamais pour les données de production.
+
+    Args:
+        connection (Connection): Connexion utilisée pour le chargement.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SET synchronous_commit = off"))
+    elif connection.dialect.name == "sqlite":
+        connection.execute(text("PRAGMA synchronous = OFF"))
+    connection.commit()
@@ -0,0 +1,18 @@
+_env_loaded = False
+
+
+def load_env():
+    """
+    Charge les variables du fichier .env dans l'environnement, une seule fois par processus.
+
+    L'appel est différé jusqu'au premier besoin réel (connexion, Sentry, JWT) afin que
+    `epicevents.py --help` ne paie pas le coût de python-dotenv.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    _env_loaded = True
@@ -0,0 +1,375 @@
+import atexit
+import contextlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from utils.settings import load_env
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus sur la boîte d'envoi
+    fcntl = None
+
+# Textes des événements d'audit, formatés au moment de l'envoi (hors du chemin d'écriture)
+AUDIT_MESSAGES = {
+    "client_created": "Client créé : {client} par {by}",
+    "client_updated": "Client modifié : {client} par {by}",
+    "client_deleted": "Client supprimé : {client} par {by}",
+    "clients_imported": "Import de clients : {imported} importés, {rejected} rejetés par {by}",
+    "user_created": "Utilisateur créé : {user} par {by}",
+    "user_updated": "Utilisateur modifié : {user} par {by}",
+    "user_deleted": "Utilisateur supprimé : {user} par {by}",
+    "users_imported": "Import d'utilisateurs : {imported} importés, {rejected} rejetés par {by}",
+    "message": "{message}",
+}
+
+# Temps maximal (s) accordé à l'envoi d'une exception non gérée avant la fin du processus
+CRASH_FLUSH_TIMEOUT = 2.0
+
+# Boîte d'envoi locale par défaut : à côté du token, quel que soit le répertoire courant
+OUTBOX_FILE = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "..", ".epic_audit_outbox.jsonl"
+))
+
+_sentry_ready = False
+_previous_excepthook = None
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def init_sentry():
+    """
+    Initialise le SDK Sentry au premier usage uniquement.
+
+    sentry_sdk est un import coûteux : il n'est chargé que lorsqu'un message doit
+    réellement être envoyé.
+    """
+    global _sentry_ready
+    if _sentry_ready:
+        return
+
+    load_env()
+    import sentry_sdk
+
+    # La file d'audit vide elle-même le transport dans son propre délai (flush_sentry) :
+    # Sentry n'ajoute pas d'attente supplémentaire à la fin du processus.
+    sentry_sdk.init(os.getenv("SENTRY_KEY"), shutdown_timeout=0)
+    _sentry_ready = True
+
+    # Les fonctions atexit s'exécutent en ordre inverse : la file d'audit doit être
+    # fermée avant que Sentry ne ferme son client.
+    if _pipeline is not None:
+        atexit.unregister(_pipeline.close)
+        atexit.register(_pipeline.close)
+
+
+def flush_sentry(timeout):
+    """
+    Attend au plus `timeout` secondes l'envoi des messages Sentry en file.
+    """
+    if _sentry_ready and timeout > 0:
+        import sentry_sdk
+
+        sentry_sdk.flush(timeout=timeout)
+
+
+def install_crash_reporting():
+    """
+    Signale à Sentry les exceptions non gérées des commandes.
+
+    Seul un sys.excepthook est installé au démarrage : sentry_sdk n'est importé
+    et initialisé qu'au moment où une exception remonte jusqu'à l'interpréteur.
+    """
+    global _previous_excepthook
+    if _previous_excepthook is not None:
+        return
+    _previous_excepthook = sys.excepthook
+    sys.excepthook = report_crash
+
+
+def report_crash(exc_type, exc, tb):
+    """
+    Envoie une exception non gérée à Sentry, puis la laisse s'afficher normalement.
+
+    Si Sentry a déjà été initialisé pendant la commande, son propre excepthook l'a
+    capturée avant d'appeler celui-ci : il ne reste qu'à vider le transport.
+    """
+    try:
+        if not issubclass(exc_type, KeyboardInterrupt):
+            if not _sentry_ready:
+                load_env()
+                if os.getenv("SENTRY_KEY"):
+                    init_sentry()
+                    import sentry_sdk
+
+                    sentry_sdk.capture_exception((exc_type, exc, tb))
+            flush_sentry(CRASH_FLUSH_TIMEOUT)
+    except Exception:
+        # Le signalement ne doit pas masquer l'exception d'origine
+        pass
+    (_previous_excepthook or sys.__excepthook__)(exc_type, exc, tb)
+
+
+def format_audit_event(event):
+    """
+    Construit le texte d'un événement d'audit.
+
+    Args:
+        event (dict): Événement ({"kind", "fields", "ts"}).
+
+    Returns:
+        str: Message lisible.
+    """
+    template = AUDIT_MESSAGES.get(event["kind"], event["kind"] + " {fields}")
+    try:
+        return template.format(**event["fields"], fields=event["fields"])
+    except KeyError:
+        return f"{event['kind']} {event['fields']}"
+
+
+def send_to_sentry(batch):
+    """
+    Envoie un lot d'événements d'audit à Sentry en un seul message.
+
+    Args:
+        batch (list[dict]): Événements à envoyer.
+    """
+    init_sentry()
+    import sentry_sdk
+
+    with sentry_sdk.new_scope() as scope:
+        scope.set_extra("audit_events", batch)
+        sentry_sdk.capture_message(
+            f"Audit : {len(batch)} événement(s)\n" + "\n".join(format_audit_event(e) for e in batch)
+        )
+
+
+class AuditPipeline:
+    """
+    File d'événements d'audit envoyés par lots depuis un thread d'arrière-plan.
+
+    Les contrôleurs n'ajoutent qu'un dictionnaire à une liste ; l'import de sentry_sdk,
+    le formatage et l'envoi se font dans le thread. À la fin du processus, l'attente
+    est bornée par `exit_timeout` : les événements non envoyés à temps sont écrits
+    dans une boîte d'envoi locale (JSONL), reprise au démarrage suivant. La boîte
+    d'envoi est partagée par les processus (tâches cron simultanées...) : sa lecture
+    et son écriture se font sous un verrou exclusif (`<outbox_path>.lock`).
+
+    Un lot en cours d'envoi à l'expiration du délai est lui aussi écrit dans la boîte
+    d'envoi. Chaque événement porte un identifiant ("id") : si l'envoi aboutit ensuite,
+    avant la fin du processus, une ligne {"sent": [ids]} l'indique et la reprise ignore
+    ces événements. Sinon le lot est renvoyé (au moins une fois) ; l'identifiant, transmis
+    avec l'événement, permet d'écarter un doublon côté Sentry.
+
+    Args:
+        sender (callable | None): Fonction qui envoie un lot (liste d'événements) ;
+            None désactive l'audit (aucun thread, aucun événement conservé).
+        sample_rate (float): Proportion d'événements conservés (entre 0 et 1).
+        batch_size (int): Nombre d'événements déclenchant un envoi immédiat.
+        flush_interval (float): Délai maximal (s) entre deux envois.
+        exit_timeout (float): Temps maximal (s) ajouté à la commande pour vider la file.
+        outbox_path (str | None): Fichier de la boîte d'envoi locale (None = pas de boîte d'envoi).
+        on_close (callable | None): Appelée avec le temps restant (s) après le dernier envoi,
+            pour vider le transport.
+        prepare (callable | None): Appelée au démarrage du thread (initialisation du transport),
+            pour que son coût soit payé pendant la commande et non à sa fin.
+    """
+
+    def __init__(self, sender, sample_rate=1.0, batch_size=100, flush_interval=2.0, exit_timeout=0.5,
+                 outbox_path=None, on_close=None, prepare=None):
+        self.sender = sender
+        self.on_close = on_close
+        self.prepare = prepare
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.exit_timeout = exit_timeout
+        self.outbox_path = outbox_path
+        self._pending = []
+        self._in_flight = []
+        self._handed_off = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = None
+        self._load_outbox()
+
+    def record(self, kind, **fields):
+        """
+        Ajoute un événement à la file (après échantillonnage).
+
+        Args:
+            kind (str): Type d'événement (clé de AUDIT_MESSAGES).
+            **fields: Données de l'événement.
+        """
+        if self.sender is None:
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            self._pending.append({"id": uuid.uuid4().hex, "kind": kind, "fields": fields, "ts": time.time()})
+            full = len(self._pending) >= self.batch_size
+            self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Envoie immédiatement les événements en attente (dans le thread appelant).
+        """
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._in_flight = batch
+        sent = False
+        try:
+            if batch:
+                self.sender(batch)
+                sent = True
+        except Exception:
+            # L'audit ne doit jamais faire échouer une commande : le lot est remis en file
+            with self._lock:
+                self._pending[:0] = batch
+        finally:
+            with self._lock:
+                self._in_flight = []
+                # Lot déjà écrit dans la boîte d'envoi par close() pendant l'envoi
+                outboxed = [event["id"] for event in batch if sent and event.get("id") in self._handed_off]
+        if outboxed:
+            self._write_outbox([{"sent": outboxed}])
+
+    def close(self):
+        """
+        Vide la file en au plus `exit_timeout` secondes, puis écrit le reliquat dans la boîte d'envoi.
+        """
+        deadline = time.monotonic() + self.exit_timeout
+        self._closing = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(self.exit_timeout)
+        with self._lock:
+            leftover = self._in_flight + self._pending
+            self._pending = []
+            self._handed_off.update(event["id"] for event in self._in_flight if "id" in event)
+        if leftover:
+            self._write_outbox(leftover)
+        elif self.on_close is not None:
+            self.on_close(max(0.0, deadline - time.monotonic()))
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audit-pipeline", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        if self.prepare is not None:
+            try:
+                self.prepare()
+            except Exception:
+                pass
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            if self._closing:
+                return
+
+    @contextlib.contextmanager
+    def _outbox_lock(self):
+        """
+        Verrou exclusif entre processus sur la boîte d'envoi (sans effet sans fcntl).
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.outbox_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_outbox(self):
+        if self.sender is None or not self.outbox_path or not os.path.exists(self.outbox_path):
+            return
+        try:
+            # Lecture et suppression sous verrou : un seul processus reprend chaque événement,
+            # et aucun ajout concurrent n'est supprimé sans avoir été lu
+            with self._outbox_lock():
+                with open(self.outbox_path, encoding="utf-8") as f:
+                    entries = [json.loads(line) for line in f if line.strip()]
+                os.remove(self.outbox_path)
+        except (OSError, ValueError):
+            entries = []
+        # Lots envoyés après avoir été écrits dans la boîte d'envoi : pas de second envoi
+        sent = {event_id for entry in entries for event_id in entry.get("sent", ())}
+        self._pending = [entry for entry in entries if "sent" not in entry and entry.get("id") not in sent]
+        if self._pending:
+            self._ensure_thread()
+
+    def _write_outbox(self, events):
+        if not self.outbox_path:
+            return
+        try:
+            with self._outbox_lock(), open(self.outbox_path, "a", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            pass
+
+
+def get_audit_pipeline():
+    """
+    Retourne la file d'audit du processus, créée au premier événement.
+
+    Configuration (variables d'environnement) :
+        EPIC_AUDIT_SAMPLE_RATE : proportion d'événements envoyés (1 par défaut).
+        EPIC_AUDIT_BATCH_SIZE : taille des lots (100 par défaut).
+        EPIC_AUDIT_FLUSH_INTERVAL : délai maximal entre deux envois, en secondes (2 par défaut).
+        EPIC_AUDIT_EXIT_TIMEOUT : temps maximal ajouté à la fin d'une commande, en secondes (0.5 par défaut).
+        EPIC_AUDIT_OUTBOX : boîte d'envoi locale (OUTBOX_FILE par défaut).
+
+    Returns:
+        AuditPipeline: File d'audit.
+    """
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            load_env()
+            # Sans DSN Sentry, les événements ne seraient envoyés nulle part : l'audit est désactivé
+            _pipeline = AuditPipeline(
+                send_to_sentry if os.getenv("SENTRY_KEY") else None,
+                sample_rate=float(os.getenv("EPIC_AUDIT_SAMPLE_RATE", "1")),
+                batch_size=int(os.getenv("EPIC_AUDIT_BATCH_SIZE", "100")),
+                flush_interval=float(os.getenv("EPIC_AUDIT_FLUSH_INTERVAL", "2")),
+                exit_timeout=float(os.getenv("EPIC_AUDIT_EXIT_TIMEOUT", "0.5")),
+                outbox_path=os.getenv("EPIC_AUDIT_OUTBOX", OUTBOX_FILE),
+                on_close=flush_sentry,
+                prepare=init_sentry,
+            )
+            atexit.register(_pipeline.close)
+        return _pipeline
+
+
+def audit(kind, **fields):
+    """
+    Enregistre un événement d'audit, envoyé plus tard par lot à Sentry.
+
+    Args:
+        kind (str): Type d'événement (clé de AUDIT_MESSAGES).
+        **fields: Données de l'événement (formatées uniquement à l'envoi).
+    """
+    get_audit_pipeline().record(kind, **fields)
+
+
+def capture_message(message):
+    """
+    Envoie un message libre à Sentry via la file d'audit.
+
+    Args:
+        message (str): Message à journaliser.
+    """
+    audit("message", message=message)